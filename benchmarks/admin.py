@@ -0,0 +1,59 @@
+"""Список постов и групп в админке на больших объемах.
+
+    python -m benchmarks.admin --posts 5000000 --groups 10000
+"""
+import argparse
+
+from benchmarks.common import (WORDS, measure, print_table, seed_posts,
+                               setup_django)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--posts', type=int, default=5000000)
+    parser.add_argument('--groups', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    setup_django()
+    seed_posts(args.posts, groups=args.groups)
+
+    from django.db import connection
+    from django.test import Client
+
+    from posts.models import User
+
+    admin, _ = User.objects.get_or_create(
+        username='bench-admin',
+        defaults={'is_staff': True, 'is_superuser': True},
+    )
+    client = Client()
+    client.force_login(admin)
+    rows = []
+    for name, url in (
+        ('posts changelist', '/admin/posts/post/'),
+        ('posts changelist, page 500', '/admin/posts/post/?p=500'),
+        ('posts changelist, search', f'/admin/posts/post/?q={WORDS[300]}'),
+        ('posts changelist, date filter',
+         '/admin/posts/post/?pub_date__gte=2000-01-01T00:00:00%2B00:00'),
+        ('groups changelist', '/admin/posts/group/'),
+        ('group autocomplete', '/admin/posts/group/autocomplete/?term=1'),
+    ):
+        queries = []
+
+        def count_query(execute, sql, *args):
+            queries.append(sql)
+            return execute(sql, *args)
+
+        with connection.execute_wrapper(count_query):
+            response = client.get(url)
+        assert response.status_code == 200, (url, response.status_code)
+        result = measure(lambda: client.get(url), args.repeat, warmup=1)
+        rows.append((f'{name} ({len(queries)} q)', result))
+    print_table(
+        f'Админка, постов: {args.posts}, групп: {args.groups}', rows
+    )
+
+
+if __name__ == '__main__':
+    main()
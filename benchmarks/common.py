@@ -0,0 +1,173 @@
+"""Общая обвязка бенчмарков: отдельная база SQLite, наполнение, замеры.
+
+Бенчмарки запускаются из корня репозитория, например:
+    python -m benchmarks.search --posts 1000000
+"""
+import itertools
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROJECT_DIR = os.path.join(BASE_DIR, 'yatube')
+DEFAULT_DB = os.path.join(tempfile.gettempdir(), 'yatube_bench.sqlite3')
+
+SYLLABLES = (
+    'ка ко ку ма мо ми ра ро ре та то ти на но ни ла ло ли '
+    'са со си да до ди ва во ви па по пи за зо зи бе бо бу'
+).split()
+VOCABULARY_SIZE = 5000
+
+
+def vocabulary(seed=0):
+    """Словарь синтетических слов; частоты слов в тексте убывают по Ципфу."""
+    rng = random.Random(seed)
+    words = set()
+    while len(words) < VOCABULARY_SIZE:
+        words.add(''.join(rng.choice(SYLLABLES) for _ in range(3)))
+    words = sorted(words)
+    rng.shuffle(words)
+    weights = [1 / rank for rank in range(1, len(words) + 1)]
+    cum_weights = list(itertools.accumulate(weights))
+    return words, cum_weights
+
+
+WORDS, CUM_WEIGHTS = vocabulary()
+
+
+def setup_django(db_name=DEFAULT_DB, fresh=False):
+    """Поднимает Django на отдельной базе и применяет миграции."""
+    if PROJECT_DIR not in sys.path:
+        sys.path.insert(0, PROJECT_DIR)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+    if fresh and os.path.exists(db_name):
+        os.remove(db_name)
+
+    import django
+    from django.conf import settings
+    from django.core.management import call_command
+
+    settings.DATABASES['default']['NAME'] = db_name
+    # Как в продакшене: кешированный загрузчик шаблонов, без журнала SQL.
+    settings.DEBUG = False
+    django.setup()
+    call_command('migrate', verbosity=0)
+
+
+def use_database(db_name):
+    """Переключает уже поднятый Django на другую базу бенчмарка."""
+    from django.core.cache import cache
+    from django.core.management import call_command
+    from django.db import connection
+
+    connection.close()
+    connection.settings_dict['NAME'] = db_name
+    cache.clear()
+    call_command('migrate', verbosity=0)
+
+
+def random_text(rng, words=12):
+    return ' '.join(rng.choices(WORDS, cum_weights=CUM_WEIGHTS, k=words))
+
+
+def seed_posts(count, authors=1000, groups=100, chunk=50000, seed=1):
+    """Быстро наполняет базу постами в обход ORM.
+
+    Счетчики и поисковый индекс пересобираются в конце целиком,
+    границы страниц сбрасываются.
+    """
+    from django.db import connection, transaction
+    from django.utils import timezone
+
+    from posts import boundaries, counters, search
+    from posts.models import Group, Post, User
+
+    rng = random.Random(seed)
+    existing = Post.objects.count()
+    if existing >= count:
+        return existing
+    User.objects.bulk_create(
+        [User(username=f'bench{i}', password='!') for i in range(authors)],
+        batch_size=500,
+        ignore_conflicts=True,
+    )
+    Group.objects.bulk_create(
+        [
+            Group(title=f'Группа {i}', slug=f'bench-{i}', description='')
+            for i in range(groups)
+        ],
+        batch_size=500,
+        ignore_conflicts=True,
+    )
+    author_ids = list(
+        User.objects.filter(username__startswith='bench')
+        .values_list('id', flat=True)
+    )
+    group_ids = list(
+        Group.objects.filter(slug__startswith='bench-')
+        .values_list('id', flat=True)
+    ) + [None]
+    start = timezone.now() - timezone.timedelta(seconds=count)
+    # Колонки берутся из модели: новые NOT NULL поля получают свой
+    # default, и вставка не ломается при изменении схемы.
+    fields = [
+        field for field in Post._meta.concrete_fields
+        if not field.primary_key
+    ]
+    defaults = {
+        field.attname: field.get_db_prep_save(field.get_default(), connection)
+        for field in fields
+    }
+    sql = (
+        f'INSERT INTO posts_post'
+        f' ({", ".join(field.column for field in fields)})'
+        f' VALUES ({", ".join(["%s"] * len(fields))})'
+    )
+    for offset in range(existing, count, chunk):
+        rows = []
+        for i in range(offset, min(offset + chunk, count)):
+            moment = start + timezone.timedelta(seconds=i)
+            values = dict(
+                defaults,
+                text=random_text(rng), pub_date=moment, updated=moment,
+                author_id=rng.choice(author_ids),
+                group_id=rng.choice(group_ids),
+            )
+            rows.append([values[field.attname] for field in fields])
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.executemany(sql, rows)
+    counters.recount()
+    search.rebuild()
+    boundaries.reset()
+    return count
+
+
+def measure(func, repeat=50, warmup=3):
+    """Запускает func и возвращает перцентили времени в миллисекундах."""
+    for _ in range(warmup):
+        func()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return {
+        'p50': statistics.median(timings),
+        'p95': timings[int(len(timings) * 0.95) - 1],
+        'p99': timings[int(len(timings) * 0.99) - 1],
+        'mean': statistics.mean(timings),
+    }
+
+
+def print_table(title, rows):
+    print(title)
+    print(f'{"case":<40}{"p50":>10}{"p95":>10}{"p99":>10}  ms')
+    for name, result in rows:
+        print(
+            f'{name:<40}{result["p50"]:>10.2f}'
+            f'{result["p95"]:>10.2f}{result["p99"]:>10.2f}'
+        )
@@ -0,0 +1,118 @@
+"""Смешанные чтения и записи из нескольких процессов на одной базе SQLite.
+
+Процессы ходят на главную страницу и создают посты через post_create.
+Сначала база работает как раньше: журнал delete, без PRAGMA, с обычным
+BEGIN и новым соединением на каждый запрос, затем с SQLITE_PRAGMAS,
+OPTIONS из настроек и постоянными соединениями. Упавшие запросы,
+например с "database is locked", считаются в errors.
+
+    python -m benchmarks.concurrency --processes 4 --seconds 10
+"""
+import argparse
+import logging
+import multiprocessing
+import random
+import statistics
+import time
+
+from benchmarks.common import seed_posts, setup_django
+
+# Режим журнала файла, PRAGMA соединений (None — из настроек),
+# CONN_MAX_AGE и OPTIONS (None — из настроек).
+MODES = {
+    'before': ('delete', {}, 0, {}),
+    'after': ('wal', None, 600, None),
+}
+
+
+def worker(task):
+    """Гоняет запросы до дедлайна; возвращает задержки и число ошибок."""
+    number, deadline, write_share = task
+    from django.test import Client
+
+    from posts.models import User
+
+    rng = random.Random(number)
+    client = Client()
+    client.force_login(User.objects.get(username=f'bench{number}'))
+    timings = {'read': [], 'write': []}
+    errors = 0
+    while time.time() < deadline:
+        kind = 'write' if rng.random() < write_share else 'read'
+        started = time.perf_counter()
+        try:
+            if kind == 'write':
+                client.post('/create/', {'text': f'Нагрузка {number}'})
+            else:
+                client.get('/')
+        except Exception:
+            errors += 1
+            continue
+        timings[kind].append((time.perf_counter() - started) * 1000)
+    return timings, errors
+
+
+def percentile(values, share):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(int(len(values) * share), len(values) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--posts', type=int, default=100000)
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--write-share', type=float, default=0.2)
+    args = parser.parse_args()
+
+    setup_django()
+    seed_posts(args.posts)
+
+    from django.conf import settings
+    from django.db import connection, connections
+
+    settings.PAGE_CACHE_TIMEOUT = 0
+    logging.getLogger('yatube.performance').setLevel(logging.ERROR)
+    pragmas = settings.SQLITE_PRAGMAS
+    options = connection.settings_dict['OPTIONS']
+    print(
+        f'{"mode":<8}{"rps":>8}{"errors":>8}{"read p50":>10}'
+        f'{"read p99":>10}{"write p50":>11}{"write p99":>11}  ms'
+    )
+    for mode, (journal, mode_pragmas, max_age, mode_options) in (
+        MODES.items()
+    ):
+        # Режим журнала хранится в файле базы: переключаем его заранее.
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA journal_mode = {journal}')
+        connections.close_all()
+        settings.SQLITE_PRAGMAS = (
+            pragmas if mode_pragmas is None else mode_pragmas
+        )
+        connection.settings_dict['CONN_MAX_AGE'] = max_age
+        connection.settings_dict['OPTIONS'] = (
+            options if mode_options is None else mode_options
+        )
+        deadline = time.time() + args.seconds
+        with multiprocessing.Pool(args.processes) as pool:
+            results = pool.map(worker, [
+                (number, deadline, args.write_share)
+                for number in range(args.processes)
+            ])
+        reads = [t for timings, _ in results for t in timings['read']]
+        writes = [t for timings, _ in results for t in timings['write']]
+        errors = sum(errors for _, errors in results)
+        print(
+            f'{mode:<8}{(len(reads) + len(writes)) / args.seconds:>8.0f}'
+            f'{errors:>8}'
+            f'{statistics.median(reads) if reads else 0:>10.2f}'
+            f'{percentile(reads, 0.99):>10.2f}'
+            f'{statistics.median(writes) if writes else 0:>11.2f}'
+            f'{percentile(writes, 0.99):>11.2f}'
+        )
+
+
+if __name__ == '__main__':
+    main()
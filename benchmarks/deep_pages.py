@@ -0,0 +1,42 @@
+"""Номерные страницы ленты: OFFSET против поиска от границы страницы.
+
+    python -m benchmarks.deep_pages --posts 300000
+"""
+import argparse
+
+from benchmarks.common import measure, print_table, seed_posts, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--posts', type=int, default=300000)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    setup_django()
+    seed_posts(args.posts)
+
+    from posts.counters import site_posts_count
+    from posts.models import Post, PostCounter
+    from posts.utils import POSTS_ON_PAGE, CountedPaginator
+
+    posts = Post.objects.select_related('author', 'group')
+    count = site_posts_count()
+    last = -(-count // POSTS_ON_PAGE)
+    rows = []
+    for number in (2, last // 2, last):
+        for name, feed in (
+            ('offset', None), ('boundary', (PostCounter.SITE, 0))
+        ):
+            paginator = CountedPaginator(
+                posts, POSTS_ON_PAGE, count=count, feed=feed
+            )
+            rows.append((
+                f'page {number} {name}',
+                measure(lambda: list(paginator.page(number)), args.repeat),
+            ))
+    print_table(f'Страницы главной ленты, постов: {count}', rows)
+
+
+if __name__ == '__main__':
+    main()
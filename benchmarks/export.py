@@ -0,0 +1,49 @@
+"""Потоковая выгрузка: время до первого байта, скорость и пик памяти.
+
+    python -m benchmarks.export --posts 10000000
+"""
+import argparse
+import time
+import tracemalloc
+
+from benchmarks.common import seed_posts, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--posts', type=int, default=10000000)
+    parser.add_argument('--format', default='jsonl')
+    parser.add_argument(
+        '--trace-memory', action='store_true',
+        help='Замерить пик памяти (tracemalloc заметно замедляет выгрузку).',
+    )
+    args = parser.parse_args()
+
+    setup_django()
+    seed_posts(args.posts)
+
+    from posts.export import RENDERERS, export_rows
+
+    if args.trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    chunks = RENDERERS[args.format](export_rows())
+    size = len(next(chunks).encode())
+    first_byte = time.perf_counter() - started
+    rows = 1
+    for chunk in chunks:
+        size += len(chunk.encode())
+        rows += 1
+    total = time.perf_counter() - started
+    print(f'Выгрузка {args.format}, постов: {args.posts}')
+    print(f'первый байт: {first_byte * 1000:.1f} мс')
+    print(f'всего: {total:.1f} с, {rows / total:.0f} строк/с, '
+          f'{size / 2 ** 20:.0f} МБ')
+    if args.trace_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f'пик памяти Python: {peak / 2 ** 20:.1f} МБ')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""JSON-лента против HTML-страниц тех же лент, запросов в секунду.
+
+Оба клиента анонимные, как мобильные приложения. HTML меряется
+с выключенным кешем страниц, карточки берутся из кеша фрагментов.
+
+    python -m benchmarks.feed_api --posts 100000
+"""
+import argparse
+
+from benchmarks.common import measure, print_table, seed_posts, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--posts', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    setup_django()
+    seed_posts(args.posts)
+
+    from django.conf import settings
+    from django.test import Client
+
+    from posts.models import Group, User
+
+    settings.PAGE_CACHE_TIMEOUT = 0
+
+    author = User.objects.filter(username__startswith='bench').first()
+    group = Group.objects.filter(slug__startswith='bench-').first()
+    client = Client()
+    rows = []
+    speedups = []
+    for name, html_url, json_url in (
+        ('index', '/', '/api/posts/'),
+        ('group', f'/group/{group.slug}/', f'/api/group/{group.slug}/'),
+        ('profile', f'/profile/{author.username}/',
+         f'/api/profile/{author.username}/'),
+    ):
+        html = measure(lambda: client.get(html_url).content, args.repeat)
+        api = measure(
+            lambda: b''.join(client.get(json_url).streaming_content),
+            args.repeat,
+        )
+        rows.extend(((f'{name} html', html), (f'{name} json', api)))
+        speedups.append(
+            (name, 1000 / html['mean'], 1000 / api['mean'])
+        )
+    print_table(f'Ленты, постов: {args.posts}', rows)
+    for name, html_rps, api_rps in speedups:
+        print(
+            f'{name}: html {html_rps:.0f} rps, json {api_rps:.0f} rps, '
+            f'x{api_rps / html_rps:.1f}'
+        )
+
+
+if __name__ == '__main__':
+    main()
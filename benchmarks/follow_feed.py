@@ -0,0 +1,91 @@
+"""Лента подписок: выборка по IN против разосланной ленты.
+
+Для читателей с разным числом подписок меряется первая страница
+ленты и страница по курсору. Вариант «популярные» читает часть
+авторов из их лент, как авторов с большим числом подписчиков.
+
+    python -m benchmarks.follow_feed --posts 300000
+"""
+import argparse
+
+from benchmarks.common import measure, print_table, seed_posts, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--posts', type=int, default=300000)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--popular', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    seed_posts(args.posts)
+
+    from django.test import RequestFactory
+
+    from posts import timeline
+    from posts.models import Follow, Post, TimelineEntry, User
+    from posts.utils import cursor_pagination, encode_cursor
+
+    authors = list(
+        User.objects.filter(username__startswith='bench')
+        .order_by('id').values_list('id', flat=True)
+    )
+    factory = RequestFactory()
+    rows = []
+    for follows in (10, 100, len(authors)):
+        reader, _ = User.objects.get_or_create(
+            username=f'reader{follows}', defaults={'password': '!'}
+        )
+        if not Follow.objects.filter(user=reader).exists():
+            Follow.objects.bulk_create(
+                Follow(user=reader, author_id=author_id)
+                for author_id in authors[:follows]
+            )
+            for author_id in authors[:follows]:
+                timeline.backfill(reader.id, author_id)
+        naive = Post.objects.select_related('author', 'group').filter(
+            author__following__user=reader
+        )
+        middle = naive.order_by('-pub_date', '-id')[
+            naive.count() // 2
+        ]
+        for name, params in (
+            ('first', {}), ('cursor', {'after': encode_cursor(middle)})
+        ):
+            request = factory.get('/follow/', params)
+            rows.append((
+                f'{follows} follows {name} IN',
+                measure(
+                    lambda: cursor_pagination(request, naive), args.repeat
+                ),
+            ))
+            rows.append((
+                f'{follows} follows {name} timeline',
+                measure(
+                    lambda: timeline.follow_page(request, reader),
+                    args.repeat,
+                ),
+            ))
+        if follows == len(authors):
+            popular = authors[:args.popular]
+            Post.objects.filter(author_id__in=popular).update(fan_out=False)
+            TimelineEntry.objects.filter(
+                user=reader, post__author_id__in=popular
+            ).delete()
+            request = factory.get('/follow/')
+            rows.append((
+                f'{follows} follows, {args.popular} popular',
+                measure(
+                    lambda: timeline.follow_page(request, reader),
+                    args.repeat,
+                ),
+            ))
+            Post.objects.filter(author_id__in=popular).update(fan_out=True)
+            for author_id in popular:
+                timeline.backfill(reader.id, author_id)
+    print_table(f'Лента подписок, постов: {args.posts}', rows)
+
+
+if __name__ == '__main__':
+    main()
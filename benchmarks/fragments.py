@@ -0,0 +1,65 @@
+"""Шаг бесконечной ленты: фрагмент карточек против полной страницы.
+
+Обе стороны листают одну и ту же ленту одним курсором, анонимно,
+с выключенным кешем страниц.
+
+    python -m benchmarks.fragments --posts 100000
+"""
+import argparse
+
+from benchmarks.common import measure, print_table, seed_posts, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--posts', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    setup_django()
+    seed_posts(args.posts)
+
+    from django.conf import settings
+    from django.test import Client
+
+    from posts.models import Group, Post, User
+    from posts.utils import encode_cursor
+
+    settings.PAGE_CACHE_TIMEOUT = 0
+
+    author = User.objects.filter(username__startswith='bench').first()
+    group = Group.objects.filter(slug__startswith='bench-').first()
+    client = Client()
+    rows = []
+    sizes = []
+    for name, page_url, fragment_url, posts in (
+        ('index', '/', '/fragments/posts/', Post.objects.all()),
+        ('group', f'/group/{group.slug}/', f'/fragments/group/{group.slug}/',
+         group.posts.all()),
+        ('profile', f'/profile/{author.username}/',
+         f'/fragments/profile/{author.username}/', author.posts.all()),
+    ):
+        params = {'after': encode_cursor(posts[15])}
+        page = measure(lambda: client.get(page_url, params), args.repeat)
+        fragment = measure(
+            lambda: client.get(fragment_url, params), args.repeat
+        )
+        rows.extend(
+            ((f'{name} page', page), (f'{name} fragment', fragment))
+        )
+        sizes.append((
+            name,
+            len(client.get(page_url, params).content),
+            len(client.get(fragment_url, params).content),
+            page['mean'] / fragment['mean'],
+        ))
+    print_table(f'Шаг ленты, постов: {args.posts}', rows)
+    for name, page_size, fragment_size, speedup in sizes:
+        print(
+            f'{name}: page {page_size} B, fragment {fragment_size} B '
+            f'({fragment_size / page_size:.0%}), x{speedup:.1f} faster'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""Поиск по постам: FTS5-индекс против LIKE '%q%' на больших объемах.
+
+    python -m benchmarks.search --posts 1000000
+"""
+import argparse
+
+from benchmarks.common import (WORDS, measure, print_table, seed_posts,
+                               setup_django)
+
+QUERIES = (
+    WORDS[0],
+    WORDS[50],
+    WORDS[4000],
+    f'{WORDS[1]} {WORDS[20]}',
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--posts', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+    seed_posts(args.posts)
+
+    from posts.models import Post
+    from posts.search import search_posts
+    from posts.utils import POSTS_ON_PAGE
+
+    rows = []
+    for query in QUERIES:
+        fts = search_posts(query)
+        like = Post.objects.all()
+        for word in query.split():
+            like = like.filter(text__icontains=word)
+        rows.extend((
+            (f'fts  "{query}" page', measure(
+                lambda: list(fts[:POSTS_ON_PAGE]), args.repeat
+            )),
+            (f'like "{query}" page', measure(
+                lambda: list(like[:POSTS_ON_PAGE]), args.repeat
+            )),
+            (f'fts  "{query}" count', measure(fts.count, args.repeat)),
+            (f'like "{query}" count', measure(like.count, args.repeat)),
+        ))
+    print_table(f'Поиск, постов: {args.posts}', rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""Накладные расходы ServerTimingMiddleware на страницах лент.
+
+Клиенты без middleware и с ним меряются по очереди в несколько
+раундов, в таблицу идет лучший раунд каждого.
+
+    python -m benchmarks.server_timing --posts 100000
+"""
+import argparse
+
+from benchmarks.common import measure, print_table, seed_posts, setup_django
+
+MIDDLEWARE = 'core.middleware.server_timing.ServerTimingMiddleware'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--posts', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('--rounds', type=int, default=3)
+    args = parser.parse_args()
+
+    setup_django()
+    seed_posts(args.posts)
+
+    from django.conf import settings
+    from django.test import Client
+
+    from posts.models import Group, User
+
+    settings.PAGE_CACHE_TIMEOUT = 0
+    settings.SERVER_TIMING = True
+    author = User.objects.filter(username__startswith='bench').first()
+    group = Group.objects.filter(slug__startswith='bench-').first()
+    urls = ('/', f'/group/{group.slug}/', f'/profile/{author.username}/')
+    middleware = list(settings.MIDDLEWARE)
+    clients = {}
+    for name, enabled in (('off', False), ('on', True)):
+        settings.MIDDLEWARE = [
+            item for item in middleware if enabled or item != MIDDLEWARE
+        ]
+        clients[name] = Client()
+        clients[name].get('/')
+    settings.MIDDLEWARE = middleware
+    rows = []
+    results = {}
+    for url in urls:
+        for _ in range(args.rounds):
+            for name, client in clients.items():
+                result = measure(lambda: client.get(url), args.repeat)
+                best = results.get((url, name))
+                if best is None or result['mean'] < best['mean']:
+                    results[url, name] = result
+        rows.extend(
+            (f'{url} {name}', results[url, name]) for name in clients
+        )
+    print_table('Server-Timing', rows)
+    for url in urls:
+        off, on = results[url, 'off']['mean'], results[url, 'on']['mean']
+        print(f'{url}: {on - off:+.2f} ms ({(on - off) / off:+.1%})')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,232 @@
+"""Все страницы posts и users на базах от 10^3 до 10^6 постов.
+
+Для каждой страницы меряются перцентили времени, число SQL-запросов
+и размер ответа. Результат сравнивается с benchmarks/baseline.json:
+рост медианы или размера больше порога, как и любой рост числа
+запросов, завершает запуск с кодом 1. Время в baseline зависит
+от машины, поэтому baseline снимается там же, где идет сравнение.
+
+    python -m benchmarks.views --sizes 1000 10000 100000 1000000
+    python -m benchmarks.views --save-baseline
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+
+from benchmarks.common import (BASE_DIR, WORDS, measure, print_table,
+                               seed_posts, setup_django, use_database)
+
+BASELINE = os.path.join(BASE_DIR, 'benchmarks', 'baseline.json')
+DEFAULT_SIZES = (1000, 10000, 100000)
+# Выход сбрасывает сессию, а сброс пароля требует токен из письма.
+SKIP = {'users:logout', 'users:password_reset_confirm'}
+# Разница меньше этой считается шумом, сколько бы процентов она ни была.
+NOISE_MS = 2.0
+
+
+def database(size):
+    return os.path.join(tempfile.gettempdir(), f'yatube_bench_{size}.sqlite3')
+
+
+def view_urls(author, group, post):
+    """Адрес и параметры для каждого именованного URL posts и users."""
+    from django.urls import reverse
+
+    from posts.urls import urlpatterns as posts_patterns
+    from users.urls import urlpatterns as users_patterns
+
+    values = {
+        'slug': group.slug,
+        'username': author.username,
+        'post_id': post.id,
+    }
+    params = {
+        'posts:search': {'q': WORDS[0]},
+        'posts:export': {'author': author.username},
+    }
+    for namespace, patterns in (
+        ('posts', posts_patterns), ('users', users_patterns)
+    ):
+        for pattern in patterns:
+            name = f'{namespace}:{pattern.name}'
+            if name in SKIP:
+                continue
+            kwargs = {
+                key: values[key] for key in pattern.pattern.converters
+            }
+            yield name, reverse(name, kwargs=kwargs), params.get(name, {})
+
+
+def prepare(size):
+    """Наполняет базу size постами и возвращает клиент и адреса.
+
+    Клиент вошел под самым активным автором, группа — самая большая.
+    """
+    from django.test import Client
+
+    from posts.models import Group, Post, PostCounter, User
+
+    use_database(database(size))
+    seed_posts(
+        size,
+        authors=max(10, min(10000, size // 100)),
+        groups=max(5, min(1000, size // 1000)),
+    )
+    top = PostCounter.objects.order_by('-value')
+    author = User.objects.get(
+        pk=top.filter(scope=PostCounter.AUTHOR).first().object_id
+    )
+    group = Group.objects.get(
+        pk=top.filter(scope=PostCounter.GROUP).first().object_id
+    )
+    post = Post.objects.filter(author=author).first()
+    client = Client()
+    client.force_login(author)
+    return client, list(view_urls(author, group, post))
+
+
+def fetch(client, url, params):
+    response = client.get(url, params)
+    if response.streaming:
+        return b''.join(response.streaming_content)
+    return response.content
+
+
+def inspect(client, urls):
+    """Число запросов и размер ответа каждой страницы."""
+    from django.db import connection
+
+    results = {}
+    for name, url, params in urls:
+        queries = []
+        with connection.execute_wrapper(
+            lambda execute, *args: queries.append(1) or execute(*args)
+        ):
+            body = fetch(client, url, params)
+        results[name] = {'queries': len(queries), 'bytes': len(body)}
+    return results
+
+
+def timings(client, urls, repeat, rounds):
+    """Перцентили лучшего из rounds кругов по всем страницам.
+
+    Круги чередуются, поэтому фоновая нагрузка на машину
+    реже выглядит как регрессия одной страницы.
+    """
+    best = {}
+    for _ in range(rounds):
+        for name, url, params in urls:
+            result = measure(lambda: fetch(client, url, params), repeat)
+            if name not in best or result['p50'] < best[name]['p50']:
+                best[name] = result
+    return best
+
+
+def slower(result, base, threshold):
+    return (
+        result['p50'] > base['p50'] * (1 + threshold)
+        and result['p50'] - base['p50'] > NOISE_MS
+    )
+
+
+def compare(size, views, baseline, threshold, bytes_threshold):
+    """Регрессии страниц одного размера базы: строки для отчета."""
+    problems = []
+    for name, result in views.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if slower(result, base, threshold):
+            problems.append(
+                f'{size} {name}: p50 {base["p50"]:.2f} -> '
+                f'{result["p50"]:.2f} ms'
+            )
+        if result['queries'] > base['queries']:
+            problems.append(
+                f'{size} {name}: запросов {base["queries"]} -> '
+                f'{result["queries"]}'
+            )
+        if result['bytes'] > base['bytes'] * (1 + bytes_threshold):
+            problems.append(
+                f'{size} {name}: байт {base["bytes"]} -> {result["bytes"]}'
+            )
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES)
+    )
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument(
+        '--threshold', type=float, default=0.5,
+        help='Допустимый рост медианы времени, доля.',
+    )
+    parser.add_argument(
+        '--bytes-threshold', type=float, default=0.1,
+        help='Допустимый рост размера ответа, доля.',
+    )
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--save-baseline', action='store_true')
+    args = parser.parse_args()
+
+    baseline = {}
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+    setup_django(database(args.sizes[0]))
+    # Медленные запросы здесь ожидаемы, журнал только мешает таблице.
+    logging.getLogger('yatube.performance').setLevel(logging.ERROR)
+
+    results = {}
+    problems = []
+    for size in args.sizes:
+        client, urls = prepare(size)
+        views = inspect(client, urls)
+        for name, result in timings(
+            client, urls, args.repeat, args.rounds
+        ).items():
+            views[name].update(result)
+        base = baseline.get(str(size), {})
+        # Медленная страница перемеряется: в регрессии остаются только
+        # те, что медленны дважды подряд.
+        suspects = [
+            (name, url, params) for name, url, params in urls
+            if name in base and slower(views[name], base[name], args.threshold)
+        ]
+        for name, result in timings(
+            client, suspects, args.repeat, args.rounds
+        ).items():
+            if result['p50'] < views[name]['p50']:
+                views[name].update(result)
+        results[str(size)] = views
+        problems += compare(
+            size, views, base, args.threshold, args.bytes_threshold
+        )
+        print_table(f'Страницы, постов: {size}', [
+            (f'{name} q={result["queries"]} {result["bytes"]}B', result)
+            for name, result in views.items()
+        ])
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as baseline_file:
+            json.dump(results, baseline_file, indent=2, sort_keys=True)
+        print(f'Baseline сохранен: {args.baseline}')
+        return
+    if not baseline:
+        print('Baseline не найден, сравнение пропущено.')
+        return
+    for problem in problems:
+        print(f'РЕГРЕССИЯ {problem}')
+    if problems:
+        sys.exit(1)
+    print('Регрессий нет.')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""Всплеск записей постов из потоков одного процесса: сразу и через очередь.
+
+Потоки без пауз создают посты через post_create. Сначала каждая запись
+идет своей транзакцией, как раньше, затем с WRITE_QUEUE через групповой
+коммит core.write_queue. Задержка — время ответа post_create, упавшие
+запросы, например с "database is locked", считаются в errors.
+
+    python -m benchmarks.write_queue --threads 8 --seconds 10
+"""
+import argparse
+import logging
+import statistics
+import threading
+import time
+
+from benchmarks.common import seed_posts, setup_django
+from benchmarks.concurrency import percentile
+
+
+def worker(number, deadline, timings, errors):
+    from django.db import connection
+    from django.test import Client
+
+    from posts.models import User
+
+    client = Client()
+    client.force_login(User.objects.get(username=f'bench{number}'))
+    while time.time() < deadline:
+        started = time.perf_counter()
+        try:
+            client.post('/create/', {'text': f'Всплеск {number}'})
+        except Exception:
+            errors.append(number)
+            continue
+        timings.append((time.perf_counter() - started) * 1000)
+    connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--posts', type=int, default=100000)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=10)
+    args = parser.parse_args()
+
+    setup_django()
+    seed_posts(args.posts)
+
+    from django.conf import settings
+
+    from core.write_queue import stats
+
+    settings.PAGE_CACHE_TIMEOUT = 0
+    logging.getLogger('yatube.performance').setLevel(logging.ERROR)
+    print(
+        f'{"mode":<8}{"writes/s":>10}{"errors":>8}{"p50":>9}{"p99":>9}'
+        f'{"batch":>8}  ms'
+    )
+    for mode, enabled in (('direct', False), ('queue', True)):
+        settings.WRITE_QUEUE = enabled
+        batches, writes = stats['batches'], stats['writes']
+        timings, errors = [], []
+        deadline = time.time() + args.seconds
+        threads = [
+            threading.Thread(
+                target=worker, args=(number, deadline, timings, errors)
+            )
+            for number in range(args.threads)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        batch = (stats['writes'] - writes) / max(
+            stats['batches'] - batches, 1
+        )
+        print(
+            f'{mode:<8}{len(timings) / args.seconds:>10.0f}{len(errors):>8}'
+            f'{statistics.median(timings) if timings else 0:>9.2f}'
+            f'{percentile(timings, 0.99):>9.2f}{batch:>8.1f}'
+        )
+
+
+if __name__ == '__main__':
+    main()
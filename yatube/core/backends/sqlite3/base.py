@@ -0,0 +1,42 @@
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """SQLite с режимом начала транзакций из OPTIONS['transaction_mode'].
+
+    Транзакция с обычным BEGIN, которая сначала читает, а потом пишет,
+    получает "database is locked" сразу, не дожидаясь busy_timeout,
+    если другой процесс успел начать запись. С IMMEDIATE блокировка
+    записи берется в начале транзакции и ожидание работает.
+
+    С OPTIONS['foreign_keys'] = False внешние ключи не проверяются:
+    так работают шарды постов, где нет таблиц авторов и групп.
+    """
+
+    @property
+    def foreign_keys(self):
+        return self.settings_dict['OPTIONS'].get('foreign_keys', True)
+
+    def get_connection_params(self):
+        kwargs = super().get_connection_params()
+        kwargs.pop('transaction_mode', None)
+        kwargs.pop('foreign_keys', None)
+        return kwargs
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        if not self.foreign_keys:
+            conn.execute('PRAGMA foreign_keys = OFF')
+        return conn
+
+    def enable_constraint_checking(self):
+        if self.foreign_keys:
+            super().enable_constraint_checking()
+
+    def check_constraints(self, table_names=None):
+        if self.foreign_keys:
+            super().check_constraints(table_names)
+
+    def _start_transaction_under_autocommit(self):
+        mode = self.settings_dict['OPTIONS'].get('transaction_mode')
+        self.cursor().execute(f'BEGIN {mode}' if mode else 'BEGIN')
@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.replicas import copy_to_replica
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует основную базу SQLite во все реплики из DATABASE_REPLICAS. '
+        'Для локальной разработки: в работе реплики обновляет репликация.'
+    )
+
+    def handle(self, *args, **options):
+        for alias in settings.DATABASE_REPLICAS:
+            copy_to_replica(alias)
+            self.stdout.write(f'Скопировано в {alias}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Реплик обновлено: {len(settings.DATABASE_REPLICAS)}'
+        ))
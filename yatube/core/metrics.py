@@ -0,0 +1,239 @@
+"""Метрики приложения в текстовом формате Prometheus.
+
+Каждый процесс пишет свои значения в собственный файл в METRICS_DIR,
+отображенный в память: приращение — это запись восьми байт под
+локом процесса. /metrics читает и складывает файлы всех процессов.
+"""
+import glob
+import json
+import mmap
+import os
+import struct
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+from functools import lru_cache
+
+from django.conf import settings
+
+COUNTER = 'counter'
+HISTOGRAM = 'histogram'
+
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+SIZE_BUCKETS = (
+    1024, 4096, 16384, 65536, 262144, 1048576, 4194304,
+)
+BATCH_BUCKETS = (1, 2, 5, 10, 20, 50, 100)
+
+METRICS = {
+    'yatube_request_duration_seconds': (
+        HISTOGRAM, 'Время ответа view, секунды.', LATENCY_BUCKETS,
+    ),
+    'yatube_response_size_bytes': (
+        HISTOGRAM, 'Размер тела ответа, байты.', SIZE_BUCKETS,
+    ),
+    'yatube_requests_total': (COUNTER, 'Число ответов по статусам.', None),
+    'yatube_db_queries_total': (COUNTER, 'Число SQL-запросов.', None),
+    'yatube_db_query_seconds_total': (
+        COUNTER, 'Суммарное время SQL-запросов, секунды.', None,
+    ),
+    'yatube_cache_requests_total': (
+        COUNTER, 'Обращения к кешу: попадания и промахи.', None,
+    ),
+    'yatube_write_batch_size': (
+        HISTOGRAM, 'Записей в одном групповом коммите.', BATCH_BUCKETS,
+    ),
+}
+
+HEADER = struct.Struct('<Q')
+VALUE = struct.Struct('<d')
+INITIAL_SIZE = 1 << 16
+
+
+class ValuesFile:
+    """Значения метрик одного процесса в файле, отображенном в память.
+
+    Запись: длина ключа, ключ с выравниванием до 8 байт и double.
+    В заголовке — число занятых байт, он обновляется после записи,
+    поэтому читатель никогда не видит недописанный ключ.
+    """
+
+    owner = None
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.file = open(path, 'a+b')
+        if os.fstat(self.file.fileno()).st_size < INITIAL_SIZE:
+            self.file.truncate(INITIAL_SIZE)
+        self.map = mmap.mmap(self.file.fileno(), 0)
+        self.used = HEADER.unpack_from(self.map)[0] or HEADER.size
+        self.positions = {
+            key: position for key, position, _ in read_entries(self.map)
+        }
+
+    def add(self, key, amount):
+        with self.lock:
+            position = self.positions.get(key)
+            if position is None:
+                position = self._append(key)
+            value = VALUE.unpack_from(self.map, position)[0]
+            VALUE.pack_into(self.map, position, value + amount)
+
+    def _append(self, key):
+        encoded = key.encode()
+        padded = len(encoded) + (-(4 + len(encoded)) % 8)
+        size = 4 + padded + VALUE.size
+        if self.used + size > len(self.map):
+            self._grow(self.used + size)
+        struct.pack_into(
+            f'<I{padded}s', self.map, self.used, len(encoded), encoded
+        )
+        position = self.used + 4 + padded
+        VALUE.pack_into(self.map, position, 0.0)
+        self.used += size
+        HEADER.pack_into(self.map, 0, self.used)
+        self.positions[key] = position
+        return position
+
+    def _grow(self, needed):
+        size = len(self.map)
+        while size < needed:
+            size *= 2
+        self.map.close()
+        self.file.truncate(size)
+        self.map = mmap.mmap(self.file.fileno(), 0)
+
+
+def read_entries(data):
+    used = HEADER.unpack_from(data)[0]
+    offset = HEADER.size
+    while offset < used:
+        length = struct.unpack_from('<I', data, offset)[0]
+        key = bytes(data[offset + 4:offset + 4 + length]).decode()
+        position = offset + 4 + length + (-(4 + length) % 8)
+        yield key, position, VALUE.unpack_from(data, position)[0]
+        offset = position + VALUE.size
+
+
+_values = None
+_values_lock = threading.Lock()
+
+
+def values_file():
+    """Файл текущего процесса; после fork заводится новый."""
+    global _values
+    pid = os.getpid()
+    directory = settings.METRICS_DIR
+    values = _values
+    if values is not None and values.owner == (pid, directory):
+        return values
+    with _values_lock:
+        if _values is None or _values.owner != (pid, directory):
+            os.makedirs(directory, exist_ok=True)
+            _values = ValuesFile(
+                os.path.join(directory, f'metrics_{pid}.db')
+            )
+            _values.owner = (pid, directory)
+        return _values
+
+
+@lru_cache(maxsize=4096)
+def _key(name, labels):
+    return json.dumps([name, sorted(labels)])
+
+
+def _labels(labels):
+    return tuple((name, str(value)) for name, value in labels.items())
+
+
+def inc(name, amount=1, **labels):
+    values_file().add(_key(name, _labels(labels)), amount)
+
+
+def observe(name, value, **labels):
+    """Добавляет наблюдение в гистограмму: корзину, сумму и счетчик."""
+    buckets = METRICS[name][2]
+    values = values_file()
+    labels = _labels(labels)
+    index = bisect_left(buckets, value)
+    le = repr(float(buckets[index])) if index < len(buckets) else '+Inf'
+    values.add(_key(f'{name}_bucket', labels + (('le', le),)), 1)
+    values.add(_key(f'{name}_sum', labels), value)
+    values.add(_key(f'{name}_count', labels), 1)
+
+
+def collect(directory=None):
+    """Складывает значения из файлов всех процессов."""
+    totals = defaultdict(float)
+    pattern = os.path.join(directory or settings.METRICS_DIR, 'metrics_*.db')
+    for path in glob.glob(pattern):
+        with open(path, 'rb') as metrics_file:
+            data = metrics_file.read()
+        if len(data) < HEADER.size:
+            continue
+        for key, _, value in read_entries(data):
+            totals[key] += value
+    return totals
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    pairs = ','.join(
+        '{}="{}"'.format(
+            name,
+            str(value).replace('\\', r'\\').replace('"', r'\"'),
+        )
+        for name, value in labels
+    )
+    return '{' + pairs + '}'
+
+
+def _format_value(value):
+    return str(int(value)) if value == int(value) else repr(value)
+
+
+def render():
+    """Текст в формате exposition Prometheus."""
+    samples = defaultdict(list)
+    for key, value in collect().items():
+        name, labels = json.loads(key)
+        samples[name].append((tuple(map(tuple, labels)), value))
+    lines = []
+    for name, (kind, help_text, buckets) in METRICS.items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        if kind == COUNTER:
+            for labels, value in sorted(samples[name]):
+                lines.append(
+                    f'{name}{_format_labels(labels)} {_format_value(value)}'
+                )
+            continue
+        bounds = [repr(float(bound)) for bound in buckets] + ['+Inf']
+        counts = defaultdict(dict)
+        for labels, value in samples[f'{name}_bucket']:
+            labels = dict(labels)
+            le = labels.pop('le')
+            counts[tuple(sorted(labels.items()))][le] = value
+        sums = dict(samples[f'{name}_sum'])
+        for labels, count in sorted(samples[f'{name}_count']):
+            cumulative = 0
+            for bound in bounds:
+                cumulative += counts[labels].get(bound, 0)
+                bucket_labels = labels + (('le', bound),)
+                lines.append(
+                    f'{name}_bucket{_format_labels(bucket_labels)} '
+                    f'{_format_value(cumulative)}'
+                )
+            lines.append(
+                f'{name}_sum{_format_labels(labels)} '
+                f'{_format_value(sums.get(labels, 0))}'
+            )
+            lines.append(
+                f'{name}_count{_format_labels(labels)} '
+                f'{_format_value(count)}'
+            )
+    return '\n'.join(lines) + '\n'
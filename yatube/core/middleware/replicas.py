@@ -0,0 +1,31 @@
+import time
+
+from django.conf import settings
+
+from core.replicas import PRIMARY_COOKIE, Routing, current
+
+
+class ReplicaMiddleware:
+    """Заводит маршрутизацию запроса по репликам.
+
+    Запрос, записавший что-то в базу, ставит cookie: пока она жива,
+    клиент читает из основной базы.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        routing = Routing()
+        token = current.set(routing)
+        try:
+            response = self.get_response(request)
+        finally:
+            current.reset(token)
+        if routing.wrote and settings.DATABASE_REPLICAS:
+            lag = settings.REPLICA_LAG_SECONDS
+            response.set_cookie(
+                PRIMARY_COOKIE, f'{time.time() + lag:.3f}', max_age=lag,
+                httponly=True, samesite='Lax',
+            )
+        return response
@@ -0,0 +1,163 @@
+import json
+import logging
+import time
+from collections import defaultdict
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from django.template.base import Template
+
+from core import metrics
+
+logger = logging.getLogger('yatube.performance')
+
+# Замеры текущего запроса; вне запроса шаблоны рендерятся без учета.
+current = ContextVar('server_timing', default=None)
+
+TEMPLATES_IN_HEADER = 5
+
+
+class Timings:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.view_started = None
+        self.queries = 0
+        self.db = 0.0
+        self.templates = defaultdict(float)
+
+    def query(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db += time.perf_counter() - started
+            self.queries += 1
+
+
+def instrument_templates():
+    """Оборачивает Template.render, чтобы мерить каждый шаблон и include.
+
+    Время шаблона включает вложенные в него include.
+    """
+    if getattr(Template.render, 'server_timing', False):
+        return
+    render = Template.render
+
+    def timed_render(self, context):
+        timings = current.get()
+        if timings is None:
+            return render(self, context)
+        started = time.perf_counter()
+        try:
+            return render(self, context)
+        finally:
+            # Имя идет в кавычках заголовка, поэтому без кавычек.
+            name = (self.name or '<string>').replace('"', '')
+            timings.templates[name] += time.perf_counter() - started
+
+    timed_render.server_timing = True
+    Template.render = timed_render
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 2)
+
+
+def record_metrics(request, response, timings, total):
+    """Пишет замеры запроса в метрики /metrics для view из METRICS_NAMESPACES.
+
+    Остальные адреса, включая админку и саму /metrics, не учитываются.
+    """
+    match = request.resolver_match
+    if match is None or match.namespace not in settings.METRICS_NAMESPACES:
+        return
+    view = match.view_name
+    metrics.observe('yatube_request_duration_seconds', total, view=view)
+    metrics.inc(
+        'yatube_requests_total', view=view, status=response.status_code
+    )
+    metrics.inc('yatube_db_queries_total', timings.queries, view=view)
+    metrics.inc('yatube_db_query_seconds_total', timings.db, view=view)
+    if not response.streaming:
+        metrics.observe(
+            'yatube_response_size_bytes', len(response.content), view=view
+        )
+
+
+def show_header(request):
+    """Заголовок раскрывает устройство сайта: всем только с SERVER_TIMING."""
+    if settings.SERVER_TIMING:
+        return True
+    user = getattr(request, 'user', None)
+    return user is not None and user.is_staff
+
+
+class ServerTimingMiddleware:
+    """Отдает заголовок Server-Timing: SQL, шаблоны, view и весь запрос.
+
+    Без SERVER_TIMING заголовок видит только персонал. Те же замеры
+    идут в метрики /metrics. Запросы, превысившие SLOW_REQUEST_MS
+    или SLOW_REQUEST_QUERIES, пишутся в лог yatube.performance
+    одной JSON-строкой.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        instrument_templates()
+
+    def __call__(self, request):
+        timings = Timings()
+        token = current.set(timings)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(timings.query)
+                    )
+                response = self.get_response(request)
+        finally:
+            current.reset(token)
+        total = time.perf_counter() - timings.started
+        view = 0.0
+        if timings.view_started is not None:
+            view = time.perf_counter() - timings.view_started
+        templates = sorted(
+            timings.templates.items(), key=lambda item: -item[1]
+        )
+        if show_header(request):
+            response['Server-Timing'] = ', '.join([
+                f'db;dur={_ms(timings.db)};desc="{timings.queries} queries"',
+                *(
+                    f'tpl{i};dur={_ms(spent)};desc="{name}"'
+                    for i, (name, spent) in enumerate(
+                        templates[:TEMPLATES_IN_HEADER], 1
+                    )
+                ),
+                f'view;dur={_ms(view)}',
+                f'total;dur={_ms(total)}',
+            ])
+        record_metrics(request, response, timings, total)
+        if (
+            total * 1000 >= settings.SLOW_REQUEST_MS
+            or timings.queries >= settings.SLOW_REQUEST_QUERIES
+        ):
+            logger.warning(json.dumps({
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                'total_ms': _ms(total),
+                'view_ms': _ms(view),
+                'db_ms': _ms(timings.db),
+                'queries': timings.queries,
+                'templates': {
+                    name: _ms(spent) for name, spent in templates
+                },
+            }, ensure_ascii=False))
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        timings = current.get()
+        if timings is not None:
+            timings.view_started = time.perf_counter()
@@ -0,0 +1,88 @@
+"""Бюджеты SQL-запросов для view и поиск повторяющихся запросов (N+1).
+
+В тестах нарушение бюджета поднимает QueryBudgetExceeded, в работе
+пишется в лог yatube.performance.
+"""
+import json
+import logging
+import re
+from collections import Counter
+from contextlib import ExitStack
+from functools import wraps
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger('yatube.performance')
+
+# Сколько раз подряд на запрос может выполниться SQL одной формы.
+MAX_REPEATS = 5
+
+IN_LIST_RE = re.compile(r'\(%s(?:, %s)+\)')
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+def query_shape(sql):
+    """Текст запроса без параметров; списки IN любой длины совпадают."""
+    return IN_LIST_RE.sub('(%s...)', sql)
+
+
+class QueryLog:
+    def __init__(self):
+        self.shapes = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        self.shapes[query_shape(sql)] += 1
+        return execute(sql, params, many, context)
+
+    @property
+    def count(self):
+        return sum(self.shapes.values())
+
+
+def query_budget(max_queries, max_repeats=MAX_REPEATS):
+    """Ограничивает число SQL-запросов view и повторы одной формы.
+
+    Учитываются запросы самой view и рендера ее TemplateResponse;
+    запросы при отдаче потокового ответа в бюджет не входят.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            log = QueryLog()
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(log))
+                response = view(request, *args, **kwargs)
+                if getattr(response, 'is_rendered', True) is False:
+                    response.render()
+            check(request, view, log, max_queries, max_repeats)
+            return response
+        wrapper.query_budget = (max_queries, max_repeats)
+        return wrapper
+    return decorator
+
+
+def check(request, view, log, max_queries, max_repeats):
+    problems = []
+    if log.count > max_queries:
+        problems.append(f'{log.count} запросов при бюджете {max_queries}')
+    shape, repeats = (log.shapes.most_common(1) or [('', 0)])[0]
+    if max_repeats is not None and repeats > max_repeats:
+        problems.append(f'{repeats} повторов запроса: {shape[:300]}')
+    if not problems:
+        return
+    match = request.resolver_match
+    name = match.view_name if match else getattr(view, '__name__', '')
+    if settings.QUERY_BUDGET_RAISE:
+        raise QueryBudgetExceeded(f'{name}: ' + '; '.join(problems))
+    logger.warning(json.dumps({
+        'view': name,
+        'path': request.path,
+        'queries': log.count,
+        'budget': max_queries,
+        'problems': problems,
+    }, ensure_ascii=False))
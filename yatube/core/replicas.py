@@ -0,0 +1,101 @@
+"""Чтение лент и постов с реплик базы, запись и свежие чтения — с основной.
+
+Реплики — алиасы из settings.DATABASE_REPLICAS. View с декоратором
+read_from_replica читают со случайной реплики. Если запрос что-то
+записал, ReplicaMiddleware ставит cookie, и следующие
+REPLICA_LAG_SECONDS запросы клиента читают из основной базы: так
+пользователь сразу видит свои изменения, пока реплики догоняют.
+"""
+import random
+import sqlite3
+import time
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+PRIMARY_COOKIE = 'read_primary_until'
+SAFE_METHODS = ('GET', 'HEAD')
+
+# Маршрутизация текущего запроса; вне запроса все идет в основную базу.
+current = ContextVar('replica_routing', default=None)
+
+
+class Routing:
+    def __init__(self):
+        self.replica = None
+        self.wrote = False
+
+
+def pinned(request):
+    """Клиент недавно писал и должен читать из основной базы."""
+    try:
+        until = float(request.COOKIES.get(PRIMARY_COOKIE, 0))
+    except ValueError:
+        return False
+    return until > time.time()
+
+
+def read_from_replica(view):
+    """Направляет чтения view на реплику, если клиент не закреплен."""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        routing = current.get()
+        if (
+            routing is None or not settings.DATABASE_REPLICAS
+            or request.method not in SAFE_METHODS or pinned(request)
+        ):
+            return view(request, *args, **kwargs)
+        routing.replica = random.choice(settings.DATABASE_REPLICAS)
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            routing.replica = None
+    return wrapper
+
+
+class ReplicaRouter:
+    """Чтение с реплики, выбранной read_from_replica, запись в основную.
+
+    После первой записи и внутри транзакции запрос читает из основной
+    базы, чтобы видеть собственные изменения.
+    """
+
+    def db_for_read(self, model, **hints):
+        routing = current.get()
+        if (
+            routing is None or routing.replica is None or routing.wrote
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return None
+        return routing.replica
+
+    def db_for_write(self, model, **hints):
+        routing = current.get()
+        if routing is not None:
+            routing.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        # Реплики — копии основной базы, схему получают вместе с данными.
+        return db not in settings.DATABASE_REPLICAS
+
+
+def copy_to_replica(alias):
+    """Копирует основную базу SQLite в файл реплики через backup API.
+
+    Для локальной разработки и тестов; в работе реплики обновляет
+    внешняя репликация.
+    """
+    primary = connections[DEFAULT_DB_ALIAS]
+    primary.ensure_connection()
+    connections[alias].close()
+    target = sqlite3.connect(connections[alias].settings_dict['NAME'])
+    try:
+        primary.connection.backup(target)
+    finally:
+        target.close()
@@ -0,0 +1,15 @@
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+
+
+class BudgetTestRunner(DiscoverRunner):
+    """Запускает тесты с падением на превышении бюджетов запросов."""
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.query_budget_raise = settings.QUERY_BUDGET_RAISE
+        settings.QUERY_BUDGET_RAISE = True
+
+    def teardown_test_environment(self, **kwargs):
+        settings.QUERY_BUDGET_RAISE = self.query_budget_raise
+        super().teardown_test_environment(**kwargs)
@@ -0,0 +1,80 @@
+import os
+import sqlite3
+import tempfile
+
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from core.backends.sqlite3.base import DatabaseWrapper
+from core.db import configure_sqlite
+
+
+class SqliteConnectionTest(TestCase):
+    def pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_pragmas_applied_on_connect(self):
+        """PRAGMA из настроек действуют на соединении тестовой базы."""
+        self.assertEqual(self.pragma('busy_timeout'), 5000)
+        self.assertEqual(self.pragma('synchronous'), 1)
+        self.assertEqual(self.pragma('cache_size'), -64000)
+
+    @override_settings(SQLITE_PRAGMAS={'cache_size': -1000})
+    def test_pragmas_come_from_settings(self):
+        """configure_sqlite берет PRAGMA из SQLITE_PRAGMAS."""
+        self.addCleanup(
+            connection.connection.execute,
+            f'PRAGMA cache_size = {self.pragma("cache_size")}',
+        )
+        configure_sqlite(None, connection)
+        self.assertEqual(self.pragma('cache_size'), -1000)
+
+
+class ImmediateTransactionTest(TestCase):
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(handle)
+        self.addCleanup(os.remove, self.path)
+
+    def wrapper(self, options):
+        settings_dict = dict(
+            connection.settings_dict, NAME=self.path, OPTIONS=options
+        )
+        wrapper = DatabaseWrapper(settings_dict, alias='immediate')
+        self.addCleanup(wrapper.close)
+        return wrapper
+
+    def write_locked(self):
+        other = sqlite3.connect(self.path, timeout=0, isolation_level=None)
+        try:
+            other.execute('BEGIN IMMEDIATE')
+        except sqlite3.OperationalError:
+            return True
+        finally:
+            other.close()
+        return False
+
+    def test_transaction_mode_immediate(self):
+        """С transaction_mode=IMMEDIATE транзакция сразу блокирует запись."""
+        wrapper = self.wrapper({'transaction_mode': 'IMMEDIATE'})
+        wrapper.ensure_connection()
+        wrapper._start_transaction_under_autocommit()
+        self.assertTrue(self.write_locked())
+
+    def test_default_transaction_is_deferred(self):
+        """Без transaction_mode транзакция начинается обычным BEGIN."""
+        wrapper = self.wrapper({})
+        wrapper.ensure_connection()
+        wrapper._start_transaction_under_autocommit()
+        self.assertFalse(self.write_locked())
+
+    def test_foreign_keys_can_be_disabled(self):
+        """С foreign_keys=False проверка ключей не включается обратно."""
+        wrapper = self.wrapper({'foreign_keys': False})
+        wrapper.ensure_connection()
+        wrapper.enable_constraint_checking()
+        with wrapper.cursor() as cursor:
+            cursor.execute('PRAGMA foreign_keys')
+            self.assertEqual(cursor.fetchone()[0], 0)
@@ -0,0 +1,109 @@
+import os
+import shutil
+import tempfile
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core import metrics
+
+METRICS_DIR = tempfile.mkdtemp()
+
+
+@override_settings(METRICS_DIR=METRICS_DIR)
+class MetricsTest(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(METRICS_DIR, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        for name in os.listdir(METRICS_DIR):
+            os.remove(os.path.join(METRICS_DIR, name))
+        metrics._values = None
+
+    def scrape(self):
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 200)
+        return response.content.decode().splitlines()
+
+    def test_views_are_measured(self):
+        """Ответы view попадают в гистограммы, счетчики SQL и кеша."""
+        for _ in range(2):
+            self.client.get(reverse('posts:index'))
+        self.client.get(reverse('about:author'))
+        lines = self.scrape()
+        for line in (
+            'yatube_request_duration_seconds_count{view="posts:index"} 2',
+            'yatube_request_duration_seconds_bucket'
+            '{view="posts:index",le="+Inf"} 2',
+            'yatube_requests_total{status="200",view="about:author"} 1',
+            'yatube_response_size_bytes_count{view="posts:index"} 2',
+            'yatube_cache_requests_total{cache="page",result="hit"} 1',
+            'yatube_cache_requests_total{cache="page",result="miss"} 1',
+            '# TYPE yatube_request_duration_seconds histogram',
+        ):
+            self.assertIn(line, lines)
+        self.assertTrue(any(
+            line.startswith('yatube_db_queries_total{view="posts:index"}')
+            for line in lines
+        ))
+        self.assertFalse(any('view="metrics"' in line for line in lines))
+
+    def test_processes_are_merged(self):
+        """Значения из файлов разных процессов складываются."""
+        metrics.inc('yatube_db_queries_total', 3, view='posts:index')
+        other = metrics.ValuesFile(os.path.join(METRICS_DIR, 'metrics_1.db'))
+        other.add(metrics._key(
+            'yatube_db_queries_total', (('view', 'posts:index'),)
+        ), 4)
+        self.assertIn(
+            'yatube_db_queries_total{view="posts:index"} 7', self.scrape()
+        )
+
+    def test_values_file_grows_and_reopens(self):
+        """Файл значений растет и перечитывается после перезапуска."""
+        path = os.path.join(METRICS_DIR, 'metrics_2.db')
+        values = metrics.ValuesFile(path)
+        for i in range(5000):
+            values.add(f'key-{i}', i)
+        values.add('key-1', 1)
+        reopened = metrics.ValuesFile(path)
+        reopened.add('key-4999', 1)
+        totals = metrics.collect(METRICS_DIR)
+        self.assertEqual(totals['key-1'], 2)
+        self.assertEqual(totals['key-4999'], 5000)
+        self.assertEqual(len(totals), 5000)
+
+    def test_metrics_hidden_from_other_hosts(self):
+        """Чужим адресам /metrics отвечает 404."""
+        response = self.client.get(
+            reverse('metrics'), REMOTE_ADDR='10.0.0.1'
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_metrics_hidden_behind_proxy(self):
+        """Через прокси без токена адрес 127.0.0.1 не доверенный."""
+        response = self.client.get(
+            reverse('metrics'), HTTP_X_FORWARDED_FOR='10.0.0.1'
+        )
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_metrics_token(self):
+        """С METRICS_TOKEN /metrics отдается только по токену."""
+        url = reverse('metrics')
+        for headers, status in (
+            ({}, 404),
+            ({'HTTP_AUTHORIZATION': 'Bearer wrong'}, 404),
+            ({
+                'HTTP_AUTHORIZATION': 'Bearer secret',
+                'HTTP_X_FORWARDED_FOR': '10.0.0.1',
+                'REMOTE_ADDR': '10.0.0.2',
+            }, 200),
+        ):
+            with self.subTest(headers=headers):
+                response = self.client.get(url, **headers)
+                self.assertEqual(response.status_code, status)
@@ -0,0 +1,65 @@
+import json
+
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from core.query_budget import QueryBudgetExceeded, query_budget, query_shape
+from posts.models import Post, User
+
+POSTS_COUNT = 10
+
+
+@query_budget(3)
+def with_select_related(request):
+    posts = Post.objects.select_related('author')
+    return HttpResponse(', '.join(post.author.username for post in posts))
+
+
+@query_budget(20)
+def with_lazy_authors(request):
+    posts = Post.objects.all()
+    return HttpResponse(', '.join(post.author.username for post in posts))
+
+
+class QueryBudgetTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        authors = [
+            User.objects.create_user(username=f'author{i}')
+            for i in range(POSTS_COUNT)
+        ]
+        Post.objects.bulk_create(
+            Post(author=author, text='Тестовый пост') for author in authors
+        )
+
+    def setUp(self):
+        self.request = RequestFactory().get('/')
+
+    def test_view_within_budget_passes(self):
+        """View в пределах бюджета отвечает как обычно."""
+        response = with_select_related(self.request)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(with_select_related.query_budget, (3, 5))
+
+    def test_repeated_queries_raise_in_tests(self):
+        """Повторы запроса одной формы (N+1) падают в тестах."""
+        with self.assertRaisesMessage(QueryBudgetExceeded, 'повторов'):
+            with_lazy_authors(self.request)
+
+    @override_settings(QUERY_BUDGET_RAISE=False)
+    def test_violation_is_logged_in_production(self):
+        """Без QUERY_BUDGET_RAISE нарушение пишется в лог."""
+        with self.assertLogs('yatube.performance', 'WARNING') as logs:
+            response = with_lazy_authors(self.request)
+        self.assertEqual(response.status_code, 200)
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['queries'], POSTS_COUNT + 1)
+        self.assertEqual(record['budget'], 20)
+
+    def test_query_shape_ignores_in_list_length(self):
+        """Списки IN разной длины дают одну форму запроса."""
+        self.assertEqual(
+            query_shape('SELECT 1 WHERE id IN (%s, %s, %s)'),
+            query_shape('SELECT 1 WHERE id IN (%s, %s)'),
+        )
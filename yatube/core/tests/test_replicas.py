@@ -0,0 +1,95 @@
+import os
+import tempfile
+
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+
+from core.replicas import (PRIMARY_COOKIE, ReplicaRouter, Routing,
+                           copy_to_replica, current)
+from posts.counters import site_posts_count
+from posts.models import Post, User
+
+REPLICA = 'replica'
+
+
+@override_settings(DATABASE_REPLICAS=[REPLICA])
+class ReplicaRoutingTest(TransactionTestCase):
+    """Реплика — локальная копия тестовой базы в файле SQLite.
+
+    TransactionTestCase: копия через backup API видит только
+    закоммиченные данные.
+    """
+
+    databases = {'default', REPLICA}
+
+    @classmethod
+    def setUpClass(cls):
+        handle, cls.path = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(handle)
+        connections.databases[REPLICA] = dict(
+            connections['default'].settings_dict, NAME=cls.path
+        )
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections[REPLICA].close()
+        del connections.databases[REPLICA]
+        delattr(connections._connections, REPLICA)
+        os.remove(cls.path)
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author')
+        Post.objects.create(author=self.author, text='Пост на реплике')
+        # Счетчик создается при первом чтении, а это запись в основную.
+        site_posts_count()
+        copy_to_replica(REPLICA)
+        Post.objects.create(author=self.author, text='Пост без реплики')
+
+    def test_feed_reads_from_replica(self):
+        """Лента читается с реплики, которая еще не догнала основную."""
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, 'Пост на реплике')
+        self.assertNotContains(response, 'Пост без реплики')
+        self.assertNotIn(PRIMARY_COOKIE, response.cookies)
+
+    def test_stale_page_is_not_cached_as_fresh(self):
+        """Страница с отстающей реплики кешируется под версией реплики."""
+        url = reverse('posts:index')
+        response = self.client.get(url)
+        self.assertNotContains(response, 'Пост без реплики')
+        copy_to_replica(REPLICA)
+        response = self.client.get(
+            url, HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        self.assertContains(response, 'Пост без реплики')
+
+    def test_reads_after_write_use_primary(self):
+        """После записи клиент видит свои изменения."""
+        self.client.force_login(self.author)
+        response = self.client.post(
+            reverse('posts:post_create'), {'text': 'Свежий пост'}
+        )
+        self.assertIn(PRIMARY_COOKIE, response.cookies)
+        response = self.client.get(
+            reverse('posts:profile', args=[self.author.username])
+        )
+        self.assertContains(response, 'Свежий пост')
+        self.assertContains(response, 'Пост без реплики')
+
+    def test_writes_and_transactions_use_primary(self):
+        """Запись и чтение внутри транзакции идут в основную базу."""
+        router = ReplicaRouter()
+        routing = Routing()
+        routing.replica = REPLICA
+        self.addCleanup(current.reset, current.set(routing))
+        self.assertEqual(router.db_for_read(Post), REPLICA)
+        with transaction.atomic():
+            self.assertIsNone(router.db_for_read(Post))
+        self.assertEqual(router.db_for_write(Post), 'default')
+        self.assertIsNone(router.db_for_read(Post))
+        self.assertFalse(router.allow_migrate(REPLICA, 'posts'))
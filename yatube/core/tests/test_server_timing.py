@@ -0,0 +1,71 @@
+import json
+import re
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Post, User
+
+METRIC_RE = re.compile(r'(\w+);dur=([\d.]+)(?:;desc="([^"]*)")?')
+
+
+class ServerTimingTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        Post.objects.create(author=cls.author, text='Тестовый пост')
+
+    def setUp(self):
+        cache.clear()
+
+    def metrics(self, response):
+        return {
+            name: (float(duration), desc)
+            for name, duration, desc in METRIC_RE.findall(
+                response['Server-Timing']
+            )
+        }
+
+    @override_settings(SERVER_TIMING=True)
+    def test_header_reports_queries_and_templates(self):
+        """Server-Timing содержит SQL, шаблоны, view и общее время."""
+        url = reverse('posts:profile', args=[self.author.username])
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        metrics = self.metrics(response)
+        self.assertEqual(
+            metrics['db'][1], f'{len(queries.captured_queries)} queries'
+        )
+        templates = {
+            desc for name, (_, desc) in metrics.items()
+            if name.startswith('tpl')
+        }
+        self.assertIn('posts/profile.html', templates)
+        self.assertIn('includes/header.html', templates)
+        self.assertLessEqual(metrics['view'][0], metrics['total'][0])
+
+    @override_settings(SERVER_TIMING=False)
+    def test_header_only_for_staff(self):
+        """Без SERVER_TIMING заголовок получает только персонал."""
+        url = reverse('posts:index')
+        self.assertNotIn('Server-Timing', self.client.get(url))
+        self.client.force_login(self.author)
+        self.assertNotIn('Server-Timing', self.client.get(url))
+        staff = User.objects.create_user(username='staff', is_staff=True)
+        self.client.force_login(staff)
+        self.assertIn('db', self.metrics(self.client.get(url)))
+
+    @override_settings(SLOW_REQUEST_QUERIES=1)
+    def test_slow_request_is_logged(self):
+        """Запрос сверх порога пишется в лог одной JSON-строкой."""
+        with self.assertLogs('yatube.performance', 'WARNING') as logs:
+            self.client.get(reverse('posts:index'))
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['path'], reverse('posts:index'))
+        self.assertEqual(record['status'], 200)
+        self.assertGreaterEqual(record['queries'], 1)
+        self.assertIn('posts/index.html', record['templates'])
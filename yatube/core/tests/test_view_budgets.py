@@ -0,0 +1,147 @@
+from django.contrib.auth.tokens import default_token_generator
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+
+from about import urls as about_urls
+from posts import urls as posts_urls
+from posts.models import Follow, Group, Post, User
+from users import urls as users_urls
+
+PASSWORD = 'Pa55word-for-tests'
+
+
+def budget_of(callback):
+    """Бюджет view: у функции или у dispatch класса-представления."""
+    view_class = getattr(callback, 'view_class', None)
+    return getattr(callback, 'query_budget', None) or getattr(
+        getattr(view_class, 'dispatch', None), 'query_budget', None
+    )
+
+
+class ViewBudgetTest(TestCase):
+    """Все view сайта укладываются в бюджет на холодном кэше.
+
+    Бюджет проверяет тестовый запускатель: превышение поднимает
+    QueryBudgetExceeded. Посетитель входит заново перед каждым
+    запросом, поэтому сессия и пользователь тоже читаются из базы.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(
+            username='reader', email='reader@example.com', password=PASSWORD
+        )
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        Post.objects.bulk_create(
+            Post(author=cls.author, group=cls.group, text=f'Пост {number}')
+            for number in range(25)
+        )
+        cls.post = Post.objects.create(
+            author=cls.reader, group=cls.group, text='Свой пост'
+        )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+
+    def request(self, method, name, kwargs=None, data=None, login=True):
+        client = Client()
+        if login:
+            client.force_login(self.reader)
+        cache.clear()
+        return getattr(client, method)(reverse(name, kwargs=kwargs), data)
+
+    def test_every_view_has_budget(self):
+        """У каждой view сайта, кроме админки и /metrics, есть бюджет."""
+        for module in (posts_urls, users_urls, about_urls):
+            for pattern in module.urlpatterns:
+                with self.subTest(name=pattern.name):
+                    self.assertIsNotNone(budget_of(pattern.callback))
+
+    def test_pages_within_budget(self):
+        """Страницы читателя и гостя на холодном кэше."""
+        author = {'username': self.author.username}
+        pages = [
+            ('posts:index', None),
+            ('posts:group_list', {'slug': self.group.slug}),
+            ('posts:profile', author),
+            ('posts:post_detail', {'post_id': self.post.pk}),
+            ('posts:post_edit', {'post_id': self.post.pk}),
+            ('posts:post_create', None),
+            ('posts:search', None),
+            ('posts:export', None),
+            ('posts:follow_index', None),
+            ('posts:api_index', None),
+            ('posts:api_group_list', {'slug': self.group.slug}),
+            ('posts:api_profile', author),
+            ('posts:fragment_index', None),
+            ('posts:fragment_group_list', {'slug': self.group.slug}),
+            ('posts:fragment_profile', author),
+            ('posts:fragment_follow', None),
+            ('about:author', None),
+            ('about:tech', None),
+            ('users:signup', None),
+            ('users:login', None),
+            ('users:password_change', None),
+            ('users:password_change_done', None),
+            ('users:password_reset', None),
+            ('users:password_reset_done', None),
+            ('users:password_reset_complete', None),
+        ]
+        for login in (False, True):
+            for name, kwargs in pages:
+                with self.subTest(name=name, login=login):
+                    self.request('get', name, kwargs, login=login)
+
+    def test_actions_within_budget(self):
+        """Формы и действия, которые пишут в базу."""
+        author = {'username': self.author.username}
+        self.request('post', 'posts:post_create', data={'text': 'Новый'})
+        self.request(
+            'post', 'posts:post_edit', {'post_id': self.post.pk},
+            {'text': 'Правка', 'group': self.group.pk},
+        )
+        self.request('get', 'posts:profile_unfollow', author)
+        self.request('get', 'posts:profile_follow', author)
+        self.request('get', 'posts:search', data={'q': 'Пост'})
+        response = self.request('post', 'users:signup', data={
+            'username': 'newcomer',
+            'password1': PASSWORD,
+            'password2': PASSWORD,
+        }, login=False)
+        self.assertRedirects(response, reverse('posts:index'))
+        self.request('post', 'users:login', data={
+            'username': self.reader.username, 'password': PASSWORD,
+        }, login=False)
+        self.request(
+            'post', 'users:password_reset',
+            data={'email': self.reader.email}, login=False,
+        )
+        # Токен зависит от last_login, который обновил вход выше.
+        self.reader = User.objects.get(pk=self.reader.pk)
+        client = Client()
+        response = client.get(reverse('users:password_reset_confirm', kwargs={
+            'uidb64': urlsafe_base64_encode(force_bytes(self.reader.pk)),
+            'token': default_token_generator.make_token(self.reader),
+        }))
+        cache.clear()
+        response = client.post(response.url, {
+            'new_password1': PASSWORD, 'new_password2': PASSWORD,
+        })
+        self.assertRedirects(
+            response, reverse('users:password_reset_complete')
+        )
+        self.reader = User.objects.get(pk=self.reader.pk)
+        response = self.request('post', 'users:password_change', data={
+            'old_password': PASSWORD,
+            'new_password1': PASSWORD + '-new',
+            'new_password2': PASSWORD + '-new',
+        })
+        self.assertRedirects(response, reverse('users:password_change_done'))
+        self.request('get', 'users:logout')
@@ -0,0 +1,116 @@
+import threading
+from unittest import mock
+
+from django.db import OperationalError, transaction
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+
+from core.write_queue import WriteQueue, stats, write
+from posts.models import Post, User
+
+
+class WriteQueueTest(TransactionTestCase):
+    """TransactionTestCase: поток очереди видит только закоммиченное."""
+
+    def setUp(self):
+        self.author = User.objects.create_user(username='author')
+        self.queue = WriteQueue(linger=0.2, batch_size=100)
+
+    def submit_all(self, funcs):
+        results = [None] * len(funcs)
+
+        def submit(number):
+            try:
+                results[number] = self.queue.submit(funcs[number])
+            except Exception as error:
+                results[number] = error
+
+        threads = [
+            threading.Thread(target=submit, args=[number])
+            for number in range(len(funcs))
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def create(self, text):
+        return lambda: Post.objects.create(author=self.author, text=text).pk
+
+    def test_concurrent_writes_share_commit(self):
+        """Записи, пришедшие вместе, коммитятся одной транзакцией."""
+        batches = stats['batches']
+        results = self.submit_all([self.create(f'Пост {n}') for n in range(5)])
+        self.assertEqual(stats['batches'] - batches, 1)
+        self.assertCountEqual(
+            results, Post.objects.values_list('pk', flat=True)
+        )
+
+    def test_failed_write_does_not_break_batch(self):
+        """Ошибка одной записи достается ее вызывающему, другие пишутся."""
+        def fail():
+            Post.objects.create(author=self.author, text='Откат')
+            raise ValueError('Ошибка записи')
+
+        results = self.submit_all([fail, self.create('Сохранен')])
+        self.assertIsInstance(results[0], ValueError)
+        self.assertEqual(
+            list(Post.objects.values_list('text', flat=True)), ['Сохранен']
+        )
+
+    @override_settings(WRITE_QUEUE=True)
+    def test_post_create_through_queue(self):
+        """post_create ждет коммита и перенаправляет как обычно."""
+        writes = stats['writes']
+        self.client.force_login(self.author)
+        response = self.client.post(
+            reverse('posts:post_create'), {'text': 'Через очередь'}
+        )
+        self.assertRedirects(
+            response, reverse('posts:profile', args=[self.author.username])
+        )
+        self.assertEqual(stats['writes'] - writes, 1)
+        self.assertTrue(Post.objects.filter(text='Через очередь').exists())
+
+    @override_settings(WRITE_QUEUE=True)
+    def test_write_inside_transaction_runs_inline(self):
+        """Внутри транзакции запись выполняется сразу в том же потоке."""
+        with transaction.atomic():
+            thread = write(threading.current_thread)
+        self.assertIs(thread, threading.current_thread())
+
+    def test_worker_survives_errors(self):
+        """Сбой вне записи отдается вызывающим, поток очереди живет."""
+        with mock.patch(
+            'core.write_queue.close_old_connections',
+            side_effect=RuntimeError('Сбой соединения'),
+        ), self.assertRaises(RuntimeError):
+            self.queue.submit(self.create('Не записан'))
+        with mock.patch(
+            'core.write_queue.metrics.observe',
+            side_effect=RuntimeError('Сбой метрик'),
+        ), self.assertLogs('yatube.performance', 'ERROR'):
+            self.queue.submit(self.create('Записан'))
+            # Метрики пишутся после ответа: ждем следующей пачки.
+            self.queue.submit(lambda: None)
+        self.assertTrue(self.queue.thread.is_alive())
+        self.queue.submit(self.create('После сбоев'))
+        self.assertCountEqual(
+            Post.objects.values_list('text', flat=True),
+            ['Записан', 'После сбоев'],
+        )
+
+    def test_wait_times_out(self):
+        """Вызывающий не ждет занятую очередь вечно, запись отменяется."""
+        queue = WriteQueue(linger=0, batch_size=1, timeout=0.1)
+        release = threading.Event()
+        blocked = threading.Thread(target=queue.submit, args=[release.wait])
+        blocked.start()
+        with self.assertRaises(OperationalError):
+            queue.submit(self.create('Отменен'))
+        release.set()
+        blocked.join()
+        post_id = queue.submit(self.create('Записан'))
+        self.assertEqual(Post.objects.get(text='Записан').pk, post_id)
+        self.assertFalse(Post.objects.filter(text='Отменен').exists())
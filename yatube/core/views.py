@@ -0,0 +1,33 @@
+import hmac
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+
+from . import metrics as app_metrics
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+# Заголовки, которые добавляет обратный прокси.
+PROXY_HEADERS = ('HTTP_X_FORWARDED_FOR', 'HTTP_X_REAL_IP', 'HTTP_FORWARDED')
+
+
+def scrape_allowed(request):
+    """С METRICS_TOKEN нужен заголовок Authorization: Bearer <токен>.
+
+    Без токена пускаются адреса METRICS_ALLOWED_IPS, но не через прокси:
+    за ним REMOTE_ADDR — адрес самого прокси, то есть любой посетитель.
+    """
+    if settings.METRICS_TOKEN:
+        return hmac.compare_digest(
+            request.META.get('HTTP_AUTHORIZATION', ''),
+            f'Bearer {settings.METRICS_TOKEN}',
+        )
+    if any(header in request.META for header in PROXY_HEADERS):
+        return False
+    return request.META.get('REMOTE_ADDR') in settings.METRICS_ALLOWED_IPS
+
+
+def metrics(request):
+    """Метрики всех процессов для Prometheus; только доверенным."""
+    if not scrape_allowed(request):
+        raise Http404
+    return HttpResponse(app_metrics.render(), content_type=CONTENT_TYPE)
@@ -0,0 +1,158 @@
+"""Групповой коммит записей одного процесса.
+
+В SQLite пишет одна транзакция за раз: при всплеске записей каждая
+ждет блокировку и свой COMMIT. С WRITE_QUEUE = True функция write
+передает запись фоновому потоку процесса. Поток собирает записи,
+пришедшие за WRITE_QUEUE_LINGER_MS, или пока он коммитил предыдущую
+пачку, и выполняет их в одной транзакции, каждую в своей точке
+сохранения. Вызывающий поток ждет коммита своей пачки и получает
+результат или исключение своей записи. Если ответа нет дольше
+WRITE_QUEUE_TIMEOUT секунд, вызывающий получает OperationalError,
+как при занятой базе.
+
+Запись выполняется в контексте вызывающего запроса, поэтому ее видят
+маршрутизация реплик и другие ContextVar запроса.
+"""
+import contextvars
+import logging
+import os
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.db import (OperationalError, close_old_connections, connection,
+                       transaction)
+
+from core import metrics
+
+logger = logging.getLogger('yatube.performance')
+
+_lock = threading.Lock()
+_queue = None
+
+stats = {'batches': 0, 'writes': 0}
+
+
+class Task:
+    def __init__(self, func):
+        self.func = func
+        self.context = contextvars.copy_context()
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.state = 'queued'
+        self.state_lock = threading.Lock()
+
+    def start(self):
+        """Берет задачу в работу, если вызывающий еще не отказался."""
+        with self.state_lock:
+            if self.state != 'queued':
+                return False
+            self.state = 'running'
+            return True
+
+    def cancel(self):
+        """Отказ вызывающего от записи, которая еще не начата."""
+        with self.state_lock:
+            if self.state != 'queued':
+                return False
+            self.state = 'cancelled'
+            return True
+
+    def run(self):
+        try:
+            with transaction.atomic():
+                self.result = self.context.run(self.func)
+        except Exception as error:
+            self.error = error
+
+
+class WriteQueue:
+    def __init__(self, linger, batch_size, timeout=None):
+        self.linger = linger
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.tasks = queue.Queue()
+        self.pid = os.getpid()
+        self.thread = threading.Thread(
+            target=self.work, name='write-queue', daemon=True
+        )
+        self.thread.start()
+
+    def submit(self, func):
+        task = Task(func)
+        self.tasks.put(task)
+        if not task.done.wait(self.timeout) and (
+            # Начатую запись дожидаемся еще раз: она может закоммититься.
+            task.cancel() or not task.done.wait(self.timeout)
+        ):
+            raise OperationalError('Очередь записи не ответила вовремя')
+        if task.error is not None:
+            raise task.error
+        return task.result
+
+    def collect(self):
+        """Первая задача очереди и все, что придет за время linger."""
+        batch = [self.tasks.get()]
+        deadline = time.monotonic() + self.linger
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.tasks.get(
+                    timeout=max(deadline - time.monotonic(), 0)
+                ))
+            except queue.Empty:
+                break
+        return batch
+
+    def commit(self, batch):
+        close_old_connections()
+        with transaction.atomic():
+            for task in batch:
+                if task.start():
+                    task.run()
+
+    def work(self):
+        # Любая ошибка завершается в пределах пачки: поток не должен
+        # умереть, иначе все следующие вызывающие будут ждать впустую.
+        while True:
+            batch = self.collect()
+            try:
+                self.commit(batch)
+            except Exception as error:
+                # Не удался сам коммит: пачка не записана целиком.
+                for task in batch:
+                    task.result, task.error = None, task.error or error
+            finally:
+                for task in batch:
+                    task.done.set()
+            try:
+                stats['batches'] += 1
+                stats['writes'] += len(batch)
+                metrics.observe('yatube_write_batch_size', len(batch))
+            except Exception:
+                logger.exception('Не удалось записать метрики очереди записи')
+
+
+def write_queue():
+    """Очередь записи процесса; после fork создается заново."""
+    global _queue
+    with _lock:
+        if _queue is None or _queue.pid != os.getpid():
+            _queue = WriteQueue(
+                settings.WRITE_QUEUE_LINGER_MS / 1000,
+                settings.WRITE_QUEUE_BATCH_SIZE,
+                settings.WRITE_QUEUE_TIMEOUT,
+            )
+        return _queue
+
+
+def write(func):
+    """Выполняет func в групповом коммите и возвращает ее результат.
+
+    Без WRITE_QUEUE и внутри транзакции вызывающего функция
+    выполняется сразу: поток очереди не видит незакоммиченных данных.
+    """
+    if not settings.WRITE_QUEUE or connection.in_atomic_block:
+        return func()
+    return write_queue().submit(func)
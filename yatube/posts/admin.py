@@ -1,6 +1,61 @@
+from django.conf import settings
 from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.core.paginator import Paginator
+from django.db import transaction
+from django.utils.functional import cached_property
 
+from .counters import site_posts_count
 from .models import Post, Group
+from .search import search_posts
+
+COUNT_LIMIT = 10000
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator без точного COUNT(*) по всей таблице.
+
+    Список постов без фильтров берет число из счетчика, остальные
+    списки считают строки не дальше COUNT_LIMIT.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if queryset.model is Post and not queryset.query.where:
+            return site_posts_count()
+        return queryset[:COUNT_LIMIT].count()
+
+
+class GroupAutocomplete(AutocompleteSelect):
+    """Автодополнение группы, подписывающее уже загруженную группу.
+
+    Стандартный виджет ищет подпись выбранной группы отдельным
+    запросом, то есть по запросу на каждую строку списка.
+    """
+
+    known_group = None
+
+    def optgroups(self, name, value, attr=None):
+        group = self.known_group
+        selected = [str(v) for v in value if v not in (None, '')]
+        if group is None or selected != [str(group.pk)]:
+            return super().optgroups(name, value, attr)
+        options = []
+        if not self.is_required:
+            options.append(self.create_option(name, '', '', False, 0))
+        options.append(self.create_option(
+            name, group.pk, str(group), True, len(options)
+        ))
+        return [(None, options, 0)]
+
+
+class PostChangeList(ChangeList):
+    def get_queryset(self, request):
+        return super().get_queryset(request).only(
+            'text', 'pub_date', 'updated', 'author__username', 'group__title',
+        )
 
 
 class PostAdmin(admin.ModelAdmin):
@@ -12,9 +67,51 @@ class PostAdmin(admin.ModelAdmin):
         'group',
     )
     list_editable = ('group',)
+    list_select_related = ('author', 'group')
+    autocomplete_fields = ('group',)
     search_fields = ('text',)
     list_filter = ('pub_date',)
     empty_value_display = '-пусто-'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_changelist(self, request, **kwargs):
+        return PostChangeList
+
+    def get_changelist_form(self, request, **kwargs):
+        base_form = super().get_changelist_form(request, **kwargs)
+
+        class PostChangeListForm(base_form):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                widget = self.fields['group'].widget
+                widget = getattr(widget, 'widget', widget)
+                if Post.group.is_cached(self.instance):
+                    widget.known_group = self.instance.group
+
+        return PostChangeListForm
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name == 'group':
+            kwargs['widget'] = GroupAutocomplete(
+                db_field.remote_field, self.admin_site,
+                using=kwargs.get('using'),
+            )
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return search_posts(search_term, queryset), False
+
+    def changelist_view(self, request, extra_context=None):
+        if request.method != 'POST':
+            return super().changelist_view(request, extra_context)
+        # Правки из списка сохраняются одной транзакцией, а не по строке.
+        # Только POST: транзакция с BEGIN IMMEDIATE держит блокировку
+        # записи, и отрисовка списка не должна останавливать авторов.
+        with transaction.atomic():
+            return super().changelist_view(request, extra_context)
 
 
 class GroupAdmin(admin.ModelAdmin):
@@ -22,9 +119,15 @@ class GroupAdmin(admin.ModelAdmin):
         'title',
         'description'
     )
-    search_fields = ('group',)
+    search_fields = ('title', 'slug')
+    ordering = ('title',)
     prepopulated_fields = {"slug": ("title",)}
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
-admin.site.register(Post, PostAdmin)
+# Список, поиск и массовые правки админки работают с одной базой,
+# поэтому с шардами админки постов нет, см. posts.shards.
+if not settings.POST_SHARDS:
+    admin.site.register(Post, PostAdmin)
 admin.site.register(Group, GroupAdmin)
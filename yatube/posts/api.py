@@ -0,0 +1,121 @@
+import json
+
+from django.conf import settings
+from django.db.models import F
+from django.http import Http404, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+
+from core.query_budget import query_budget
+from core.replicas import read_from_replica
+
+from . import shards
+from .models import Group, Post, User
+from .utils import cursor_pagination
+
+# Только то, что показывает includes/post_card.html.
+FEED_FIELDS = {
+    'author_name': F('author__username'),
+    'group_slug': F('group__slug'),
+    'group_title': F('group__title'),
+}
+
+encoder = json.JSONEncoder(ensure_ascii=False)
+
+
+def feed_rows(**filters):
+    return Post.objects.filter(**filters).values(
+        'id', 'text', 'pub_date', **FEED_FIELDS
+    )
+
+
+def post_rows(page):
+    """Заменяет посты шардов на странице строками, как у feed_rows."""
+    page.object_list = [
+        {
+            'id': post.pk,
+            'text': post.text,
+            'pub_date': post.pub_date,
+            'author_name': post.author.username,
+            'group_slug': post.group and post.group.slug,
+            'group_title': post.group and post.group.title,
+        }
+        for post in page.object_list
+    ]
+    return page
+
+
+def render_feed(page):
+    """Кодирует страницу ленты в JSON по частям, пост за постом."""
+    separator = '{"results": ['
+    for row in page:
+        yield separator + encoder.encode({
+            'id': row['id'],
+            'text': row['text'],
+            'pub_date': row['pub_date'].isoformat(),
+            'author': row['author_name'],
+            'group_slug': row['group_slug'],
+            'group_title': row['group_title'],
+        })
+        separator = ', '
+    if separator != ', ':
+        yield separator
+    yield '], "next": {}, "previous": {}}}'.format(
+        encoder.encode(page.next_cursor),
+        encoder.encode(page.previous_cursor),
+    )
+
+
+def feed_response(request, rows, owner=None):
+    """Ответ с JSON-страницей ленты.
+
+    Владелец ленты фильтруется через JOIN в том же запросе; отдельный
+    запрос на его существование нужен только для пустой страницы.
+    """
+    page = cursor_pagination(request, rows)
+    if not page.object_list and owner is not None and not owner.exists():
+        raise Http404
+    return page_response(page)
+
+
+def page_response(page):
+    return StreamingHttpResponse(
+        render_feed(page), content_type='application/json'
+    )
+
+
+@query_budget(4)
+@read_from_replica
+def index(request):
+    if settings.POST_SHARDS:
+        return page_response(post_rows(shards.feed_page(request)))
+    return feed_response(request, feed_rows())
+
+
+@query_budget(5)
+@read_from_replica
+def group_posts(request, slug):
+    if settings.POST_SHARDS:
+        group = get_object_or_404(Group, slug=slug)
+        return page_response(
+            post_rows(shards.feed_page(request, group_id=group.id))
+        )
+    return feed_response(
+        request,
+        feed_rows(group__slug=slug),
+        owner=Group.objects.filter(slug=slug),
+    )
+
+
+@query_budget(5)
+@read_from_replica
+def profile(request, username):
+    if settings.POST_SHARDS:
+        author = get_object_or_404(User, username=username)
+        return page_response(post_rows(
+            cursor_pagination(request, shards.author_posts(author.id))
+        ))
+    return feed_response(
+        request,
+        feed_rows(author__username=username),
+        owner=User.objects.filter(username=username),
+    )
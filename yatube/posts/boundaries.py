@@ -0,0 +1,103 @@
+from django.db.models import Q
+
+from .counters import feed_posts
+from .models import PageBoundary, PostCounter
+
+# Граница хранится у каждого STEP-го поста ленты, считая от самого
+# старого; совпадает с размером страницы, чтобы от границы до начала
+# любой страницы было меньше STEP строк.
+STEP = 10
+# Мелкий OFFSET дешевле лишнего запроса за границей.
+MIN_OFFSET = 200
+
+
+def post_feeds(author_id, group_id):
+    """Ленты (scope, object_id), в которые попадает пост."""
+    feeds = [(PostCounter.SITE, 0), (PostCounter.AUTHOR, author_id)]
+    if group_id is not None:
+        feeds.append((PostCounter.GROUP, group_id))
+    return feeds
+
+
+def invalidate(feeds, pub_date, pk):
+    """Удаляет границы, номера которых сдвинул пост с ключом (pub_date, pk).
+
+    Пост в голове ленты не задевает ни одной границы, поэтому обычная
+    публикация обходится пустым DELETE по индексу.
+    """
+    if not feeds:
+        return
+    in_feeds = Q(pk__in=[])
+    for scope, object_id in feeds:
+        in_feeds |= Q(scope=scope, object_id=object_id)
+    PageBoundary.objects.filter(in_feeds).filter(
+        Q(pub_date__gt=pub_date) | Q(pub_date=pub_date, post_id__gte=pk)
+    ).delete()
+
+
+def forget(scope, object_id):
+    PageBoundary.objects.filter(scope=scope, object_id=object_id).delete()
+
+
+def reset():
+    """Удаляет все границы; они достроятся при следующих переходах."""
+    return PageBoundary.objects.all().delete()[0]
+
+
+def boundary(scope, object_id, rank):
+    """Ключ поста с номером rank; недостающие границы достраиваются.
+
+    Достройка идет проходом по индексу от ближайшей сохраненной границы
+    ниже, так что каждый участок ленты проходится один раз.
+    """
+    key = PageBoundary.objects.filter(
+        scope=scope, object_id=object_id, rank=rank
+    ).values_list('pub_date', 'post_id').first()
+    if key is not None:
+        return key
+    start = PageBoundary.objects.filter(
+        scope=scope, object_id=object_id, rank__lt=rank
+    ).order_by('-rank').first()
+    posts = feed_posts(scope, object_id).order_by('pub_date', 'id')
+    first_rank = 0
+    if start is not None:
+        first_rank = start.rank + 1
+        posts = posts.filter(pub_date__gte=start.pub_date).filter(
+            Q(pub_date__gt=start.pub_date) | Q(id__gt=start.post_id)
+        )
+    found = []
+    keys = posts.values_list('pub_date', 'id')[:rank - first_rank + 1]
+    for current_rank, (pub_date, pk) in enumerate(
+        keys.iterator(), first_rank
+    ):
+        if current_rank % STEP == 0:
+            found.append(PageBoundary(
+                scope=scope, object_id=object_id, rank=current_rank,
+                pub_date=pub_date, post_id=pk,
+            ))
+    PageBoundary.objects.bulk_create(found, ignore_conflicts=True)
+    if found and found[-1].rank == rank:
+        return found[-1].pub_date, found[-1].post_id
+    return None
+
+
+def seek(posts, feed, count, offset, limit):
+    """Срез posts[offset:offset + limit] ленты feed без большого OFFSET.
+
+    Страница начинается с поста номер count - 1 - offset от начала
+    ленты; запрос ищет по индексу ближайшую границу над ним и
+    пропускает меньше STEP строк.
+    """
+    posts = posts.order_by('-pub_date', '-id')
+    rank = count - 1 - offset
+    boundary_rank = -(-rank // STEP) * STEP
+    if offset < MIN_OFFSET or rank < 0 or boundary_rank >= count:
+        return posts[offset:offset + limit]
+    key = boundary(*feed, boundary_rank)
+    if key is None:
+        return posts[offset:offset + limit]
+    pub_date, pk = key
+    skip = boundary_rank - rank
+    return posts.filter(pub_date__lte=pub_date).filter(
+        Q(pub_date__lt=pub_date) | Q(id__lte=pk)
+    )[skip:skip + limit]
@@ -0,0 +1,71 @@
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import boundaries, counters, page_cache, search, shards, timeline
+from .models import Post
+
+BATCH_SIZE = 500
+
+
+def insert_posts(posts, batch_size):
+    """Вставляет посты и добавляет их в поиск и ленты подписок."""
+    if settings.POST_SHARDS:
+        # Посты уже в шардах, а id им выдал справочник шардов.
+        search.index_posts(posts)
+        return
+    last_id = Post.objects.order_by('-id').values_list(
+        'id', flat=True
+    ).first() or 0
+    Post.insert_rows(posts, batch_size=batch_size)
+    search.index_posts_after(last_id)
+    timeline.fan_out_after(last_id)
+
+
+def count_posts(posts):
+    """Сдвигает счетчики и границы страниц лент на созданные посты."""
+    counters.change(len(posts), site=True)
+    for author_id, total in Counter(p.author_id for p in posts).items():
+        counters.change(total, author_id=author_id, site=False)
+    for group_id, total in Counter(p.group_id for p in posts).items():
+        if group_id is not None:
+            counters.change(total, group_id=group_id, site=False)
+    oldest = {}
+    for post in posts:
+        for feed in boundaries.post_feeds(post.author_id, post.group_id):
+            oldest[feed] = min(oldest.get(feed, post.pub_date),
+                               post.pub_date)
+    for feed, pub_date in oldest.items():
+        # id созданных постов SQLite не возвращает: сбрасываем с даты.
+        boundaries.invalidate([feed], pub_date, 0)
+
+
+def bulk_create_posts(posts, batch_size=BATCH_SIZE):
+    """Создает посты пачкой в одной транзакции.
+
+    bulk_create не шлет сигналов, поэтому счетчики, поисковый индекс,
+    ленты подписок и кеш страниц обновляются здесь сразу для всей пачки.
+    """
+    if not posts:
+        return posts
+    now = timezone.now()
+    popular = timeline.popular_authors(post.author_id for post in posts)
+    for post in posts:
+        if post.pub_date is None:
+            post.pub_date = now
+        post.updated = now
+        post.fan_out = post.author_id not in popular
+    if settings.POST_SHARDS:
+        # Шарды пишутся до транзакции основной базы: блокировки берутся
+        # в порядке шард, затем основная база, как в Post.shard_lock.
+        shards.bulk_create(posts, batch_size=batch_size)
+    with transaction.atomic():
+        insert_posts(posts, batch_size)
+        count_posts(posts)
+    page_cache.invalidate(*{
+        feed for post in posts
+        for feed in page_cache.post_feeds(post, None, None)
+    })
+    return posts
@@ -0,0 +1,95 @@
+from collections import Counter
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Count, F, Q
+
+from .models import Post, PostCounter
+
+
+def feed_posts(scope, object_id):
+    if scope == PostCounter.AUTHOR:
+        return Post.objects.filter(author_id=object_id)
+    if scope == PostCounter.GROUP:
+        return Post.objects.filter(group_id=object_id)
+    return Post.objects.all()
+
+
+def post_databases():
+    """Базы с постами: шарды из POST_SHARDS или основная база."""
+    return settings.POST_SHARDS or [DEFAULT_DB_ALIAS]
+
+
+def get_count(scope, object_id=0):
+    """Читает счетчик; отсутствующий один раз считается по таблице."""
+    value = PostCounter.objects.filter(
+        scope=scope, object_id=object_id
+    ).values_list('value', flat=True).first()
+    if value is None:
+        with transaction.atomic():
+            counter, _ = PostCounter.objects.get_or_create(
+                scope=scope,
+                object_id=object_id,
+                defaults={'value': sum(
+                    feed_posts(scope, object_id).using(alias).count()
+                    for alias in post_databases()
+                )},
+            )
+        value = counter.value
+    return value
+
+
+def site_posts_count():
+    return get_count(PostCounter.SITE)
+
+
+def author_posts_count(author_id):
+    return get_count(PostCounter.AUTHOR, author_id)
+
+
+def group_posts_count(group_id):
+    return get_count(PostCounter.GROUP, group_id)
+
+
+def change(delta, author_id=None, group_id=None, site=True):
+    """Сдвигает счетчики сайта, автора и группы одним UPDATE.
+
+    Строки, которых еще нет, не создаются: их посчитает get_count.
+    """
+    scopes = Q(pk__in=[])
+    if site:
+        scopes |= Q(scope=PostCounter.SITE, object_id=0)
+    if author_id is not None:
+        scopes |= Q(scope=PostCounter.AUTHOR, object_id=author_id)
+    if group_id is not None:
+        scopes |= Q(scope=PostCounter.GROUP, object_id=group_id)
+    PostCounter.objects.filter(scopes).update(value=F('value') + delta)
+
+
+def forget(scope, object_id):
+    PostCounter.objects.filter(scope=scope, object_id=object_id).delete()
+
+
+def recount():
+    """Пересобирает все счетчики по таблицам постов всех баз."""
+    totals = Counter()
+    for alias in post_databases():
+        posts = Post.objects.using(alias).order_by()
+        totals[PostCounter.SITE, 0] += posts.count()
+        for scope, field in (
+            (PostCounter.AUTHOR, 'author'),
+            (PostCounter.GROUP, 'group'),
+        ):
+            rows = posts.filter(**{f'{field}__isnull': False}).values(
+                field
+            ).annotate(total=Count('id'))
+            for row in rows:
+                totals[scope, row[field]] += row['total']
+    counters = [
+        PostCounter(scope=scope, object_id=object_id, value=value)
+        for (scope, object_id), value in totals.items()
+    ]
+    with transaction.atomic():
+        PostCounter.objects.all().delete()
+        PostCounter.objects.bulk_create(counters, batch_size=500)
+    return len(counters)
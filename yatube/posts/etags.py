@@ -0,0 +1,81 @@
+import hashlib
+
+from django.conf import settings
+
+from . import shards
+from .counters import author_posts_count
+from .models import Group, Post, User
+from .page_cache import request_feed_version
+
+
+def _etag(*parts):
+    return hashlib.md5('|'.join(map(str, parts)).encode()).hexdigest()
+
+
+def _viewer(request):
+    user = request.user
+    return f'{user.pk}:{user.username}' if user.is_authenticated else ''
+
+
+def feed_etag(feed):
+    """ETag ленты по ее версии из той же базы, что и лента.
+
+    Внутри read_from_replica версия читается с реплики: ETag страницы
+    с отстающей реплики не совпадет с ETag свежей. Версию меняют те же
+    сигналы, что сбрасывают кеш страниц, поэтому ETag меняется при
+    любой правке видимых постов в любом процессе. Кеш страниц берет
+    ту же версию без второго запроса.
+    """
+    def etag(request, *args, **kwargs):
+        return _etag(
+            request_feed_version(request, feed(*args, **kwargs)),
+            request.GET.urlencode(),
+            _viewer(request),
+        )
+    return etag
+
+
+def post_fields(post_id):
+    """Поля поста, которые видны на его странице, или None.
+
+    Пост шарда читается из шарда, а автор и группа — из основной базы.
+    """
+    if not settings.POST_SHARDS:
+        return Post.objects.filter(pk=post_id).values(
+            'updated', 'author_id', 'author__username',
+            'group__slug', 'group__title',
+        ).first()
+    shard = shards.post_shard(post_id)
+    if shard is None:
+        return None
+    post = Post.objects.using(shard).filter(pk=post_id).values(
+        'updated', 'author_id', 'group_id'
+    ).first()
+    if post is None:
+        return None
+    group = {}
+    group_id = post.pop('group_id')
+    if group_id is not None:
+        group = Group.objects.filter(pk=group_id).values(
+            'slug', 'title'
+        ).first() or {}
+    return {
+        **post,
+        'author__username': User.objects.filter(
+            pk=post['author_id']
+        ).values_list('username', flat=True).first(),
+        'group__slug': group.get('slug'),
+        'group__title': group.get('title'),
+    }
+
+
+def post_etag(request, post_id):
+    """ETag поста: его версия, показанные поля и число постов автора."""
+    post = post_fields(post_id)
+    if post is None:
+        return None
+    return _etag(
+        *post.values(),
+        author_posts_count(post['author_id']),
+        _viewer(request),
+    )
@@ -0,0 +1,132 @@
+import csv
+import heapq
+import json
+from itertools import islice
+
+from django.conf import settings
+from django.db.models import F, Q
+
+from . import shards
+from .models import Group, Post, User
+from .utils import cursor_key
+
+EXPORT_FIELDS = ('id', 'text', 'pub_date', 'author', 'group')
+BATCH_SIZE = 2000
+CONTENT_TYPES = {
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+
+def keyset_rows(posts, batch_size):
+    """Строки posts пачками по ключу (pub_date, id), от новых к старым.
+
+    В памяти одновременно только одна пачка, а каждая следующая пачка —
+    индексный поиск от границы предыдущей, без OFFSET.
+    """
+    posts = posts.order_by('-pub_date', '-id')
+    batch = posts
+    while True:
+        last = None
+        count = 0
+        for last in batch[:batch_size].iterator(chunk_size=batch_size):
+            count += 1
+            yield last
+        if count < batch_size:
+            return
+        batch = posts.filter(pub_date__lte=last['pub_date']).filter(
+            Q(pub_date__lt=last['pub_date']) | Q(id__lt=last['id'])
+        )
+
+
+def shard_rows(author=None, group=None, batch_size=BATCH_SIZE):
+    """Строки постов всех шардов, слитые по (pub_date, id).
+
+    Авторов и групп в шардах нет: их имена читаются из основной базы
+    на каждую пачку строк.
+    """
+    filters = {}
+    aliases = settings.POST_SHARDS
+    if author is not None:
+        filters['author'] = author
+        aliases = [shards.shard_for(author.id)]
+    if group is not None:
+        filters['group'] = group
+    rows = heapq.merge(
+        *(
+            keyset_rows(
+                Post.objects.using(alias).filter(**filters).values(
+                    'id', 'text', 'pub_date', 'author_id', 'group_id'
+                ),
+                batch_size,
+            )
+            for alias in aliases
+        ),
+        key=cursor_key, reverse=True,
+    )
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            return
+        names = dict(User.objects.filter(
+            id__in={row['author_id'] for row in batch}
+        ).values_list('id', 'username'))
+        slugs = dict(Group.objects.filter(
+            id__in={row['group_id'] for row in batch}
+        ).values_list('id', 'slug'))
+        for row in batch:
+            row['author_name'] = names.get(row['author_id'])
+            row['group_slug'] = slugs.get(row['group_id'])
+            yield row
+
+
+def export_rows(author=None, group=None, batch_size=BATCH_SIZE):
+    """Отдает посты словарями, пачками по ключу (pub_date, id)."""
+    if settings.POST_SHARDS:
+        rows = shard_rows(author, group, batch_size)
+    else:
+        posts = Post.objects.values(
+            'id', 'text', 'pub_date',
+            author_name=F('author__username'), group_slug=F('group__slug'),
+        )
+        if author is not None:
+            posts = posts.filter(author=author)
+        if group is not None:
+            posts = posts.filter(group=group)
+        rows = keyset_rows(posts, batch_size)
+    for row in rows:
+        yield {
+            'id': row['id'],
+            'text': row['text'],
+            'pub_date': row['pub_date'].isoformat(),
+            'author': row['author_name'],
+            'group': row['group_slug'],
+        }
+
+
+class Echo:
+    """Псевдобуфер для csv.writer: возвращает строку вместо записи."""
+
+    def write(self, value):
+        return value
+
+
+def render_jsonl(rows):
+    for row in rows:
+        yield json.dumps(row, ensure_ascii=False) + '\n'
+
+
+def render_csv(rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for row in rows:
+        yield writer.writerow([
+            row[field] if row[field] is not None else ''
+            for field in EXPORT_FIELDS
+        ])
+
+
+RENDERERS = {
+    'jsonl': render_jsonl,
+    'csv': render_csv,
+}
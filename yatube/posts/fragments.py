@@ -0,0 +1,71 @@
+from django.conf import settings
+from django.contrib.auth.decorators import login_required
+from django.shortcuts import get_object_or_404, render
+from django.views.decorators.http import condition
+
+from core.query_budget import query_budget
+from core.replicas import read_from_replica
+
+from . import shards
+from .etags import feed_etag
+from .models import Group, Post, User
+from .page_cache import (author_feed, cache_anonymous_page, group_feed,
+                         index_feed)
+from .timeline import follow_page
+from .utils import cursor_pagination
+
+TEMPLATE = 'includes/post_fragment.html'
+
+
+def render_fragment(request, page_obj, is_author=False, is_music=False):
+    """Только карточки следующей страницы ленты, без base.html."""
+    return render(request, TEMPLATE, {
+        'page_obj': page_obj,
+        'is_author': is_author,
+        'is_music': is_music,
+    })
+
+
+@query_budget(4)
+@read_from_replica
+@condition(etag_func=feed_etag(index_feed))
+@cache_anonymous_page(index_feed)
+def index(request):
+    if settings.POST_SHARDS:
+        return render_fragment(request, shards.feed_page(request))
+    posts = Post.objects.select_related('author', 'group')
+    return render_fragment(request, cursor_pagination(request, posts))
+
+
+@query_budget(5)
+@read_from_replica
+@condition(etag_func=feed_etag(group_feed))
+@cache_anonymous_page(group_feed)
+def group_posts(request, slug):
+    group = get_object_or_404(Group, slug=slug)
+    if settings.POST_SHARDS:
+        page_obj = shards.feed_page(request, group_id=group.id)
+    else:
+        page_obj = cursor_pagination(
+            request, group.posts.select_related('author', 'group')
+        )
+    return render_fragment(request, page_obj, is_music=True)
+
+
+@query_budget(5)
+@read_from_replica
+@condition(etag_func=feed_etag(author_feed))
+@cache_anonymous_page(author_feed)
+def profile(request, username):
+    author = get_object_or_404(User, username=username)
+    posts = shards.author_posts(author.id)
+    return render_fragment(
+        request, cursor_pagination(request, posts), is_author=True
+    )
+
+
+@query_budget(8)
+@read_from_replica
+@login_required
+def follow_index(request):
+    return render_fragment(request, follow_page(request, request.user))
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.export import RENDERERS, export_rows
+from posts.models import Group, User
+
+
+class Command(BaseCommand):
+    help = 'Потоково выгружает посты в JSONL или CSV.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=RENDERERS, default='jsonl')
+        parser.add_argument('--author', help='username автора.')
+        parser.add_argument('--group', help='slug группы.')
+        parser.add_argument(
+            '--output', '-o', default='-',
+            help='Файл для выгрузки, "-" для stdout.',
+        )
+
+    def handle(self, *args, **options):
+        author = group = None
+        try:
+            if options['author']:
+                author = User.objects.get(username=options['author'])
+            if options['group']:
+                group = Group.objects.get(slug=options['group'])
+        except (User.DoesNotExist, Group.DoesNotExist) as error:
+            raise CommandError(error)
+        chunks = RENDERERS[options['format']](
+            export_rows(author=author, group=group)
+        )
+        if options['output'] == '-':
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
+            return
+        with open(
+            options['output'], 'w', encoding='utf-8', newline=''
+        ) as output:
+            output.writelines(chunks)
@@ -0,0 +1,163 @@
+import csv
+import itertools
+import json
+import os
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from posts.bulk import bulk_create_posts
+from posts.models import Group, Post, User
+
+FORMATS = ('jsonl', 'csv')
+FIELDS = ('text', 'author', 'group', 'pub_date')
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоково импортирует посты из JSONL или CSV (файл или stdin). '
+        'Поля записи: text, author (username), group (slug), pub_date.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', nargs='?', default='-',
+            help='Файл с постами, "-" для stdin.',
+        )
+        parser.add_argument('--format', choices=FORMATS)
+        parser.add_argument(
+            '--chunk-size', type=int, default=5000,
+            help='Записей в одной транзакции.',
+        )
+        parser.add_argument(
+            '--checkpoint',
+            help='Файл с числом уже импортированных записей.',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or (
+            'csv' if path.endswith('.csv') else 'jsonl'
+        )
+        checkpoint = options['checkpoint']
+        chunk_size = options['chunk_size']
+        if chunk_size < 1:
+            raise CommandError('--chunk-size должен быть больше нуля.')
+        done = read_checkpoint(checkpoint)
+        self.authors = {}
+        self.groups = {}
+        self.skipped = 0
+        stream = sys.stdin if path == '-' else open(path, encoding='utf-8')
+        try:
+            records = itertools.islice(read_records(stream, fmt), done, None)
+            started = time.monotonic()
+            imported = 0
+            while True:
+                chunk = list(itertools.islice(records, chunk_size))
+                if not chunk:
+                    break
+                posts = self.build_posts(chunk)
+                bulk_create_posts(posts)
+                done += len(chunk)
+                imported += len(posts)
+                write_checkpoint(checkpoint, done)
+                rate = imported / max(time.monotonic() - started, 1e-9)
+                self.stdout.write(
+                    f'Обработано записей: {done}, создано постов: '
+                    f'{imported}, пропущено: {self.skipped}, '
+                    f'{rate:.0f} постов/с'
+                )
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+        self.stdout.write(self.style.SUCCESS(
+            f'Импорт завершен: создано {imported}, пропущено {self.skipped}'
+        ))
+
+    def build_posts(self, chunk):
+        self.resolve(
+            self.authors, User, 'username',
+            {record.get('author') for record in chunk},
+        )
+        self.resolve(
+            self.groups, Group, 'slug',
+            {record.get('group') for record in chunk},
+        )
+        posts = []
+        for record in chunk:
+            author = self.authors.get(record.get('author'))
+            group_slug = record.get('group') or None
+            group = self.groups.get(group_slug)
+            try:
+                pub_date = parse_datetime(record.get('pub_date') or '')
+            except ValueError:
+                # Формат верный, но даты нет, например 2020-13-45.
+                self.skipped += 1
+                continue
+            if pub_date is not None and timezone.is_naive(pub_date):
+                pub_date = timezone.make_aware(pub_date)
+            if (
+                author is None or not record.get('text')
+                or (group_slug and group is None)
+            ):
+                self.skipped += 1
+                continue
+            posts.append(Post(
+                text=record['text'],
+                author=author,
+                group=group,
+                pub_date=pub_date,
+            ))
+        return posts
+
+    @staticmethod
+    def resolve(lookup, model, field, keys):
+        """Догружает в словарь объекты, которых в нем еще нет."""
+        missing = {key for key in keys if key and key not in lookup}
+        if missing:
+            lookup.update(
+                (getattr(obj, field), obj)
+                for obj in model.objects.filter(**{f'{field}__in': missing})
+            )
+
+
+def read_records(stream, fmt):
+    if fmt == 'csv':
+        yield from csv.DictReader(stream)
+        return
+    for line in stream:
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            record = None
+        # Битая строка остается записью: так не сбивается контрольная
+        # точка, а build_posts считает ее пропущенной.
+        yield record if is_record(record) else {}
+
+
+def is_record(record):
+    """Объект JSON, у которого поля поста — строки или их нет."""
+    return isinstance(record, dict) and all(
+        isinstance(record.get(field), (str, type(None))) for field in FIELDS
+    )
+
+
+def read_checkpoint(path):
+    if not path or not os.path.exists(path):
+        return 0
+    with open(path) as checkpoint:
+        return int(checkpoint.read().strip() or 0)
+
+
+def write_checkpoint(path, done):
+    if not path:
+        return
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w') as checkpoint:
+        checkpoint.write(str(done))
+    os.replace(tmp_path, path)
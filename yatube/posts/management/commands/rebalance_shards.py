@@ -0,0 +1,42 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import shards
+
+
+class Command(BaseCommand):
+    help = (
+        'Переносит посты авторов в шарды, которые им назначает POST_SHARDS. '
+        'Запускается после изменения списка шардов, а также чтобы '
+        'разложить по шардам посты из основной базы.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=shards.BATCH_SIZE,
+            help='Постов в одной пачке копирования.',
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только показать, каких авторов нужно перенести.',
+        )
+
+    def handle(self, *args, **options):
+        if not settings.POST_SHARDS:
+            raise CommandError('Шарды не настроены: POST_SHARDS пуст.')
+        moves = shards.misplaced()
+        total = 0
+        for author_id, source, target in moves:
+            if options['dry_run']:
+                self.stdout.write(f'Автор {author_id}: {source} -> {target}')
+                continue
+            moved = shards.move_author(
+                author_id, source, target, batch_size=options['batch_size']
+            )
+            total += moved
+            self.stdout.write(
+                f'Автор {author_id}: {source} -> {target}, постов: {moved}'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Авторов к переносу: {len(moves)}, перенесено постов: {total}'
+        ))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from posts import boundaries
+from posts.counters import recount
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает денормализованные счетчики постов '
+        'и сбрасывает границы страниц лент.'
+    )
+
+    def handle(self, *args, **options):
+        total = recount()
+        boundaries.reset()
+        self.stdout.write(self.style.SUCCESS(
+            f'Пересчитано счетчиков: {total}'
+        ))
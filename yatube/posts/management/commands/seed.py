@@ -0,0 +1,296 @@
+import itertools
+import multiprocessing
+import random
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from faker import Faker
+
+from posts import boundaries, counters, page_cache, search
+from posts.models import Group, Post, User
+
+LOCALE = 'ru_RU'
+SENTENCES = 2000
+# Поля, которые генерируют процессы, в порядке строк generate_chunk.
+GENERATED = ('text', 'pub_date', 'updated', 'author_id', 'group_id')
+FEEDS_BATCH = 500
+
+# Только на время наполнения: индексы миллиона постов не помещаются
+# в кеш страниц по умолчанию, а fsync каждой транзакции здесь не нужен.
+SQLITE_PRAGMAS = {'cache_size': -262144, 'synchronous': 0}
+
+state = {}
+
+
+@contextmanager
+def fast_writes():
+    """Ослабляет надежность записи SQLite и возвращает ее по выходе."""
+    # Внутри транзакции SQLite не дает менять synchronous.
+    if connection.vendor != 'sqlite' or connection.in_atomic_block:
+        yield
+        return
+    with connection.cursor() as cursor:
+        saved = {}
+        for name, value in SQLITE_PRAGMAS.items():
+            saved[name] = cursor.execute(f'PRAGMA {name}').fetchone()[0]
+            cursor.execute(f'PRAGMA {name} = {value}')
+    try:
+        yield
+    finally:
+        with connection.cursor() as cursor:
+            for name, value in saved.items():
+                cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def insert_statement():
+    """INSERT постов по колонкам модели и сборщик строк для него.
+
+    Колонки берутся из модели: поля, которых нет в GENERATED, получают
+    свой default, и наполнение не ломается при изменении схемы.
+    """
+    fields = [
+        field for field in Post._meta.concrete_fields
+        if not field.primary_key
+    ]
+    defaults = {
+        field.attname: field.get_db_prep_save(field.get_default(), connection)
+        for field in fields
+    }
+    sql = (
+        f'INSERT INTO {Post._meta.db_table}'
+        f' ({", ".join(field.column for field in fields)})'
+        f' VALUES ({", ".join(["%s"] * len(fields))})'
+    )
+
+    def build_row(row):
+        values = dict(defaults, **dict(zip(GENERATED, row)))
+        return [values[field.attname] for field in fields]
+
+    return sql, build_row
+
+
+def zipf_weights(count, skew):
+    """Накопленные веса степенного закона: k-й объект весит 1 / k^skew."""
+    return list(itertools.accumulate(
+        1 / rank ** skew for rank in range(1, count + 1)
+    ))
+
+
+def init_worker(options):
+    """Готовит процесс к генерации: id и накопленные веса авторов и групп."""
+    state.update(options)
+    state['author_weights'] = zipf_weights(
+        len(options['author_ids']), options['author_skew']
+    )
+    state['group_weights'] = zipf_weights(
+        len(options['group_ids']), options['group_skew']
+    )
+
+
+def generate_chunk(task):
+    """Строки постов одного отрезка времени: (text, date, date, author, group).
+
+    Отрезок и Faker засеяны номером куска, поэтому результат
+    не зависит от числа процессов.
+    """
+    index, count, started, finished = task
+    rng = random.Random(state['seed'] * 1000003 + index)
+    fake = Faker(LOCALE)
+    fake.seed_instance(state['seed'] * 1000003 + index)
+    sentences = [fake.sentence() for _ in range(SENTENCES)]
+    dates = sorted(rng.uniform(started, finished) for _ in range(count))
+    authors = rng.choices(
+        state['author_ids'], cum_weights=state['author_weights'], k=count
+    )
+    groups = rng.choices(
+        state['group_ids'], cum_weights=state['group_weights'], k=count
+    )
+    rows = []
+    for stamp, author_id, group_id in zip(dates, authors, groups):
+        if rng.random() < state['no_group']:
+            group_id = None
+        # Даты в том же текстовом виде, в каком их пишет бэкенд SQLite.
+        moment = datetime.utcfromtimestamp(stamp).isoformat(
+            ' ', 'microseconds'
+        )
+        text = ' '.join(rng.choices(sentences, k=rng.randint(1, 3)))
+        rows.append((text, moment, moment, author_id, group_id))
+    return rows
+
+
+class Command(BaseCommand):
+    help = (
+        'Наполняет базу синтетическими пользователями, группами и постами '
+        'для нагрузочных проверок. Посты распределены между авторами '
+        'и группами по степенному закону.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--groups', type=int, default=50)
+        parser.add_argument('--posts', type=int, default=100000)
+        parser.add_argument(
+            '--days', type=int, default=365,
+            help='За сколько последних дней разбросаны даты постов.',
+        )
+        parser.add_argument(
+            '--author-skew', type=float, default=1.0,
+            help='Показатель степенного закона постов на автора.',
+        )
+        parser.add_argument(
+            '--group-skew', type=float, default=1.0,
+            help='Показатель степенного закона популярности групп.',
+        )
+        parser.add_argument(
+            '--no-group', type=float, default=0.3,
+            help='Доля постов без группы.',
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=50000,
+            help='Постов в одной транзакции.',
+        )
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help='Процессов, генерирующих посты.',
+        )
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        if options['users'] < 1 or options['groups'] < 1:
+            raise CommandError('Нужен хотя бы один автор и одна группа.')
+        if options['chunk_size'] < 1 or options['workers'] < 1:
+            raise CommandError(
+                '--chunk-size и --workers должны быть больше нуля.'
+            )
+        fake = Faker(LOCALE)
+        fake.seed_instance(options['seed'])
+        author_ids = self.create_users(fake, options['users'])
+        group_ids = self.create_groups(fake, options['groups'])
+        rng = random.Random(options['seed'])
+        # Самые пишущие авторы и самые популярные группы — случайные.
+        rng.shuffle(author_ids)
+        rng.shuffle(group_ids)
+        with fast_writes():
+            self.create_posts(options, author_ids, group_ids)
+
+    def create_users(self, fake, count):
+        last_id = User.objects.order_by('-id').values_list(
+            'id', flat=True
+        ).first() or 0
+        password = make_password(None)
+        User.objects.bulk_create(
+            [
+                User(
+                    username=f'{fake.user_name()}{last_id + number}',
+                    first_name=fake.first_name(),
+                    last_name=fake.last_name(),
+                    password=password,
+                )
+                for number in range(1, count + 1)
+            ],
+            batch_size=500,
+        )
+        return list(User.objects.filter(id__gt=last_id).values_list(
+            'id', flat=True
+        ))
+
+    def create_groups(self, fake, count):
+        last_id = Group.objects.order_by('-id').values_list(
+            'id', flat=True
+        ).first() or 0
+        Group.objects.bulk_create(
+            [
+                Group(
+                    title=fake.catch_phrase()[:200],
+                    slug=f'group-{last_id + number}',
+                    description=fake.paragraph(),
+                )
+                for number in range(1, count + 1)
+            ],
+            batch_size=500,
+        )
+        return list(Group.objects.filter(id__gt=last_id).values_list(
+            'id', flat=True
+        ))
+
+    def create_posts(self, options, author_ids, group_ids):
+        """Вставляет посты кусками по chunk_size, каждый в своей транзакции.
+
+        Посты пишутся через executemany, а не bulk_create: на миллионе
+        строк создание объектов модели дороже самой вставки. Сигналов
+        нет, поэтому поисковый индекс, счетчики, границы страниц и кеш
+        страниц лент обновляются в конце.
+        """
+        total = options['posts']
+        chunk_size = options['chunk_size']
+        finished = timezone.now().timestamp()
+        started = finished - options['days'] * 24 * 60 * 60
+        span = (finished - started) / max(total, 1)
+        tasks = [
+            (
+                index, min(chunk_size, total - offset),
+                started + offset * span,
+                started + min(offset + chunk_size, total) * span,
+            )
+            for index, offset in enumerate(range(0, total, chunk_size))
+        ]
+        worker_options = {
+            key: options[key]
+            for key in ('seed', 'author_skew', 'group_skew', 'no_group')
+        }
+        worker_options.update(author_ids=author_ids, group_ids=group_ids)
+        last_id = Post.objects.order_by('-id').values_list(
+            'id', flat=True
+        ).first() or 0
+        sql, build_row = insert_statement()
+        began = time.monotonic()
+        done = 0
+        pool = None
+        if options['workers'] > 1:
+            pool = multiprocessing.Pool(
+                options['workers'], init_worker, (worker_options,)
+            )
+            chunks = pool.imap(generate_chunk, tasks)
+        else:
+            init_worker(worker_options)
+            chunks = map(generate_chunk, tasks)
+        try:
+            for rows in chunks:
+                with transaction.atomic(), connection.cursor() as cursor:
+                    cursor.executemany(sql, map(build_row, rows))
+                done += len(rows)
+                rate = done / max(time.monotonic() - began, 1e-9)
+                self.stdout.write(
+                    f'Создано постов: {done} из {total}, {rate:.0f} постов/с'
+                )
+        finally:
+            if pool is not None:
+                pool.terminate()
+        search.index_posts_after(last_id)
+        counters.recount()
+        boundaries.reset()
+        self.invalidate_pages(author_ids, group_ids)
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано пользователей: {len(author_ids)}, групп: '
+            f'{len(group_ids)}, постов: {done} за '
+            f'{time.monotonic() - began:.1f} с'
+        ))
+
+    def invalidate_pages(self, author_ids, group_ids):
+        """Сбрасывает кеш лент с новыми постами, как bulk_create_posts."""
+        feeds = [
+            page_cache.index_feed(),
+            *map(page_cache.group_feed, Group.objects.filter(
+                id__in=group_ids
+            ).values_list('slug', flat=True)),
+            *map(page_cache.author_feed, User.objects.filter(
+                id__in=author_ids
+            ).values_list('username', flat=True)),
+        ]
+        for start in range(0, len(feeds), FEEDS_BATCH):
+            page_cache.invalidate(*feeds[start:start + FEEDS_BATCH])
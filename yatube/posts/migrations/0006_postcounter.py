@@ -0,0 +1,38 @@
+# Generated by Django 2.2.16 on 2026-10-18 00:28
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0005_auto_20230119_0940'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='post',
+            name='group',
+            field=models.ForeignKey(blank=True, help_text='Укажите группу', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='posts', to='posts.Group', verbose_name='название группы'),
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='text',
+            field=models.TextField(help_text='Укажите текст поста', verbose_name='текст'),
+        ),
+        migrations.CreateModel(
+            name='PostCounter',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('site', 'сайт'), ('author', 'автор'), ('group', 'группа')], max_length=10, verbose_name='область')),
+                ('object_id', models.PositiveIntegerField(default=0, verbose_name='id автора или группы')),
+                ('value', models.IntegerField(default=0, verbose_name='число постов')),
+            ],
+            options={
+                'verbose_name': 'счетчик постов',
+                'verbose_name_plural': 'счетчики постов',
+                'unique_together': {('scope', 'object_id')},
+            },
+        ),
+    ]
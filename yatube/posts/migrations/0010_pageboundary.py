@@ -0,0 +1,36 @@
+# Generated by Django 2.2.16 on 2026-10-18 01:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0009_post_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PageBoundary',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('site', 'сайт'), ('author', 'автор'), ('group', 'группа')], max_length=10, verbose_name='область')),
+                ('object_id', models.PositiveIntegerField(default=0, verbose_name='id автора или группы')),
+                ('rank', models.PositiveIntegerField(verbose_name='номер поста в ленте')),
+                ('pub_date', models.DateTimeField(verbose_name='дата публикации поста')),
+                ('post_id', models.PositiveIntegerField(verbose_name='id поста')),
+            ],
+            options={
+                'verbose_name': 'граница страницы',
+                'verbose_name_plural': 'границы страниц',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='pageboundary',
+            index=models.Index(fields=['scope', 'object_id', 'pub_date', 'post_id'], name='page_boundary_key_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='pageboundary',
+            unique_together={('scope', 'object_id', 'rank')},
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 2.2.16 on 2026-10-18 02:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0011_follow_timeline'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostLocation',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('author_id', models.PositiveIntegerField(db_index=True, verbose_name='id автора')),
+                ('shard', models.CharField(max_length=100, verbose_name='шард')),
+            ],
+            options={
+                'verbose_name': 'шард поста',
+                'verbose_name_plural': 'шарды постов',
+            },
+        ),
+    ]
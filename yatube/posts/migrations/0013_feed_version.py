@@ -0,0 +1,25 @@
+# Generated by Django 2.2.16 on 2026-10-18 02:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0012_post_location'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedVersion',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('feed', models.CharField(max_length=200, unique=True, verbose_name='лента')),
+                ('version', models.CharField(max_length=32, verbose_name='версия')),
+            ],
+            options={
+                'verbose_name': 'версия ленты',
+                'verbose_name_plural': 'версии лент',
+            },
+        ),
+    ]
@@ -1,4 +1,9 @@
-from django.db import models
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import (DEFAULT_DB_ALIAS, connections, models, router,
+                       transaction)
+from django.db.models import Max, signals
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
@@ -25,6 +30,10 @@ class Post(models.Model):
         auto_now_add=True,
         verbose_name='дата публикации',
     )
+    updated = models.DateTimeField(
+        auto_now=True,
+        verbose_name='дата изменения',
+    )
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -40,9 +49,315 @@ class Post(models.Model):
         related_name='posts',
         help_text='Укажите группу',
     )
+    fan_out = models.BooleanField(
+        default=True,
+        editable=False,
+        verbose_name='разослан в ленты подписчиков',
+    )
 
     class Meta:
-        ordering = ['-pub_date']
+        ordering = ['-pub_date', '-id']
+        indexes = [
+            models.Index(
+                fields=['-pub_date', '-id'],
+                name='post_pub_date_id_idx',
+            ),
+            models.Index(
+                fields=['author', '-pub_date', '-id'],
+                name='post_author_pub_date_idx',
+            ),
+            models.Index(
+                fields=['group', '-pub_date', '-id'],
+                name='post_group_pub_date_idx',
+            ),
+            # Посты популярных авторов, которые читаются из ленты автора.
+            models.Index(
+                fields=['author', '-pub_date', '-id'],
+                name='post_pulled_idx',
+                condition=models.Q(fan_out=False),
+            ),
+        ]
 
     def __str__(self):
         return self.text[:15]
+
+    def save(self, *args, **kwargs):
+        using = kwargs.pop('using', None)
+        if not settings.POST_SHARDS:
+            using = using or router.db_for_write(Post, instance=self)
+            with transaction.atomic(using=using):
+                super().save(*args, using=using, **kwargs)
+            return
+        # С шардами базу выбирает роутер, даже для objects.create(),
+        # который передает основную базу.
+        with self.shard_lock() as using:
+            if self.pk is None and using in settings.POST_SHARDS:
+                # В шарде id поста выдает справочник в основной базе.
+                PostLocation.allocate([self], using)
+                kwargs['force_insert'] = True
+            super().save(*args, using=using, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        if not settings.POST_SHARDS:
+            with transaction.atomic():
+                return super().delete(*args, **kwargs)
+        with self.shard_lock() as using:
+            if using not in settings.POST_SHARDS:
+                # Пост основной базы, еще не перенесенный в шард.
+                return super().delete(*args, **kwargs)
+            return self.delete_from_shard(using)
+
+    @contextmanager
+    def shard_lock(self):
+        """Транзакция базы поста, в которой пост не переносится.
+
+        Транзакция начинается с BEGIN IMMEDIATE, а перенос автора
+        держит такую же блокировку источника до конца, см. shards.
+        Если пост переехал, пока ждали блокировку, запись уходит
+        в новый шард.
+        """
+        while True:
+            using = router.db_for_write(Post, instance=self)
+            with transaction.atomic(using=using):
+                if router.db_for_write(Post, instance=self) == using:
+                    yield using
+                    return
+
+    def delete_from_shard(self, using):
+        """Удаляет пост шарда.
+
+        Сборщик удаления Django искал бы записи лент подписок в шарде,
+        а они лежат в основной базе, поэтому сигналы шлются здесь.
+        """
+        signals.pre_delete.send(sender=Post, instance=self, using=using)
+        TimelineEntry.objects.filter(post_id=self.pk).delete()
+        with connections[using].cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {self._meta.db_table} WHERE id = %s', [self.pk]
+            )
+            deleted = cursor.rowcount
+        signals.post_delete.send(sender=Post, instance=self, using=using)
+        return deleted, {self._meta.label: deleted}
+
+    @classmethod
+    def insert_rows(cls, posts, using=DEFAULT_DB_ALIAS, batch_size=500):
+        """Вставляет посты с их pub_date и updated, без pre_save полей.
+
+        bulk_create перезаписал бы даты из-за auto_now_add и auto_now,
+        а отключать их у общего поля модели нельзя: параллельные save()
+        в других потоках остались бы без даты. id вставляется, только
+        если он уже выдан.
+        """
+        connection = connections[using]
+        fields = [
+            field for field in cls._meta.concrete_fields
+            if not field.primary_key or posts[0].pk is not None
+        ]
+        sql = (
+            f'INSERT INTO {cls._meta.db_table} '
+            f'({", ".join(field.column for field in fields)}) '
+            f'VALUES ({", ".join(["%s"] * len(fields))})'
+        )
+        rows = [
+            [
+                field.get_db_prep_save(
+                    getattr(post, field.attname), connection
+                )
+                for field in fields
+            ]
+            for post in posts
+        ]
+        with connection.cursor() as cursor:
+            for start in range(0, len(rows), batch_size):
+                cursor.executemany(sql, rows[start:start + batch_size])
+
+
+class PostLocation(models.Model):
+    """Шард поста: id поста во всех шардах и шард, где лежит пост.
+
+    Все посты автора лежат в одном шарде. Строки не удаляются вместе
+    с постами, чтобы id не выдавались повторно.
+    """
+
+    author_id = models.PositiveIntegerField(
+        db_index=True,
+        verbose_name='id автора',
+    )
+    shard = models.CharField(max_length=100, verbose_name='шард')
+
+    class Meta:
+        verbose_name = 'шард поста'
+        verbose_name_plural = 'шарды постов'
+
+    def __str__(self):
+        return f'{self.pk}@{self.shard}'
+
+    @classmethod
+    def allocate(cls, posts, shard):
+        """Выдает постам подряд идущие id и записывает их шард.
+
+        Транзакция основной базы начинается с BEGIN IMMEDIATE, поэтому
+        параллельные выдачи не пересекаются. Посты основной базы,
+        еще не перенесенные в шарды, тоже учитываются.
+        """
+        with transaction.atomic(using=DEFAULT_DB_ALIAS):
+            last = max(
+                cls.objects.aggregate(last=Max('id'))['last'] or 0,
+                Post.objects.using(DEFAULT_DB_ALIAS).aggregate(
+                    last=Max('id')
+                )['last'] or 0,
+            )
+            for number, post in enumerate(posts, last + 1):
+                post.pk = number
+            cls.objects.bulk_create(
+                cls(pk=post.pk, author_id=post.author_id, shard=shard)
+                for post in posts
+            )
+        return posts
+
+
+class FeedVersion(models.Model):
+    """Версия закешированных страниц ленты, общая для всех процессов.
+
+    Каждая правка ленты записывает новую версию; у ленты без строки
+    версия начальная.
+    """
+
+    feed = models.CharField(
+        max_length=200,
+        unique=True,
+        verbose_name='лента',
+    )
+    version = models.CharField(max_length=32, verbose_name='версия')
+
+    class Meta:
+        verbose_name = 'версия ленты'
+        verbose_name_plural = 'версии лент'
+
+    def __str__(self):
+        return f'{self.feed}@{self.version}'
+
+
+class Follow(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='follower',
+        verbose_name='подписчик',
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='following',
+        verbose_name='автор',
+    )
+
+    class Meta:
+        unique_together = ('user', 'author')
+        verbose_name = 'подписка'
+        verbose_name_plural = 'подписки'
+
+    def __str__(self):
+        return f'{self.user} -> {self.author}'
+
+
+class TimelineEntry(models.Model):
+    """Пост в ленте подписок пользователя, разосланный при публикации."""
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline',
+        verbose_name='читатель',
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries',
+        verbose_name='пост',
+    )
+    pub_date = models.DateTimeField(verbose_name='дата публикации поста')
+
+    class Meta:
+        unique_together = ('user', 'post')
+        indexes = [
+            models.Index(
+                fields=['user', '-pub_date', '-post'],
+                name='timeline_user_pub_date_idx',
+            ),
+        ]
+        verbose_name = 'запись ленты подписок'
+        verbose_name_plural = 'записи лент подписок'
+
+    def __str__(self):
+        return f'{self.user_id}:{self.post_id}'
+
+
+class PostCounter(models.Model):
+    """Денормализованное число постов на сайте, у автора или в группе."""
+
+    SITE = 'site'
+    AUTHOR = 'author'
+    GROUP = 'group'
+    SCOPES = (
+        (SITE, 'сайт'),
+        (AUTHOR, 'автор'),
+        (GROUP, 'группа'),
+    )
+
+    scope = models.CharField(
+        max_length=10,
+        choices=SCOPES,
+        verbose_name='область',
+    )
+    object_id = models.PositiveIntegerField(
+        default=0,
+        verbose_name='id автора или группы',
+    )
+    value = models.IntegerField(
+        default=0,
+        verbose_name='число постов',
+    )
+
+    class Meta:
+        unique_together = ('scope', 'object_id')
+        verbose_name = 'счетчик постов'
+        verbose_name_plural = 'счетчики постов'
+
+    def __str__(self):
+        return f'{self.scope}:{self.object_id}={self.value}'
+
+
+class PageBoundary(models.Model):
+    """Ключ (pub_date, id) поста с заданным номером от начала ленты.
+
+    Номер считается от самого старого поста, поэтому новые посты
+    в голове ленты не сдвигают уже сохраненные границы.
+    """
+
+    scope = models.CharField(
+        max_length=10,
+        choices=PostCounter.SCOPES,
+        verbose_name='область',
+    )
+    object_id = models.PositiveIntegerField(
+        default=0,
+        verbose_name='id автора или группы',
+    )
+    rank = models.PositiveIntegerField(verbose_name='номер поста в ленте')
+    pub_date = models.DateTimeField(verbose_name='дата публикации поста')
+    post_id = models.PositiveIntegerField(verbose_name='id поста')
+
+    class Meta:
+        unique_together = ('scope', 'object_id', 'rank')
+        indexes = [
+            models.Index(
+                fields=['scope', 'object_id', 'pub_date', 'post_id'],
+                name='page_boundary_key_idx',
+            ),
+        ]
+        verbose_name = 'граница страницы'
+        verbose_name_plural = 'границы страниц'
+
+    def __str__(self):
+        return f'{self.scope}:{self.object_id}#{self.rank}'
@@ -0,0 +1,155 @@
+"""Кеш страниц лент для анонимных посетителей.
+
+Страницы лежат в кеше процесса, а версии лент — в базе:
+правку ленты в одном процессе видят все, и ни один процесс не отдаст
+старую страницу. Версия читается из той же базы, что и сама лента:
+страница, собранная на отстающей реплике, получает ключ и ETag старой
+версии, а не новой.
+"""
+import hashlib
+import uuid
+from collections import Counter
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+from core import metrics
+
+from .models import FeedVersion, Group, Post, User
+
+INITIAL_VERSION = 'initial'
+
+stats = Counter()
+
+
+def index_feed():
+    return 'index'
+
+
+def group_feed(slug):
+    return f'group:{slug}'
+
+
+def author_feed(username):
+    return f'author:{username}'
+
+
+def feed_version(feed):
+    """Версия ленты; у ленты, которую еще не меняли, — начальная.
+
+    Внутри read_from_replica версия читается с той же реплики, что
+    и посты страницы.
+    """
+    return FeedVersion.objects.filter(feed=feed).values_list(
+        'version', flat=True
+    ).first() or INITIAL_VERSION
+
+
+def request_feed_version(request, feed):
+    """Версия ленты, прочитанная один раз за запрос.
+
+    Ее берут и ETag, и ключ страницы: они не расходятся, а база
+    читается один раз.
+    """
+    versions = request.__dict__.setdefault('feed_versions', {})
+    if feed not in versions:
+        versions[feed] = feed_version(feed)
+    return versions[feed]
+
+
+def invalidate(*feeds):
+    """Сбрасывает все закешированные страницы перечисленных лент.
+
+    Новая версия пишется в транзакции записи: другие процессы увидят
+    ее вместе с новыми данными. Чтения версий ничего не пишут.
+    """
+    feeds = set(feeds)
+    version = uuid.uuid4().hex
+    versions = FeedVersion.objects.using(DEFAULT_DB_ALIAS)
+    versions.filter(feed__in=feeds).update(version=version)
+    versions.bulk_create(
+        [FeedVersion(feed=feed, version=version) for feed in feeds],
+        ignore_conflicts=True,
+    )
+
+
+def cache_anonymous_page(feed):
+    """Кеширует страницы ленты для анонимных GET-запросов.
+
+    feed получает аргументы view и возвращает имя ленты; ключ страницы
+    складывается из пути к view, версии ленты и строки запроса.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method != 'GET' or request.user.is_authenticated:
+                return view(request, *args, **kwargs)
+            query = hashlib.md5(request.GET.urlencode().encode()).hexdigest()
+            name = feed(*args, **kwargs)
+            key = (
+                f'page:{view.__module__}.{view.__name__}:{name}:'
+                f'{request_feed_version(request, name)}:{query}'
+            )
+            response = cache.get(key)
+            if response is not None:
+                stats['hits'] += 1
+                metrics.inc(
+                    'yatube_cache_requests_total', cache='page', result='hit'
+                )
+                return response
+            stats['misses'] += 1
+            metrics.inc(
+                'yatube_cache_requests_total', cache='page', result='miss'
+            )
+            response = view(request, *args, **kwargs)
+            if response.status_code == 200:
+                cache.set(key, response, settings.PAGE_CACHE_TIMEOUT)
+            return response
+        return wrapper
+    return decorator
+
+
+def post_feeds(post, old_author_id, old_group_id):
+    """Ленты, в которых появился, изменился или пропал пост."""
+    feeds = [index_feed(), author_feed(post.author.username)]
+    if post.group_id is not None:
+        feeds.append(group_feed(post.group.slug))
+    if old_author_id not in (None, post.author_id):
+        feeds.extend(
+            author_feed(username) for username in User.objects.filter(
+                pk=old_author_id
+            ).values_list('username', flat=True)
+        )
+    if old_group_id not in (None, post.group_id):
+        feeds.extend(
+            group_feed(slug) for slug in Group.objects.filter(
+                pk=old_group_id
+            ).values_list('slug', flat=True)
+        )
+    return feeds
+
+
+def group_feeds(group, *slugs):
+    """Ленты, где видны название и ссылка группы."""
+    if settings.POST_SHARDS:
+        # Авторов нет в шардах: id собираются со всех шардов.
+        author_ids = set()
+        for alias in settings.POST_SHARDS:
+            author_ids.update(
+                Post.objects.using(alias).filter(group=group).order_by()
+                .values_list('author_id', flat=True).distinct()
+            )
+        authors = User.objects.filter(pk__in=author_ids).values_list(
+            'username', flat=True
+        )
+    else:
+        authors = Post.objects.filter(group=group).order_by().values_list(
+            'author__username', flat=True
+        ).distinct()
+    return [
+        index_feed(),
+        *(group_feed(slug) for slug in slugs if slug),
+        *(author_feed(username) for username in authors),
+    ]
@@ -0,0 +1,155 @@
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connection, connections, transaction
+
+from . import shards
+from .counters import post_databases
+from .models import Post
+
+FTS_TABLE = 'posts_post_fts'
+BATCH_SIZE = 2000
+
+
+def fts_available():
+    """Полнотекстовый индекс есть только на SQLite (FTS5)."""
+    return connection.vendor == 'sqlite'
+
+
+def match_expression(query):
+    """Переводит ввод пользователя в безопасный запрос FTS5.
+
+    Каждое слово берется в кавычки, поэтому операторы и спецсимволы
+    FTS5 из запроса не исполняются; слова ищутся все вместе.
+    """
+    words = query.split()
+    return ' '.join('"{}"'.format(word.replace('"', '""')) for word in words)
+
+
+class ShardResults:
+    """Результаты поиска по шардам для Paginator.
+
+    id ищутся в индексе основной базы, посты страницы — в их шардах.
+    Дат постов в индексе нет, поэтому при равной релевантности выше
+    посты с большим id: id выдаются по порядку создания.
+    """
+
+    ordered = True
+
+    def __init__(self, expression):
+        self.expression = expression
+
+    def count(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT COUNT(*) FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+                [self.expression],
+            )
+            return cursor.fetchone()[0]
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice) or index.step is not None:
+            raise TypeError('Результаты поиска берутся только срезом')
+        start = index.start or 0
+        limit = -1 if index.stop is None else max(index.stop - start, 0)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+                f'ORDER BY rank, rowid DESC LIMIT %s OFFSET %s',
+                [self.expression, limit, start],
+            )
+            post_ids = [row[0] for row in cursor.fetchall()]
+        return shards.get_posts(post_ids)
+
+
+def search_posts(query, posts=None):
+    """Посты, подходящие под запрос, по убыванию релевантности.
+
+    С шардами посты берутся из шардов, а posts не учитывается.
+    """
+    if posts is None:
+        posts = Post.objects.all()
+    expression = match_expression(query)
+    if not expression:
+        return posts.none()
+    if settings.POST_SHARDS:
+        return ShardResults(expression)
+    if not fts_available():
+        for word in query.split():
+            posts = posts.filter(text__icontains=word)
+        return posts
+    return posts.extra(
+        tables=[FTS_TABLE],
+        where=[
+            f'{FTS_TABLE}.rowid = posts_post.id',
+            f'{FTS_TABLE} MATCH %s',
+        ],
+        params=[expression],
+        select={'rank': f'{FTS_TABLE}.rank'},
+        order_by=['rank', '-pub_date'],
+    )
+
+
+def index_posts(posts):
+    if not fts_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT OR REPLACE INTO {FTS_TABLE} (rowid, text) '
+            f'VALUES (%s, %s)',
+            [(post.pk, post.text) for post in posts],
+        )
+
+
+def index_posts_after(post_id):
+    """Индексирует посты с id больше post_id, например после bulk_create."""
+    if not fts_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT OR REPLACE INTO {FTS_TABLE} (rowid, text) '
+            f'SELECT id, text FROM posts_post WHERE id > %s',
+            [post_id],
+        )
+
+
+def unindex_posts(post_ids):
+    if not fts_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'DELETE FROM {FTS_TABLE} WHERE rowid = %s',
+            [(post_id,) for post_id in post_ids],
+        )
+
+
+def rebuild():
+    """Пересобирает индекс по постам всех баз, возвращает число постов."""
+    if not fts_available():
+        return 0
+    total = 0
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        for alias in post_databases():
+            if alias == DEFAULT_DB_ALIAS:
+                cursor.execute(
+                    f'INSERT INTO {FTS_TABLE} (rowid, text) '
+                    f'SELECT id, text FROM posts_post'
+                )
+                total += cursor.rowcount
+                continue
+            # Таблица постов шарда в другом файле: строки идут пачками.
+            with connections[alias].cursor() as reader:
+                reader.execute('SELECT id, text FROM posts_post')
+                while True:
+                    rows = reader.fetchmany(BATCH_SIZE)
+                    if not rows:
+                        break
+                    cursor.executemany(
+                        f'INSERT INTO {FTS_TABLE} (rowid, text) '
+                        f'VALUES (%s, %s)',
+                        rows,
+                    )
+                    total += len(rows)
+    return total
@@ -0,0 +1,345 @@
+"""Посты в нескольких базах SQLite, разделенные по автору.
+
+Шарды — алиасы из settings.POST_SHARDS. Все посты автора лежат в одном
+шарде, а справочник PostLocation в основной базе выдает id постов
+и помнит шард каждого поста. Поэтому профиль и страница поста читают
+один шард, а перенос автора в другой шард меняет только справочник.
+Авторы, группы и остальные таблицы остаются в основной базе.
+
+Ленты сайта и групп собираются со всех шардов слиянием по (pub_date, id)
+и листаются только курсорами, лента подписок — так же из шардов
+авторов. Поиск ищет id в индексе основной базы, а посты берет
+из шардов; выгрузка и API читают шарды. Админки постов с шардами нет:
+ее список, поиск и массовые правки работают с одной базой.
+
+Без шардов функции модуля работают с основной базой, как раньше.
+"""
+import heapq
+from itertools import islice
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import prefetch_related_objects
+from django.utils import timezone
+
+from .models import Follow, Post, PostLocation, TimelineEntry
+from .utils import (POSTS_ON_PAGE, cursor_key, cursor_page, request_cursors,
+                    seek)
+
+BATCH_SIZE = 500
+COLUMNS = [field.column for field in Post._meta.concrete_fields]
+
+
+def home_shard(author_id):
+    """Шард, который POST_SHARDS назначает автору."""
+    return settings.POST_SHARDS[author_id % len(settings.POST_SHARDS)]
+
+
+def shards_of(author_ids):
+    """Шарды авторов: где уже лежат их посты, иначе назначенный."""
+    author_ids = set(author_ids)
+    placed = dict(
+        PostLocation.objects.filter(author_id__in=author_ids)
+        .values_list('author_id', 'shard').distinct()
+    )
+    return {
+        author_id: placed.get(author_id) or home_shard(author_id)
+        for author_id in author_ids
+    }
+
+
+def shard_for(author_id):
+    return shards_of([author_id])[author_id]
+
+
+def author_posts(author_id):
+    """Посты автора из его шарда с авторами и группами."""
+    if not settings.POST_SHARDS:
+        return Post.objects.select_related('author', 'group').filter(
+            author_id=author_id
+        )
+    # Авторов и групп в шарде нет: они читаются из основной базы.
+    return Post.objects.using(shard_for(author_id)).filter(
+        author_id=author_id
+    ).prefetch_related('author', 'group')
+
+
+def post_shard(post_id):
+    """Шард поста по справочнику или None."""
+    return PostLocation.objects.filter(pk=post_id).values_list(
+        'shard', flat=True
+    ).first()
+
+
+def get_post(post_id):
+    """Пост с автором и группой; шард ищется по справочнику."""
+    if not settings.POST_SHARDS:
+        return Post.objects.select_related('author', 'group').get(id=post_id)
+    shard = post_shard(post_id)
+    if shard is None:
+        raise Post.DoesNotExist('Поста нет в справочнике шардов')
+    return Post.objects.using(shard).prefetch_related(
+        'author', 'group'
+    ).get(id=post_id)
+
+
+def get_posts(post_ids):
+    """Посты по id в том же порядке, из их шардов, с авторами и группами.
+
+    Постов, которых нет в справочнике или в шарде, в списке нет.
+    """
+    by_shard = {}
+    for post_id, shard in PostLocation.objects.filter(
+        pk__in=post_ids
+    ).values_list('pk', 'shard'):
+        by_shard.setdefault(shard, []).append(post_id)
+    found = {}
+    for alias, ids in by_shard.items():
+        found.update(
+            (post.pk, post)
+            for post in Post.objects.using(alias).filter(pk__in=ids)
+        )
+    posts = [found[post_id] for post_id in post_ids if post_id in found]
+    prefetch_related_objects(posts, 'author', 'group')
+    return posts
+
+
+def merged_page(request, querysets, per_page=POSTS_ON_PAGE):
+    """Страница из постов нескольких шардов: k-way слияние по (pub_date, id).
+
+    Каждый шард отдает не больше per_page + 1 постов от курсора:
+    больше на страницу попасть не может. Авторы и группы всей страницы
+    читаются из основной базы двумя запросами.
+    """
+    after, before = request_cursors(request)
+    runs = [
+        seek(posts, after, before, per_page + 1) for posts in querysets
+    ]
+    rows = islice(
+        heapq.merge(*runs, key=cursor_key, reverse=before is None),
+        per_page + 1,
+    )
+    page_obj = cursor_page(list(rows), after, before, per_page)
+    prefetch_related_objects(page_obj.object_list, 'author', 'group')
+    return page_obj
+
+
+def feed_page(request, per_page=POSTS_ON_PAGE, **filters):
+    """Страница ленты со всех шардов."""
+    return merged_page(
+        request,
+        [
+            Post.objects.using(alias).filter(**filters)
+            for alias in settings.POST_SHARDS
+        ],
+        per_page,
+    )
+
+
+def follow_page(request, user, per_page=POSTS_ON_PAGE):
+    """Страница ленты подписок из шардов авторов, на которых подписан user.
+
+    Лент подписок в шардах нет, посты не рассылаются: каждый шард ищет
+    посты своих авторов по индексу (author, pub_date, id).
+    """
+    authors = {}
+    for author_id, alias in shards_of(
+        Follow.objects.filter(user=user).values_list('author_id', flat=True)
+    ).items():
+        authors.setdefault(alias, []).append(author_id)
+    return merged_page(
+        request,
+        [
+            Post.objects.using(alias).filter(author_id__in=author_ids)
+            for alias, author_ids in authors.items()
+        ],
+        per_page,
+    )
+
+
+def bulk_create(posts, batch_size=BATCH_SIZE):
+    """Раскладывает посты по шардам авторов и создает их пачками.
+
+    id выдает справочник, поэтому после вызова они есть у всех постов.
+    Шард авторов перепроверяется под блокировкой записи шарда, как
+    в Post.shard_lock, и там же ставится updated, см. move_author.
+    """
+    pending = list(posts)
+    while pending:
+        alias = shard_for(pending[0].author_id)
+        with transaction.atomic(using=alias):
+            placement = shards_of(post.author_id for post in pending)
+            shard_posts = [
+                post for post in pending if placement[post.author_id] == alias
+            ]
+            if shard_posts:
+                now = timezone.now()
+                for post in shard_posts:
+                    post.updated = now
+                PostLocation.allocate(shard_posts, alias)
+                Post.insert_rows(shard_posts, alias, batch_size=batch_size)
+        pending = [
+            post for post in pending if placement[post.author_id] != alias
+        ]
+    return posts
+
+
+def misplaced():
+    """Авторы не в назначенном шарде: (author_id, где лежат, куда нужно).
+
+    Посты основной базы, еще не разложенные по шардам, тоже попадают
+    в список.
+    """
+    rows = PostLocation.objects.values_list('author_id', 'shard').distinct()
+    rows = [
+        (author_id, shard) for author_id, shard in rows
+        if shard != home_shard(author_id)
+    ]
+    rows.extend(
+        (author_id, DEFAULT_DB_ALIAS) for author_id in
+        Post.objects.using(DEFAULT_DB_ALIAS).order_by().values_list(
+            'author_id', flat=True
+        ).distinct()
+    )
+    return [
+        (author_id, shard, home_shard(author_id))
+        for author_id, shard in sorted(rows)
+    ]
+
+
+def copy_posts(author_id, source, target, since=None,
+               batch_size=BATCH_SIZE):
+    """Копирует посты автора как есть, с id и датами; возвращает id.
+
+    INSERT OR REPLACE: повторная копия перезаписывает строки,
+    поэтому прерванный перенос можно запустить снова.
+    """
+    query = (
+        f'SELECT {", ".join(COLUMNS)} FROM posts_post WHERE author_id = %s'
+    )
+    params = [author_id]
+    if since is not None:
+        query += ' AND updated >= %s'
+        params.append(
+            connections[source].ops.adapt_datetimefield_value(since)
+        )
+    insert = (
+        f'INSERT OR REPLACE INTO posts_post ({", ".join(COLUMNS)}) '
+        f'VALUES ({", ".join(["%s"] * len(COLUMNS))})'
+    )
+    copied = []
+    with connections[source].cursor() as reader, transaction.atomic(
+        using=target
+    ), connections[target].cursor() as writer:
+        reader.execute(query, params)
+        while True:
+            rows = reader.fetchmany(batch_size)
+            if not rows:
+                return copied
+            writer.executemany(insert, rows)
+            copied.extend(row[0] for row in rows)
+
+
+def delete_posts(alias, post_ids, batch_size=BATCH_SIZE):
+    """Удаляет из шарда посты с этими id, пачками."""
+    post_ids = sorted(post_ids)
+    with connections[alias].cursor() as cursor:
+        for start in range(0, len(post_ids), batch_size):
+            batch = post_ids[start:start + batch_size]
+            cursor.execute(
+                f'DELETE FROM posts_post '
+                f'WHERE id IN ({", ".join(["%s"] * len(batch))})',
+                batch,
+            )
+
+
+def move_author(author_id, source, target, batch_size=BATCH_SIZE):
+    """Переносит посты автора из source в target; возвращает их число.
+
+    Основная копия идет без блокировок. Затем перенос берет блокировку
+    записи source и держит ее до конца: докопирует посты, созданные
+    или измененные за время копии, переключает справочник и удаляет
+    из source только скопированные посты. Записи постов ждут эту
+    блокировку и после нее видят новый шард, см. Post.shard_lock.
+    """
+    with transaction.atomic(using=source):
+        # Записи ставят updated под блокировкой шарда, поэтому все,
+        # что не попадет в первую копию, изменено не раньше started.
+        started = timezone.now()
+    copied = set(
+        copy_posts(author_id, source, target, batch_size=batch_size)
+    )
+    with transaction.atomic(using=source):
+        remaining = set(
+            Post.objects.using(source).filter(author_id=author_id)
+            .values_list('id', flat=True)
+        )
+        copied.update(copy_posts(
+            author_id, source, target, since=started, batch_size=batch_size
+        ))
+        # Посты, удаленные из source за время копии.
+        delete_posts(target, copied - remaining, batch_size)
+        with transaction.atomic(using=DEFAULT_DB_ALIAS):
+            if source == DEFAULT_DB_ALIAS:
+                PostLocation.objects.bulk_create(
+                    [
+                        PostLocation(
+                            pk=post_id, author_id=author_id, shard=target
+                        )
+                        for post_id in remaining
+                    ],
+                    batch_size=batch_size, ignore_conflicts=True,
+                )
+                # Ленты подписок ссылаются на посты основной базы.
+                TimelineEntry.objects.filter(
+                    post__author_id=author_id
+                ).delete()
+            PostLocation.objects.filter(author_id=author_id).update(
+                shard=target
+            )
+        delete_posts(source, remaining & copied, batch_size)
+    return len(remaining)
+
+
+class ShardRouter:
+    """Пишет пост в шард автора, связанные с ним модели — в основную базу.
+
+    Посты шардов читаются через using(), поэтому db_for_read отвечает
+    только за авторов и группы, которые подгружаются к постам шарда.
+    """
+
+    def db_for_read(self, model, **hints):
+        instance = hints.get('instance')
+        if (
+            model is not Post and instance is not None
+            and instance._state.db in settings.POST_SHARDS
+        ):
+            return DEFAULT_DB_ALIAS
+        return None
+
+    def db_for_write(self, model, **hints):
+        instance = hints.get('instance')
+        if not settings.POST_SHARDS or instance is None:
+            return None
+        if isinstance(instance, Post):
+            # У нового поста _state.db ставит присвоение автора.
+            if instance._state.adding:
+                return shard_for(instance.author_id)
+            # Пост мог переехать после того, как его прочитали.
+            return post_shard(instance.pk) or instance._state.db
+        if instance._state.db in settings.POST_SHARDS:
+            return DEFAULT_DB_ALIAS
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        if obj1._state.db in settings.POST_SHARDS or (
+            obj2._state.db in settings.POST_SHARDS
+        ):
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # В шардах только таблица постов.
+        if db in settings.POST_SHARDS:
+            return app_label == 'posts' and model_name == 'post'
+        return None
@@ -0,0 +1,109 @@
+from django.conf import settings
+from django.db.models.signals import (post_delete, post_init, post_save,
+                                      pre_delete, pre_save)
+from django.dispatch import receiver
+
+from . import boundaries, counters, page_cache, search, timeline
+from .models import Follow, Group, Post, PostCounter, User
+
+
+@receiver(post_init, sender=Post)
+def remember_saved_fields(sender, instance, **kwargs):
+    # Через __dict__, чтобы не подгружать отложенные поля.
+    instance._saved = (
+        instance.__dict__.get('author_id'),
+        instance.__dict__.get('group_id'),
+    )
+
+
+@receiver(post_init, sender=Group)
+def remember_saved_slug(sender, instance, **kwargs):
+    instance._saved_slug = instance.__dict__.get('slug')
+
+
+@receiver(pre_save, sender=Post)
+def choose_fan_out(sender, instance, raw=False, **kwargs):
+    # Посты популярных авторов не рассылаются, их читают из ленты автора.
+    if not raw and instance._state.adding:
+        instance.fan_out = not timeline.popular_authors([instance.author_id])
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    author_id, group_id = instance._saved
+    if created:
+        counters.change(+1, instance.author_id, instance.group_id)
+        # Ленты подписок ссылаются на посты основной базы, см. shards.
+        if instance.fan_out and not settings.POST_SHARDS:
+            timeline.fan_out(instance)
+    else:
+        if author_id != instance.author_id:
+            counters.change(-1, author_id=author_id, site=False)
+            counters.change(+1, author_id=instance.author_id, site=False)
+        if group_id != instance.group_id:
+            counters.change(-1, group_id=group_id, site=False)
+            counters.change(+1, group_id=instance.group_id, site=False)
+    feeds = set(boundaries.post_feeds(instance.author_id, instance.group_id))
+    if not created:
+        # Сдвигаются только ленты, которые пост покинул или в которые попал.
+        feeds ^= set(boundaries.post_feeds(author_id, group_id))
+    boundaries.invalidate(feeds, instance.pub_date, instance.pk)
+    page_cache.invalidate(
+        *page_cache.post_feeds(instance, author_id, group_id)
+    )
+    search.index_posts([instance])
+    instance._saved = (instance.author_id, instance.group_id)
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    counters.change(-1, instance.author_id, instance.group_id)
+    boundaries.invalidate(
+        boundaries.post_feeds(instance.author_id, instance.group_id),
+        instance.pub_date, instance.pk,
+    )
+    page_cache.invalidate(*page_cache.post_feeds(instance, None, None))
+    search.unindex_posts([instance.pk])
+
+
+@receiver(post_save, sender=Group)
+def group_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    page_cache.invalidate(*page_cache.group_feeds(
+        instance, instance.slug, instance._saved_slug
+    ))
+    instance._saved_slug = instance.slug
+
+
+@receiver(pre_delete, sender=Group)
+def group_deleting(sender, instance, **kwargs):
+    page_cache.invalidate(*page_cache.group_feeds(instance, instance.slug))
+
+
+@receiver(post_delete, sender=Group)
+def group_deleted(sender, instance, **kwargs):
+    counters.forget(PostCounter.GROUP, instance.pk)
+    boundaries.forget(PostCounter.GROUP, instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def author_deleted(sender, instance, **kwargs):
+    counters.forget(PostCounter.AUTHOR, instance.pk)
+    boundaries.forget(PostCounter.AUTHOR, instance.pk)
+
+
+@receiver(post_save, sender=Follow)
+def follow_saved(sender, instance, created, raw=False, **kwargs):
+    if raw or not created:
+        return
+    timeline.backfill(instance.user_id, instance.author_id)
+    page_cache.invalidate(page_cache.author_feed(instance.author.username))
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    timeline.drop(instance.user_id, instance.author_id)
+    page_cache.invalidate(page_cache.author_feed(instance.author.username))
@@ -0,0 +1,21 @@
+from django import template
+
+from posts import utils
+
+register = template.Library()
+
+
+@register.simple_tag
+def page_window(page_obj):
+    """Окно ссылок пагинатора: номера страниц и None для многоточия."""
+    return utils.page_window(page_obj)
+
+
+@register.simple_tag
+def next_cursor(page_obj):
+    """Курсор страницы, следующей за page_obj, или пустая строка."""
+    if getattr(page_obj, 'is_cursor', False):
+        return page_obj.next_cursor or ''
+    if not page_obj.has_next():
+        return ''
+    return utils.encode_cursor(page_obj[len(page_obj) - 1])
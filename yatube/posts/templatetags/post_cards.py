@@ -0,0 +1,62 @@
+import hashlib
+
+from django import template
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import get_template
+from django.utils.safestring import mark_safe
+from django.utils.translation import get_language
+
+from core import metrics
+
+register = template.Library()
+
+CARD_TEMPLATE = 'includes/post_card.html'
+
+
+def card_key(post, is_author, is_music):
+    """Ключ карточки: id, версия поста и все, что видно на карточке."""
+    group = post.group
+    shown = '|'.join((
+        post.author.username,
+        group.slug if group else '',
+        group.title if group else '',
+        get_language() or '',
+    ))
+    digest = hashlib.md5(shown.encode()).hexdigest()[:12]
+    return (
+        f'post-card:{post.pk}:{post.updated.timestamp()}:'
+        f'{int(is_author)}{int(is_music)}:{digest}'
+    )
+
+
+@register.simple_tag
+def post_cards(posts, is_author=False, is_music=False):
+    """Карточки постов страницы, закешированные по одной.
+
+    Все карточки страницы читаются из кеша одним get_many,
+    рендерятся только отсутствующие.
+    """
+    keys = {card_key(post, is_author, is_music): post for post in posts}
+    cards = cache.get_many(list(keys))
+    metrics.inc(
+        'yatube_cache_requests_total', len(cards),
+        cache='post_card', result='hit',
+    )
+    metrics.inc(
+        'yatube_cache_requests_total', len(keys) - len(cards),
+        cache='post_card', result='miss',
+    )
+    missing = {}
+    if len(cards) < len(keys):
+        card_template = get_template(CARD_TEMPLATE)
+        for key, post in keys.items():
+            if key not in cards:
+                missing[key] = card_template.render({
+                    'post': post,
+                    'is_author': is_author,
+                    'is_music': is_music,
+                })
+        cache.set_many(missing, settings.POST_CARD_CACHE_TIMEOUT)
+        cards.update(missing)
+    return [mark_safe(cards[key]) for key in keys]
@@ -4,6 +4,7 @@ PROFILE_URL = 'posts:profile'
 POST_DETAIL_URL = 'posts:post_detail'
 POST_CREATE_URL = 'posts:post_create'
 POST_EDIT_URL = 'posts:post_edit'
+SEARCH_URL = 'posts:search'
 
 INDEX_TEMPLATE = 'posts/index.html'
 GROUP_TEMPLATE = 'posts/group_list.html'
@@ -11,3 +12,4 @@ PROFILE_TEMPLATE = 'posts/profile.html'
 POST_DETAIL_TEMPLATE = 'posts/post_detail.html'
 POST_CREATE_TEMPLATE = 'posts/create_post.html'
 POST_EDIT_TEMPLATE = 'posts/create_post.html'
+SEARCH_TEMPLATE = 'posts/search.html'
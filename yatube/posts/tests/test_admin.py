@@ -0,0 +1,76 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.counters import group_posts_count
+from posts.models import Group, Post, User
+
+CHANGELIST_URL = reverse('admin:posts_post_changelist')
+
+
+class PostAdminTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(
+            'admin', 'admin@example.com', 'password'
+        )
+        cls.groups = Group.objects.bulk_create([
+            Group(title=f'Группа {i}', slug=f'group-{i}', description='')
+            for i in range(50)
+        ])
+        cls.group, cls.other_group = Group.objects.all()[:2]
+        Post.objects.bulk_create([
+            Post(text=f'Пост {i}', author=cls.admin, group=cls.group)
+            for i in range(30)
+        ])
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        """Список постов не делает запросов на строку и не считает таблицу."""
+        self.client.get(CHANGELIST_URL)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(CHANGELIST_URL)
+        self.assertEqual(response.status_code, 200)
+        self.assertLess(len(queries), 10)
+        statements = [query['sql'] for query in queries]
+        self.assertFalse(any(
+            'COUNT(*)' in sql and 'posts_post' in sql for sql in statements
+        ))
+        self.assertFalse(
+            any('FROM "posts_group"' in sql for sql in statements)
+        )
+
+    def test_changelist_render_is_not_a_transaction(self):
+        """Просмотр списка не открывает транзакцию с блокировкой записи."""
+        self.client.get(CHANGELIST_URL)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(CHANGELIST_URL)
+        self.assertFalse(
+            [query['sql'] for query in queries if 'SAVEPOINT' in query['sql']]
+        )
+
+    def test_group_column_uses_autocomplete(self):
+        """Группа в списке редактируется через автодополнение."""
+        response = self.client.get(CHANGELIST_URL)
+        self.assertContains(response, 'admin-autocomplete')
+        self.assertNotContains(response, self.groups[-1].title)
+
+    def test_list_edit_keeps_counters(self):
+        """Правка группы из списка обновляет счетчики групп."""
+        posts = list(Post.objects.all()[:2])
+        data = {
+            'form-TOTAL_FORMS': '2',
+            'form-INITIAL_FORMS': '2',
+            '_save': 'Save',
+        }
+        for i, post in enumerate(posts):
+            data[f'form-{i}-id'] = post.id
+            data[f'form-{i}-group'] = self.other_group.id
+        response = self.client.post(CHANGELIST_URL, data)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(group_posts_count(self.other_group.id), 2)
+        self.assertEqual(group_posts_count(self.group.id), 28)
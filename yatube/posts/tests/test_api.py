@@ -0,0 +1,70 @@
+import json
+
+from django.test import TestCase
+from django.urls import reverse
+
+from posts.models import Group, Post, User
+from posts.utils import POSTS_ON_PAGE
+
+
+class FeedApiTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        Post.objects.bulk_create(
+            [Post(author=cls.author, text=f'Пост {i}', group=cls.group)
+             for i in range(POSTS_ON_PAGE + 2)]
+        )
+        cls.urls = (
+            reverse('posts:api_index'),
+            reverse('posts:api_group_list', args=[cls.group.slug]),
+            reverse('posts:api_profile', args=[cls.author.username]),
+        )
+
+    def get_json(self, url, params=None):
+        response = self.client.get(url, params)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        return json.loads(b''.join(response.streaming_content))
+
+    def test_feed_pages_follow_cursor(self):
+        """Лента в JSON листается курсорами и отдает поля карточки."""
+        expected = list(Post.objects.values_list('id', flat=True))
+        for url in self.urls:
+            with self.subTest(url=url):
+                first = self.get_json(url)
+                self.assertIsNone(first['previous'])
+                self.assertEqual(
+                    set(first['results'][0]),
+                    {'id', 'text', 'pub_date', 'author',
+                     'group_slug', 'group_title'},
+                )
+                second = self.get_json(url, {'after': first['next']})
+                self.assertIsNone(second['next'])
+                self.assertEqual(
+                    [row['id'] for row in first['results']]
+                    + [row['id'] for row in second['results']],
+                    expected,
+                )
+                back = self.get_json(url, {'before': second['previous']})
+                self.assertEqual(back['results'], first['results'])
+
+    def test_feed_runs_one_query(self):
+        """Непустая лента в JSON — один запрос к базе."""
+        for url in self.urls:
+            with self.subTest(url=url), self.assertNumQueries(1):
+                self.get_json(url)
+
+    def test_unknown_owner_returns_404(self):
+        """Лента несуществующей группы или автора отвечает 404."""
+        for url in (
+            reverse('posts:api_group_list', args=['nope']),
+            reverse('posts:api_profile', args=['nobody']),
+        ):
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 404)
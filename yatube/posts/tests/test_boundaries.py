@@ -0,0 +1,115 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.boundaries import STEP
+from posts.bulk import bulk_create_posts
+from posts.models import Group, PageBoundary, Post, User
+from posts.utils import CURSOR_ORDERING, POSTS_ON_PAGE
+
+POSTS_COUNT = 95
+
+
+@mock.patch('posts.boundaries.MIN_OFFSET', 0)
+class PageBoundaryTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.other = User.objects.create_user(username='other')
+        cls.group = Group.objects.create(
+            title='Группа',
+            slug='group',
+            description='Тестовое описание',
+        )
+        start = timezone.now() - timedelta(days=1)
+        # По три поста на секунду, чтобы порядок решали и id.
+        bulk_create_posts([
+            Post(
+                text=f'Пост {i}',
+                author=cls.author if i % 4 else cls.other,
+                group=cls.group if i % 2 else None,
+                pub_date=start + timedelta(seconds=i // 3),
+            ) for i in range(POSTS_COUNT)
+        ])
+
+    def setUp(self):
+        cache.clear()
+
+    def feeds(self):
+        return (
+            (reverse('posts:index'), Post.objects.all()),
+            (
+                reverse('posts:group_list', args=[self.group.slug]),
+                Post.objects.filter(group=self.group),
+            ),
+            (
+                reverse('posts:profile', args=[self.author.username]),
+                Post.objects.filter(author=self.author),
+            ),
+        )
+
+    def assertPagesMatchOffsets(self):
+        for url, posts in self.feeds():
+            expected = list(
+                posts.order_by(*CURSOR_ORDERING).values_list('id', flat=True)
+            )
+            pages = -(-len(expected) // POSTS_ON_PAGE)
+            for number in range(1, pages + 1):
+                with self.subTest(url=url, page=number):
+                    response = self.client.get(url, {'page': number})
+                    start = (number - 1) * POSTS_ON_PAGE
+                    self.assertEqual(
+                        [post.id for post in response.context['page_obj']],
+                        expected[start:start + POSTS_ON_PAGE],
+                    )
+
+    def test_pages_match_offset_pagination(self):
+        """Страница по границе совпадает со страницей по OFFSET."""
+        self.assertPagesMatchOffsets()
+        self.assertTrue(PageBoundary.objects.exists())
+
+    def test_boundaries_follow_post_changes(self):
+        """Границы остаются верными после правок ленты."""
+        self.assertPagesMatchOffsets()
+        Post.objects.create(text='Новый пост', author=self.author)
+        oldest = Post.objects.order_by('pub_date', 'id')
+        oldest[5].delete()
+        moved = Post.objects.filter(group=None).order_by('pub_date')[3]
+        moved.group = self.group
+        moved.save()
+        bulk_create_posts([Post(
+            text='Старый пост',
+            author=self.author,
+            group=self.group,
+            pub_date=timezone.now() - timedelta(days=2),
+        )])
+        self.assertPagesMatchOffsets()
+
+    def test_new_post_keeps_boundaries(self):
+        """Новый пост в голове ленты не сбрасывает границы."""
+        self.assertPagesMatchOffsets()
+        total = PageBoundary.objects.count()
+        Post.objects.create(text='Новый пост', author=self.author)
+        self.assertEqual(PageBoundary.objects.count(), total)
+
+    def test_deep_page_skips_few_rows(self):
+        """Глубокая страница пропускает меньше STEP строк, а не OFFSET."""
+        params = {'page': -(-POSTS_COUNT // POSTS_ON_PAGE) - 1}
+        self.client.get(reverse('posts:index'), params)
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('posts:index'), params)
+        page_sql = [
+            query['sql'] for query in queries.captured_queries
+            if 'FROM "posts_post"' in query['sql']
+        ]
+        self.assertEqual(len(page_sql), 1)
+        offset = int(page_sql[0].rsplit('OFFSET', 1)[1])
+        self.assertLess(offset, STEP)
@@ -0,0 +1,90 @@
+from http import HTTPStatus
+
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Group, Post, User
+from posts.tests import constants as cs
+from posts.tests.workers import worker
+
+
+class ConditionalGetTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.author,
+            text='Тестовый пост',
+            group=cls.group,
+        )
+        cls.urls = (
+            reverse(cs.INDEX_URL),
+            reverse(cs.GROUP_URL, args=[cls.group.slug]),
+            reverse(cs.PROFILE_URL, args=[cls.author.username]),
+            reverse(cs.POST_DETAIL_URL, args=[cls.post.id]),
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+
+    def get_again(self, client, url):
+        etag = client.get(url)['ETag']
+        return client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    def test_unchanged_pages_return_not_modified(self):
+        """Неизменившаяся страница отвечает 304 без тела."""
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.get_again(self.client, url)
+                self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+                self.assertEqual(response.content, b'')
+
+    def test_new_post_changes_etag(self):
+        """Новый пост автора меняет ETag всех его страниц."""
+        etags = [self.client.get(url)['ETag'] for url in self.urls]
+        Post.objects.create(
+            author=self.author, text='Новый пост', group=self.group
+        )
+        for url, etag in zip(self.urls, etags):
+            with self.subTest(url=url):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_etag_depends_on_viewer(self):
+        """Анонимный и авторизованный пользователи получают разные ETag."""
+        for url in self.urls:
+            with self.subTest(url=url):
+                self.assertNotEqual(
+                    self.client.get(url)['ETag'],
+                    self.author_client.get(url)['ETag'],
+                )
+
+    def test_other_worker_changes_etag(self):
+        """После правки в одном процессе другой не отвечает 304."""
+        url = self.urls[0]
+        with worker('b'):
+            cache.clear()
+            etag = self.client.get(url)['ETag']
+        with worker('a'):
+            Post.objects.create(author=self.author, text='Пост процесса A')
+        with worker('b'):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertContains(response, 'Пост процесса A')
+
+    def test_cached_page_reads_version_once(self):
+        """ETag и кеш страниц читают версию ленты одним запросом."""
+        url = self.urls[0]
+        self.client.get(url)
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
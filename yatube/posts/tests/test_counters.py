@@ -0,0 +1,75 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.cache import cache
+from django.test import TestCase
+
+from posts.counters import (author_posts_count, group_posts_count,
+                            site_posts_count)
+from posts.models import Group, Post, PostCounter, User
+
+
+class PostCounterTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Первая группа',
+            slug='first',
+            description='Тестовое описание',
+        )
+        cls.other_group = Group.objects.create(
+            title='Вторая группа',
+            slug='second',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.author,
+            text='Тестовый пост',
+            group=cls.group,
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def assertCounts(self, site, author, group, other_group):
+        self.assertEqual(site_posts_count(), site)
+        self.assertEqual(author_posts_count(self.author.id), author)
+        self.assertEqual(group_posts_count(self.group.id), group)
+        self.assertEqual(group_posts_count(self.other_group.id), other_group)
+
+    def test_counters_follow_post_changes(self):
+        """Счетчики меняются при создании, смене группы и удалении."""
+        self.assertCounts(1, 1, 1, 0)
+        post = Post.objects.create(author=self.author, text='Второй пост')
+        self.assertCounts(2, 2, 1, 0)
+        post.group = self.other_group
+        post.save()
+        self.assertCounts(2, 2, 1, 1)
+        post = Post.objects.get(pk=post.pk)
+        post.group = self.group
+        post.save()
+        self.assertCounts(2, 2, 2, 0)
+        post.delete()
+        self.assertCounts(1, 1, 1, 0)
+
+    def test_views_read_counters(self):
+        """Профиль берет число постов из счетчика, а не COUNT(*)."""
+        PostCounter.objects.filter(
+            scope=PostCounter.AUTHOR, object_id=self.author.id
+        ).delete()
+        author_posts_count(self.author.id)
+        PostCounter.objects.filter(
+            scope=PostCounter.AUTHOR, object_id=self.author.id
+        ).update(value=42)
+        response = self.client.get(f'/profile/{self.author.username}/')
+        self.assertEqual(response.context['posts_count'], 42)
+        self.assertEqual(response.context['page_obj'].paginator.count, 42)
+
+    def test_recount_command_repairs_counters(self):
+        """Команда recount_posts чинит разъехавшиеся счетчики."""
+        self.assertCounts(1, 1, 1, 0)
+        PostCounter.objects.update(value=100)
+        call_command('recount_posts', stdout=StringIO())
+        self.assertCounts(1, 1, 1, 0)
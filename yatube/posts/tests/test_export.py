@@ -0,0 +1,83 @@
+import csv
+import json
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.export import export_rows
+from posts.models import Group, Post, User
+
+EXPORT_URL = reverse('posts:export')
+
+
+class ExportPostsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.other = User.objects.create_user(username='other')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        Post.objects.bulk_create(
+            [Post(author=cls.author, text=f'Пост {i}', group=cls.group)
+             for i in range(7)]
+            + [Post(author=cls.other, text=f'Чужой {i}') for i in range(3)]
+        )
+
+    def setUp(self):
+        self.user_client = Client()
+        self.user_client.force_login(self.author)
+
+    def test_keyset_batches_cover_all_posts(self):
+        """Пачки по ключу отдают все посты в порядке ленты без повторов."""
+        expected = list(Post.objects.values_list('id', flat=True))
+        for batch_size in (1, 3, 10, 100):
+            with self.subTest(batch_size=batch_size):
+                rows = export_rows(batch_size=batch_size)
+                self.assertEqual([row['id'] for row in rows], expected)
+
+    def test_export_endpoint_streams_filtered_posts(self):
+        """Выгрузка фильтруется по автору и группе и идет потоком."""
+        cases = (
+            ({}, 10),
+            ({'author': 'other'}, 3),
+            ({'group': 'test-slug'}, 7),
+        )
+        for params, expected in cases:
+            with self.subTest(params=params):
+                response = self.user_client.get(EXPORT_URL, params)
+                self.assertTrue(response.streaming)
+                lines = b''.join(response.streaming_content).splitlines()
+                self.assertEqual(len(lines), expected)
+                self.assertIn('text', json.loads(lines[0]))
+
+    def test_export_csv(self):
+        """CSV-выгрузка начинается с заголовка."""
+        response = self.user_client.get(
+            EXPORT_URL, {'format': 'csv', 'author': 'other'}
+        )
+        content = b''.join(response.streaming_content).decode()
+        rows = list(csv.DictReader(StringIO(content)))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0]['author'], 'other')
+        self.assertEqual(rows[0]['group'], '')
+
+    def test_export_requires_login(self):
+        """Выгрузка доступна только авторизованным."""
+        response = self.client.get(EXPORT_URL)
+        self.assertEqual(response.status_code, 302)
+
+    def test_export_command(self):
+        """Команда export_posts пишет JSONL, пригодный для import_posts."""
+        out = StringIO()
+        call_command('export_posts', '--group', 'test-slug', stdout=out)
+        records = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(len(records), 7)
+        self.assertEqual(
+            set(records[0]), {'id', 'text', 'pub_date', 'author', 'group'}
+        )
@@ -0,0 +1,128 @@
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.bulk import bulk_create_posts
+from posts.models import Follow, Post, TimelineEntry, User
+from posts.utils import CURSOR_ORDERING, POSTS_ON_PAGE
+
+FOLLOW_URL = reverse('posts:follow_index')
+
+
+class FollowTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username='reader')
+        cls.author = User.objects.create_user(username='author')
+        cls.star = User.objects.create_user(username='star')
+        cls.stranger = User.objects.create_user(username='stranger')
+        cls.old_post = Post.objects.create(
+            text='Пост до подписки', author=cls.author
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def follow(self, author):
+        self.client.get(reverse('posts:profile_follow', args=[author]))
+
+    def feed_ids(self):
+        ids = []
+        params = {}
+        while params is not None:
+            page_obj = self.client.get(FOLLOW_URL, params).context['page_obj']
+            ids.extend(post.id for post in page_obj)
+            params = (
+                {'after': page_obj.next_cursor}
+                if page_obj.has_next() else None
+            )
+        return ids
+
+    def expected_ids(self, *authors):
+        return list(
+            Post.objects.filter(author__in=authors)
+            .order_by(*CURSOR_ORDERING).values_list('id', flat=True)
+        )
+
+    def test_follow_and_unfollow(self):
+        """Подписка добавляет посты автора в ленту, отписка убирает."""
+        self.follow(self.author)
+        self.assertTrue(
+            Follow.objects.filter(user=self.reader, author=self.author)
+            .exists()
+        )
+        self.assertEqual(self.feed_ids(), [self.old_post.id])
+        self.client.get(
+            reverse('posts:profile_unfollow', args=[self.author])
+        )
+        self.assertFalse(Follow.objects.filter(user=self.reader).exists())
+        self.assertFalse(TimelineEntry.objects.filter(user=self.reader))
+        self.assertEqual(self.feed_ids(), [])
+
+    def test_cannot_follow_self(self):
+        """На себя подписаться нельзя."""
+        self.follow(self.reader)
+        self.assertFalse(Follow.objects.exists())
+
+    def test_new_post_is_fanned_out(self):
+        """Новый пост попадает в ленты подписчиков, но не чужие."""
+        self.follow(self.author)
+        post = Post.objects.create(text='Новый пост', author=self.author)
+        self.assertTrue(post.fan_out)
+        self.assertTrue(
+            TimelineEntry.objects.filter(user=self.reader, post=post)
+            .exists()
+        )
+        Post.objects.create(text='Чужой пост', author=self.stranger)
+        self.assertEqual(self.feed_ids(), self.expected_ids(self.author))
+
+    @override_settings(FOLLOW_FAN_OUT_LIMIT=0)
+    def test_popular_author_is_read_on_demand(self):
+        """Посты популярного автора читаются из его ленты при чтении."""
+        self.follow(self.author)
+        self.follow(self.star)
+        bulk_create_posts([
+            Post(text=f'Звезда {i}', author=self.star)
+            for i in range(POSTS_ON_PAGE)
+        ])
+        for i in range(POSTS_ON_PAGE):
+            Post.objects.create(text=f'Пост {i}', author=self.author)
+        self.assertFalse(Post.objects.filter(fan_out=True, author=self.star))
+        self.assertFalse(TimelineEntry.objects.filter(post__fan_out=False))
+        self.assertEqual(
+            self.feed_ids(), self.expected_ids(self.author, self.star)
+        )
+
+    @override_settings(FOLLOW_FAN_OUT_LIMIT=0)
+    def test_many_popular_authors_in_one_query(self):
+        """Посты популярных авторов читаются одним запросом на всех."""
+        stars = [
+            User.objects.create_user(username=f'star{number}')
+            for number in range(6)
+        ]
+        for star in stars:
+            self.follow(star)
+            Post.objects.create(text=f'Пост {star}', author=star)
+        # Бюджет follow_index не пропустил бы запрос на каждого автора.
+        self.assertEqual(self.feed_ids(), self.expected_ids(*stars))
+
+    def test_bulk_created_posts_are_fanned_out(self):
+        """Посты из bulk_create_posts тоже рассылаются подписчикам."""
+        self.follow(self.author)
+        bulk_create_posts([
+            Post(text=f'Пост {i}', author=self.author)
+            for i in range(POSTS_ON_PAGE * 2)
+        ])
+        self.assertEqual(
+            TimelineEntry.objects.filter(user=self.reader).count(),
+            POSTS_ON_PAGE * 2 + 1,
+        )
+        self.assertEqual(self.feed_ids(), self.expected_ids(self.author))
+
+    def test_follow_page_requires_login(self):
+        """Лента подписок доступна только после входа."""
+        response = Client().get(FOLLOW_URL)
+        self.assertEqual(response.status_code, 302)
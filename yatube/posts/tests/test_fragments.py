@@ -0,0 +1,97 @@
+import re
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Follow, Group, Post, User
+from posts.utils import CURSOR_ORDERING, POSTS_ON_PAGE
+
+NEXT_RE = re.compile(r'data-next="([^"]*)"')
+CARD_RE = re.compile(r'/posts/(\d+)/')
+
+
+class FeedFragmentTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        for i in range(POSTS_ON_PAGE * 2 + 3):
+            Post.objects.create(
+                author=cls.author, text=f'Пост {i}', group=cls.group
+            )
+        cls.feeds = (
+            (reverse('posts:index'), reverse('posts:fragment_index')),
+            (
+                reverse('posts:group_list', args=[cls.group.slug]),
+                reverse('posts:fragment_group_list', args=[cls.group.slug]),
+            ),
+            (
+                reverse('posts:follow_index'),
+                reverse('posts:fragment_follow'),
+            ),
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def test_fragments_continue_feed(self):
+        """Фрагменты продолжают ленту с курсора страницы без повторов."""
+        expected = list(
+            Post.objects.order_by(*CURSOR_ORDERING).values_list(
+                'id', flat=True
+            )
+        )
+        for page_url, fragment_url in self.feeds:
+            with self.subTest(url=fragment_url):
+                page = self.client.get(page_url).content.decode()
+                seen = [int(pk) for pk in CARD_RE.findall(page)]
+                cursor = NEXT_RE.search(page).group(1)
+                while cursor:
+                    fragment = self.client.get(
+                        fragment_url, {'after': cursor}
+                    ).content.decode()
+                    self.assertNotIn('<html', fragment)
+                    seen.extend(int(pk) for pk in CARD_RE.findall(fragment))
+                    cursor = NEXT_RE.search(fragment).group(1)
+                self.assertEqual(seen, expected)
+
+    def test_fragment_skips_count(self):
+        """Фрагмент не считает COUNT(*) и не запрашивает лишнего."""
+        page = self.client.get(reverse('posts:index')).content
+        params = {'after': NEXT_RE.search(page.decode()).group(1)}
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                reverse('posts:fragment_index'), params
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(
+            [q for q in queries.captured_queries if 'COUNT(' in q['sql']]
+        )
+        self.assertLess(len(response.content), len(page) / 2)
+
+    def test_profile_fragment_hides_author(self):
+        """Фрагмент профиля рендерит карточки без автора."""
+        response = self.client.get(
+            reverse('posts:fragment_profile', args=[self.author.username])
+        )
+        self.assertNotContains(response, 'Автор:')
+        self.assertContains(
+            response, 'Дата публикации', count=POSTS_ON_PAGE
+        )
+
+    def test_follow_fragment_requires_login(self):
+        """Фрагмент ленты подписок доступен только после входа."""
+        response = Client().get(reverse('posts:fragment_follow'))
+        self.assertEqual(response.status_code, 302)
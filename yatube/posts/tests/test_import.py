@@ -0,0 +1,109 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+
+from posts.counters import (author_posts_count, group_posts_count,
+                            site_posts_count)
+from posts.models import Group, Post, User
+from posts.search import search_posts
+
+
+class ImportPostsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        Post.objects.create(author=cls.author, text='Старый пост')
+
+    def setUp(self):
+        cache.clear()
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+
+    def write(self, name, content):
+        path = os.path.join(self.dir.name, name)
+        with open(path, 'w', encoding='utf-8') as source:
+            source.write(content)
+        return path
+
+    def run_import(self, *args):
+        call_command('import_posts', *args, stdout=StringIO())
+
+    def test_import_jsonl_keeps_counters_and_search(self):
+        """Импорт JSONL обновляет счетчики и поисковый индекс."""
+        author_count = author_posts_count(self.author.id)
+        records = [
+            {'text': f'Импорт номер{i}', 'author': 'author',
+             'group': 'test-slug', 'pub_date': '2020-01-02T03:04:05+00:00'}
+            for i in range(7)
+        ] + [
+            {'text': 'Нет автора', 'author': 'nobody'},
+            {'text': 'Нет группы', 'author': 'author', 'group': 'nope'},
+        ]
+        path = self.write(
+            'posts.jsonl', '\n'.join(json.dumps(r) for r in records)
+        )
+        self.run_import(path, '--chunk-size', '3')
+        self.assertEqual(site_posts_count(), 8)
+        self.assertEqual(author_posts_count(self.author.id), author_count + 7)
+        self.assertEqual(group_posts_count(self.group.id), 7)
+        self.assertEqual(search_posts('номер3').count(), 1)
+        self.assertEqual(
+            Post.objects.filter(pub_date__year=2020).count(), 7
+        )
+
+    def test_import_csv_resumes_from_checkpoint(self):
+        """Импорт продолжается с записи из файла контрольной точки."""
+        path = self.write(
+            'posts.csv',
+            'text,author,group\n'
+            + ''.join(f'Пост {i},author,\n' for i in range(5)),
+        )
+        checkpoint = os.path.join(self.dir.name, 'checkpoint')
+        with open(checkpoint, 'w') as state:
+            state.write('3')
+        self.run_import(path, '--checkpoint', checkpoint)
+        self.assertEqual(
+            list(Post.objects.filter(text__startswith='Пост').order_by(
+                'text'
+            ).values_list('text', flat=True)),
+            ['Пост 3', 'Пост 4'],
+        )
+        with open(checkpoint) as state:
+            self.assertEqual(state.read(), '5')
+
+    def test_broken_records_are_skipped(self):
+        """Битый JSON, не строки и несуществующая дата пропускаются."""
+        path = self.write('posts.jsonl', '\n'.join([
+            json.dumps({'text': 'До', 'author': 'author'}),
+            '{"text": "битая строка"',
+            json.dumps({'text': 'Дата', 'author': 'author',
+                        'pub_date': '2020-13-45T00:00'}),
+            json.dumps(['не', 'объект']),
+            json.dumps({'text': 'Число', 'author': 'author', 'pub_date': 5}),
+            json.dumps({'text': 'Список', 'author': ['author']}),
+            json.dumps({'text': ['Текст'], 'author': 'author'}),
+            json.dumps({'text': 'После', 'author': 'author'}),
+        ]))
+        checkpoint = os.path.join(self.dir.name, 'checkpoint')
+        self.run_import(path, '--checkpoint', checkpoint)
+        self.assertEqual(
+            Post.objects.filter(text__in=['До', 'После']).count(), 2
+        )
+        self.assertFalse(
+            Post.objects.filter(
+                text__in=['битая строка', 'Дата', 'Число', 'Список']
+            ).exists()
+        )
+        with open(checkpoint) as state:
+            self.assertEqual(state.read(), '8')
@@ -0,0 +1,103 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts import page_cache
+from posts.models import Group, Post, User
+from posts.tests import constants as cs
+from posts.tests.workers import worker
+
+
+class PageCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Первая группа',
+            slug='first',
+            description='Тестовое описание',
+        )
+        cls.other_group = Group.objects.create(
+            title='Вторая группа',
+            slug='second',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.author,
+            text='Тестовый пост',
+            group=cls.group,
+        )
+        cls.urls = {
+            'index': reverse(cs.INDEX_URL),
+            'group': reverse(cs.GROUP_URL, args=[cls.group.slug]),
+            'other_group': reverse(cs.GROUP_URL, args=[cls.other_group.slug]),
+            'profile': reverse(cs.PROFILE_URL, args=[cls.author.username]),
+        }
+
+    def setUp(self):
+        cache.clear()
+        page_cache.stats.clear()
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+
+    def is_cached(self, url):
+        hits = page_cache.stats['hits']
+        self.client.get(url)
+        return page_cache.stats['hits'] > hits
+
+    def test_anonymous_pages_are_cached(self):
+        """Повторный анонимный запрос ленты отдается из кеша."""
+        for url in self.urls.values():
+            with self.subTest(url=url):
+                self.assertFalse(self.is_cached(url))
+                self.assertTrue(self.is_cached(url))
+                self.assertFalse(self.is_cached(url + '?page=2'))
+
+    def test_authorized_pages_are_not_cached(self):
+        """Авторизованный пользователь всегда получает свежую страницу."""
+        self.author_client.get(self.urls['index'])
+        self.author_client.get(self.urls['index'])
+        self.assertEqual(page_cache.stats['hits'], 0)
+        self.assertEqual(page_cache.stats['misses'], 0)
+
+    def test_new_post_invalidates_affected_feeds(self):
+        """Новый пост сбрасывает только ленты, где он появился."""
+        for url in self.urls.values():
+            self.client.get(url)
+        self.author_client.post(
+            reverse(cs.POST_CREATE_URL),
+            {'text': 'Новый пост', 'group': self.group.id},
+        )
+        self.assertFalse(self.is_cached(self.urls['index']))
+        self.assertFalse(self.is_cached(self.urls['group']))
+        self.assertFalse(self.is_cached(self.urls['profile']))
+        self.assertTrue(self.is_cached(self.urls['other_group']))
+
+    def test_group_change_invalidates_old_and_new_group(self):
+        """Перенос поста в другую группу сбрасывает обе группы."""
+        for url in self.urls.values():
+            self.client.get(url)
+        post = Post.objects.get(pk=self.post.pk)
+        post.group = self.other_group
+        post.save()
+        for url in self.urls.values():
+            with self.subTest(url=url):
+                self.assertFalse(self.is_cached(url))
+        response = self.client.get(self.urls['other_group'])
+        self.assertContains(response, self.post.text)
+
+    def test_other_worker_sees_invalidation(self):
+        """Правка ленты в одном процессе сбрасывает кеш страниц в другом."""
+        for name in ('a', 'b'):
+            with worker(name):
+                cache.clear()
+        with worker('b'):
+            self.assertFalse(self.is_cached(self.urls['index']))
+            self.assertTrue(self.is_cached(self.urls['index']))
+        with worker('a'):
+            Post.objects.create(author=self.author, text='Пост процесса A')
+        with worker('b'):
+            self.assertContains(
+                self.client.get(self.urls['index']), 'Пост процесса A'
+            )
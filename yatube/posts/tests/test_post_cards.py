@@ -0,0 +1,49 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from posts.models import Group, Post, User
+from posts.templatetags.post_cards import card_key, post_cards
+
+
+class PostCardsTagTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        Post.objects.bulk_create([
+            Post(author=cls.author, text=f'Пост {i}', group=cls.group)
+            for i in range(3)
+        ])
+
+    def setUp(self):
+        cache.clear()
+        self.posts = list(Post.objects.select_related('author', 'group'))
+
+    def test_cards_are_cached_per_post(self):
+        """Карточки берутся из кеша одним запросом без рендера."""
+        with self.assertTemplateUsed('includes/post_card.html'):
+            cards = post_cards(self.posts)
+        self.assertEqual(len(cards), len(self.posts))
+        self.assertIn(self.posts[0].text, cards[0])
+        with self.assertTemplateNotUsed('includes/post_card.html'):
+            self.assertEqual(post_cards(self.posts), cards)
+
+    def test_card_key_follows_post_and_flags(self):
+        """Ключ меняется при правке поста, группы и флагов шаблона."""
+        post = self.posts[0]
+        key = card_key(post, False, False)
+        self.assertNotEqual(key, card_key(post, True, False))
+        self.assertNotEqual(key, card_key(post, False, True))
+        post.text = 'Новый текст'
+        post.save()
+        self.assertNotEqual(key, card_key(post, False, False))
+        key = card_key(post, False, False)
+        self.group.title = 'Новое название'
+        self.group.save()
+        post = Post.objects.select_related('author', 'group').get(pk=post.pk)
+        self.assertNotEqual(key, card_key(post, False, False))
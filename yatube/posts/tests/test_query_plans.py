@@ -0,0 +1,56 @@
+from django.db import connection
+from django.db.models import Q
+from django.test import TestCase
+from django.utils import timezone
+
+from posts.models import Group, Post, User
+from posts.utils import POSTS_ON_PAGE
+
+
+class FeedQueryPlanTest(TestCase):
+    """Запросы лент идут по индексам, без полного скана и сортировки."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        Post.objects.create(
+            author=cls.author, text='Тестовый пост', group=cls.group
+        )
+
+    def explain(self, queryset):
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+            return [row[-1] for row in cursor.fetchall()]
+
+    def feed_querysets(self):
+        now = timezone.now()
+        feeds = {
+            'index': Post.objects.select_related('author', 'group').all(),
+            'group': self.group.posts.all(),
+            'profile': Post.objects.filter(author=self.author),
+        }
+        for name, posts in feeds.items():
+            yield name, posts[:POSTS_ON_PAGE + 1]
+            yield f'{name} deep page', posts[POSTS_ON_PAGE * 100:][:10]
+            yield f'{name} after', posts.filter(pub_date__lte=now).filter(
+                Q(pub_date__lt=now) | Q(id__lt=1)
+            )[:POSTS_ON_PAGE + 1]
+            yield f'{name} before', posts.filter(pub_date__gte=now).filter(
+                Q(pub_date__gt=now) | Q(id__gt=1)
+            ).order_by('pub_date', 'id')[:POSTS_ON_PAGE + 1]
+
+    def test_feeds_use_indexes(self):
+        for name, queryset in self.feed_querysets():
+            plan = self.explain(queryset)
+            with self.subTest(feed=name, plan=plan):
+                for step in plan:
+                    self.assertNotIn('TEMP B-TREE', step)
+                    if step.startswith('SCAN'):
+                        self.assertIn('USING', step)
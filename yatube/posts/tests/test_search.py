@@ -0,0 +1,102 @@
+from io import StringIO
+
+from django.contrib.admin.sites import site
+from django.core.management import call_command
+from django.db import connection
+from django.template.loader import render_to_string
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+
+from posts.models import Post, User
+from posts.search import FTS_TABLE, search_posts
+from posts.utils import CursorPage
+from posts.tests import constants as cs
+
+
+class SearchTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.post = Post.objects.create(
+            author=cls.author, text='Кот сидит на окне'
+        )
+        cls.other_post = Post.objects.create(
+            author=cls.author, text='Собака и кот, кот и собака'
+        )
+        Post.objects.create(author=cls.author, text='Про погоду')
+
+    def found(self, query):
+        return list(search_posts(query).values_list('id', flat=True))
+
+    def test_search_ranks_results(self):
+        """Поиск находит посты по словам и сортирует по релевантности."""
+        self.assertEqual(self.found('кот'), [self.other_post.id, self.post.id])
+        self.assertEqual(self.found('КОТ окне'), [self.post.id])
+        self.assertEqual(self.found('   '), [])
+
+    def test_query_syntax_is_not_executed(self):
+        """Спецсимволы FTS5 в запросе не ломают поиск."""
+        for query in ('"кот', 'кот OR погоду', 'NEAR(кот', '*', 'кот:'):
+            with self.subTest(query=query):
+                self.found(query)
+
+    def test_index_follows_post_changes(self):
+        """Индекс обновляется при правке и удалении поста."""
+        post = Post.objects.get(pk=self.post.pk)
+        post.text = 'Теперь про ежа'
+        post.save()
+        self.assertEqual(self.found('ежа'), [self.post.id])
+        self.assertEqual(self.found('кот'), [self.other_post.id])
+        Post.objects.get(pk=self.other_post.pk).delete()
+        self.assertEqual(self.found('кот'), [])
+
+    def test_rebuild_command(self):
+        """Команда rebuild_search_index восстанавливает индекс."""
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        self.assertEqual(self.found('кот'), [])
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(self.found('кот'), [self.other_post.id, self.post.id])
+
+    def test_search_page(self):
+        """Страница поиска показывает найденные посты."""
+        response = self.client.get(reverse(cs.SEARCH_URL), {'q': 'окне'})
+        self.assertTemplateUsed(response, cs.SEARCH_TEMPLATE)
+        self.assertEqual(
+            [post.id for post in response.context['page_obj']],
+            [self.post.id],
+        )
+
+    def test_search_pages_keep_rank(self):
+        """Курсор в адресе не меняет порядок результатов поиска."""
+        response = self.client.get(
+            reverse(cs.SEARCH_URL), {'q': 'кот', 'after': 'курсор'}
+        )
+        page_obj = response.context['page_obj']
+        self.assertFalse(getattr(page_obj, 'is_cursor', False))
+        self.assertEqual(
+            [post.id for post in page_obj],
+            [self.other_post.id, self.post.id],
+        )
+
+    def test_cursor_links_keep_query(self):
+        """Ссылки курсоров сохраняют параметры страницы, например q."""
+        html = render_to_string('includes/paginator.html', {
+            'page_obj': CursorPage([], 'next', 'previous'),
+            'page_query': 'q=cat&',
+        })
+        for link in ('?q=cat&amp;"', '?q=cat&amp;after=next',
+                     '?q=cat&amp;before=previous'):
+            with self.subTest(link=link):
+                self.assertIn(link, html)
+
+    def test_admin_uses_search_index(self):
+        """Поиск в админке идет через тот же индекс."""
+        post_admin = site._registry[Post]
+        request = RequestFactory().get('/admin/posts/post/')
+        queryset, use_distinct = post_admin.get_search_results(
+            request, Post.objects.all(), 'окне'
+        )
+        self.assertFalse(use_distinct)
+        self.assertEqual(list(queryset), [self.post])
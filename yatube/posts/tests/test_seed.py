@@ -0,0 +1,84 @@
+from collections import Counter
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from posts import page_cache
+from posts.counters import author_posts_count, site_posts_count
+from posts.models import Group, Post, User
+from posts.search import search_posts
+
+
+class SeedTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def run_seed(self, *args):
+        call_command(
+            'seed', '--users', '20', '--groups', '5', '--posts', '600',
+            '--chunk-size', '250', *args, stdout=StringIO(),
+        )
+
+    def test_seed_creates_consistent_data(self):
+        """seed создает данные и обновляет счетчики и поиск."""
+        self.run_seed()
+        self.assertEqual(User.objects.count(), 20)
+        self.assertEqual(Group.objects.count(), 5)
+        self.assertEqual(Post.objects.count(), 600)
+        self.assertEqual(site_posts_count(), 600)
+        post = Post.objects.first()
+        self.assertEqual(
+            author_posts_count(post.author_id),
+            Post.objects.filter(author_id=post.author_id).count(),
+        )
+        word = post.text.split()[0].strip('.')
+        self.assertIn(post, search_posts(word))
+        self.assertFalse(
+            Post.objects.filter(pub_date__gt=timezone.now()).exists()
+        )
+        self.assertEqual(self.client.get('/').status_code, 200)
+
+    def test_seed_resets_feed_pages(self):
+        """seed меняет версии лент сайта, групп и авторов."""
+        self.run_seed()
+        self.assertFalse(Post.objects.filter(fan_out=False).exists())
+        feeds = [
+            page_cache.index_feed(),
+            *map(page_cache.group_feed, Group.objects.values_list(
+                'slug', flat=True
+            )),
+            *map(page_cache.author_feed, User.objects.values_list(
+                'username', flat=True
+            )),
+        ]
+        for feed in feeds:
+            with self.subTest(feed=feed):
+                self.assertNotEqual(
+                    page_cache.feed_version(feed),
+                    page_cache.INITIAL_VERSION,
+                )
+
+    def test_posts_per_author_are_skewed(self):
+        """Посты распределены между авторами неравномерно."""
+        self.run_seed()
+        totals = sorted(
+            Counter(
+                Post.objects.values_list('author_id', flat=True)
+            ).values(),
+            reverse=True,
+        )
+        self.assertGreater(totals[0], 5 * totals[-1])
+        self.assertTrue(Post.objects.filter(group=None).exists())
+
+    def test_seed_with_workers(self):
+        """Генерация в нескольких процессах дает те же посты."""
+        self.run_seed('--workers', '2')
+        texts = list(Post.objects.values_list('text', flat=True))
+        Post.objects.all().delete()
+        self.run_seed()
+        self.assertEqual(
+            texts, list(Post.objects.values_list('text', flat=True))
+        )
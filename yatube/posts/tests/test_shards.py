@@ -0,0 +1,351 @@
+import json
+import os
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connections
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from posts import page_cache, search, shards
+from posts.bulk import bulk_create_posts
+from posts.counters import author_posts_count
+from posts.export import export_rows
+from posts.models import Follow, Group, Post, PostLocation, User
+from posts.utils import POSTS_ON_PAGE
+
+SHARDS = ['shard1', 'shard2']
+
+
+@override_settings(POST_SHARDS=SHARDS)
+class ShardTest(TransactionTestCase):
+    """Шарды — локальные файлы SQLite с одной таблицей постов."""
+
+    databases = {'default', *SHARDS}
+
+    @classmethod
+    def setUpClass(cls):
+        cls.paths = []
+        for alias in SHARDS:
+            handle, path = tempfile.mkstemp(suffix='.sqlite3')
+            os.close(handle)
+            cls.paths.append(path)
+            settings_dict = connections['default'].settings_dict
+            connections.databases[alias] = dict(
+                settings_dict, NAME=path,
+                OPTIONS=dict(settings_dict['OPTIONS'], foreign_keys=False),
+            )
+        super().setUpClass()
+        for alias in SHARDS:
+            call_command('migrate', database=alias, verbosity=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        for alias, path in zip(SHARDS, cls.paths):
+            connections[alias].close()
+            del connections.databases[alias]
+            delattr(connections._connections, alias)
+            os.remove(path)
+
+    def setUp(self):
+        cache.clear()
+        # Соседние id попадают в разные шарды.
+        self.first = User.objects.create_user(username='first')
+        self.second = User.objects.create_user(username='second')
+        self.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+
+    def stored_in(self, post_id):
+        return [
+            alias for alias in ['default', *SHARDS]
+            if Post.objects.using(alias).filter(pk=post_id).exists()
+        ]
+
+    def create_posts(self, total):
+        """Посты авторов по очереди, от новых к старым."""
+        now = timezone.now()
+        return bulk_create_posts([
+            Post(
+                author=(self.first, self.second)[number % 2],
+                group=self.group if number % 3 else None,
+                text=f'Пост {number}',
+                pub_date=now - timedelta(minutes=number),
+            )
+            for number in range(total)
+        ])
+
+    def test_post_saved_to_author_shard(self):
+        """Пост пишется в шард автора, профиль и пост читают один шард."""
+        self.client.force_login(self.first)
+        self.client.post(reverse('posts:post_create'), {'text': 'В шарде'})
+        post = Post.objects.using(shards.shard_for(self.first.pk)).get()
+        self.assertEqual(self.stored_in(post.pk), [
+            shards.home_shard(self.first.pk)
+        ])
+        self.assertEqual(
+            PostLocation.objects.get(pk=post.pk).shard,
+            shards.home_shard(self.first.pk),
+        )
+        response = self.client.get(
+            reverse('posts:post_detail', args=[post.pk])
+        )
+        self.assertEqual(response.context['post'].author, self.first)
+        self.assertEqual(response.context['posts_count'], 1)
+        response = self.client.get(
+            reverse('posts:profile', args=[self.first.username])
+        )
+        self.assertContains(response, 'В шарде')
+        self.client.post(
+            reverse('posts:post_edit', args=[post.pk]), {'text': 'Правка'}
+        )
+        self.assertEqual(shards.get_post(post.pk).text, 'Правка')
+
+    def test_bulk_create_spreads_posts(self):
+        """bulk_create раскладывает посты по шардам и выдает им id."""
+        posts = self.create_posts(6)
+        self.assertEqual(len({post.pk for post in posts}), 6)
+        for post in posts:
+            self.assertEqual(
+                self.stored_in(post.pk), [shards.home_shard(post.author_id)]
+            )
+        self.assertNotEqual(
+            shards.home_shard(self.first.pk),
+            shards.home_shard(self.second.pk),
+        )
+
+    def test_feeds_merge_shards(self):
+        """Ленты сливают шарды по (pub_date, id) и листаются курсором."""
+        posts = self.create_posts(POSTS_ON_PAGE * 2)
+        for url, expected in (
+            (reverse('posts:index'), posts),
+            (
+                reverse('posts:group_list', args=[self.group.slug]),
+                [post for post in posts if post.group_id],
+            ),
+        ):
+            with self.subTest(url=url):
+                page_obj = self.client.get(url).context['page_obj']
+                shown = list(page_obj)
+                self.assertEqual(
+                    [post.pk for post in shown],
+                    [post.pk for post in expected[:POSTS_ON_PAGE]],
+                )
+                self.assertEqual(shown[0].author, expected[0].author)
+                response = self.client.get(
+                    url, {'after': page_obj.next_cursor}
+                )
+                self.assertEqual(
+                    [post.pk for post in response.context['page_obj']],
+                    [post.pk for post in expected[POSTS_ON_PAGE:]],
+                )
+
+    def test_rebalance_moves_authors(self):
+        """rebalance_shards переносит посты основной базы и старых шардов."""
+        with override_settings(POST_SHARDS=[]):
+            legacy = Post.objects.create(author=self.second, text='Старый')
+        with override_settings(POST_SHARDS=SHARDS[:1]):
+            posts = self.create_posts(4)
+        call_command('rebalance_shards', stdout=StringIO())
+        self.assertEqual(shards.misplaced(), [])
+        for post in [legacy, *posts]:
+            self.assertEqual(
+                self.stored_in(post.pk), [shards.home_shard(post.author_id)]
+            )
+        self.assertEqual(shards.get_post(legacy.pk).text, 'Старый')
+        post = Post.objects.create(author=self.second, text='Новый')
+        self.assertGreater(post.pk, max(p.pk for p in [legacy, *posts]))
+        response = self.client.get(
+            reverse('posts:profile', args=[self.second.username])
+        )
+        self.assertEqual(len(response.context['page_obj']), 4)
+
+    def move_first_author(self):
+        """Переносит первого автора в шард второго."""
+        source = shards.home_shard(self.first.pk)
+        target = shards.home_shard(self.second.pk)
+        moved = shards.move_author(self.first.pk, source, target)
+        return source, target, moved
+
+    def test_writes_during_move_are_kept(self):
+        """Записи между копией и переключением не теряются и не воскресают."""
+        posts = [
+            post for post in self.create_posts(6)
+            if post.author_id == self.first.pk
+        ]
+        source = shards.home_shard(self.first.pk)
+        copy_posts = shards.copy_posts
+        created = []
+
+        def write_after_first_copy(*args, **kwargs):
+            copied = copy_posts(*args, **kwargs)
+            if not created:
+                created.append(Post.objects.create(
+                    author=self.first, text='Во время переноса'
+                ))
+                posts[0].text = 'Правка во время переноса'
+                posts[0].save()
+                posts[1].delete()
+            return copied
+
+        with mock.patch.object(
+            shards, 'copy_posts', side_effect=write_after_first_copy
+        ):
+            _, target, moved = self.move_first_author()
+        self.assertEqual(moved, 3)
+        self.assertEqual(self.stored_in(created[0].pk), [target])
+        self.assertEqual(self.stored_in(posts[0].pk), [target])
+        self.assertEqual(
+            shards.get_post(posts[0].pk).text, 'Правка во время переноса'
+        )
+        self.assertEqual(self.stored_in(posts[1].pk), [])
+        self.assertFalse(Post.objects.using(source).exists())
+        self.assertEqual(author_posts_count(self.first.pk), 3)
+
+    def test_move_deletes_only_copied_posts(self):
+        """Пост, которого перенос не видел, остается в source."""
+        self.create_posts(2)
+        source = shards.home_shard(self.first.pk)
+        copy_posts = shards.copy_posts
+        unseen = Post(
+            pk=1000, author=self.first, text='Не скопирован',
+            pub_date=timezone.now(), updated=timezone.now() - timedelta(1),
+        )
+
+        def insert_after_first_copy(*args, since=None, **kwargs):
+            if since is not None:
+                Post.insert_rows([unseen], source)
+            return copy_posts(*args, since=since, **kwargs)
+
+        with mock.patch.object(
+            shards, 'copy_posts', side_effect=insert_after_first_copy
+        ):
+            self.move_first_author()
+        self.assertEqual(self.stored_in(unseen.pk), [source])
+
+    def test_stale_post_is_written_to_new_shard(self):
+        """Прочитанный до переноса пост меняется и удаляется в новом шарде."""
+        post = Post.objects.create(author=self.first, text='До переноса')
+        stale = shards.get_post(post.pk)
+        _, target, _ = self.move_first_author()
+        stale.text = 'После переноса'
+        stale.save()
+        self.assertEqual(self.stored_in(post.pk), [target])
+        self.assertEqual(shards.get_post(post.pk).text, 'После переноса')
+        stale.delete()
+        self.assertEqual(self.stored_in(post.pk), [])
+        self.assertEqual(author_posts_count(self.first.pk), 0)
+
+    def test_follow_feed_reads_author_shards(self):
+        """Лента подписок собирается из шардов авторов."""
+        posts = self.create_posts(4)
+        reader = User.objects.create_user(username='reader')
+        for author in (self.first, self.second):
+            Follow.objects.create(user=reader, author=author)
+        self.client.force_login(reader)
+        response = self.client.get(reverse('posts:follow_index'))
+        self.assertEqual(
+            [post.pk for post in response.context['page_obj']],
+            [post.pk for post in posts],
+        )
+        response = self.client.get(reverse('posts:fragment_follow'))
+        self.assertContains(response, posts[0].text)
+
+    def test_api_reads_shards(self):
+        """JSON API отдает ленты шардов с именами авторов и групп."""
+        posts = self.create_posts(4)
+        for url, expected in (
+            (reverse('posts:api_index'), posts),
+            (
+                reverse('posts:api_group_list', args=[self.group.slug]),
+                [post for post in posts if post.group_id],
+            ),
+            (
+                reverse('posts:api_profile', args=[self.first.username]),
+                [post for post in posts if post.author_id == self.first.pk],
+            ),
+        ):
+            with self.subTest(url=url):
+                results = json.loads(
+                    b''.join(self.client.get(url).streaming_content)
+                )['results']
+                self.assertEqual(
+                    [row['id'] for row in results],
+                    [post.pk for post in expected],
+                )
+                self.assertEqual(
+                    results[0]['author'], expected[0].author.username
+                )
+        self.assertEqual(
+            self.client.get(
+                reverse('posts:api_group_list', args=['missing'])
+            ).status_code,
+            404,
+        )
+
+    def test_export_merges_shards(self):
+        """Выгрузка сливает шарды по (pub_date, id) через пачки."""
+        posts = self.create_posts(7)
+        rows = list(export_rows(batch_size=2))
+        self.assertEqual(
+            [row['id'] for row in rows], [post.pk for post in posts]
+        )
+        self.assertEqual(rows[1]['author'], self.second.username)
+        self.assertEqual(rows[1]['group'], self.group.slug)
+        self.assertEqual(rows[0]['group'], None)
+        self.assertEqual(
+            [row['id'] for row in export_rows(author=self.first)],
+            [post.pk for post in posts if post.author_id == self.first.pk],
+        )
+
+    def test_search_reads_shards(self):
+        """Поиск берет id из индекса, а посты из их шардов."""
+        posts = self.create_posts(POSTS_ON_PAGE + 3)
+        self.assertEqual(search.rebuild(), len(posts))
+        response = self.client.get(reverse('posts:search'), {'q': 'Пост'})
+        page_obj = response.context['page_obj']
+        self.assertEqual(page_obj.paginator.count, len(posts))
+        self.assertEqual(len(page_obj), POSTS_ON_PAGE)
+        # При равной релевантности новее пост с большим id.
+        newest = max(posts, key=lambda post: post.pk)
+        self.assertEqual(page_obj[0].pk, newest.pk)
+        self.assertEqual(page_obj[0].author, newest.author)
+        response = self.client.get(
+            reverse('posts:search'), {'q': 'Пост 3', 'page': 2}
+        )
+        self.assertEqual(response.context['page_obj'].number, 1)
+        self.assertEqual(
+            [post.pk for post in response.context['page_obj']],
+            [posts[3].pk],
+        )
+
+    def test_post_etag_reads_shard(self):
+        """Страница поста шарда отдает ETag и 304 на повторный запрос."""
+        post = self.create_posts(2)[1]
+        url = reverse('posts:post_detail', args=[post.pk])
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.group.title = 'Новое название'
+        self.group.save()
+        self.assertNotEqual(self.client.get(url)['ETag'], etag)
+
+    def test_group_change_resets_author_feeds(self):
+        """Правка группы меняет версии лент авторов ее постов из шардов."""
+        self.create_posts(3)
+        feeds = [
+            page_cache.author_feed(author.username)
+            for author in (self.first, self.second)
+        ]
+        versions = [page_cache.feed_version(feed) for feed in feeds]
+        self.group.title = 'Новое название'
+        self.group.save()
+        for feed, version in zip(feeds, versions):
+            with self.subTest(feed=feed):
+                self.assertNotEqual(page_cache.feed_version(feed), version)
@@ -1,5 +1,6 @@
 from http import HTTPStatus
 
+from django.core.cache import cache
 from django.test import Client, TestCase
 from django.urls import reverse
 
@@ -46,6 +47,9 @@ class PostsURLTests(TestCase):
              cs.POST_EDIT_TEMPLATE, HTTPStatus.OK),
         )
 
+    def setUp(self):
+        cache.clear()
+
     def test_url_templates(self):
         """Шаблоны соответствуют URL."""
         for url, params, template, _ in self.public_urls:
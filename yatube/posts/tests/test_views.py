@@ -1,12 +1,14 @@
 from http import HTTPStatus
 
 from django.core.paginator import Page
+from django.core.cache import cache
 from django.test import Client, TestCase
 from django.urls import reverse
 
 from posts.models import Group, Post, User
 from posts.tests import constants as cs
 from posts.forms import PostForm
+from posts.utils import CURSOR_ORDERING, CountedPaginator, page_window
 
 
 POSTS_PER_PAGE = 10
@@ -124,6 +126,9 @@ class PaginatorViewsTest(TestCase):
             ) for i in range(POSTS_PER_PAGE + POSTS_SECOND_PAGE)
         ])
 
+    def setUp(self):
+        cache.clear()
+
     def test_paginator(self):
         mount_of_posts_on_the_first_page = POSTS_PER_PAGE
         mount_of_posts_on_the_second_page = POSTS_SECOND_PAGE
@@ -148,3 +153,90 @@ class PaginatorViewsTest(TestCase):
                     self.assertIsNotNone(page_obj)
                     self.assertIsInstance(page_obj, Page)
                     self.assertEqual(len(page_obj.object_list), mount)
+
+    def test_page_window(self):
+        """Окно ссылок ограничено и не зависит от числа страниц."""
+        paginator = CountedPaginator(
+            Post.objects.all(), POSTS_PER_PAGE, count=POSTS_PER_PAGE * 20000
+        )
+        cases = (
+            (1, [1, 2, 3, None, 20000]),
+            (4, [1, 2, 3, 4, 5, 6, None, 20000]),
+            (500, [1, None, 498, 499, 500, 501, 502, None, 20000]),
+            (20000, [1, None, 19998, 19999, 20000]),
+        )
+        for number, expected in cases:
+            with self.subTest(number=number):
+                page_obj = paginator.page(number)
+                self.assertEqual(page_window(page_obj), expected)
+        self.assertEqual(
+            page_window(CountedPaginator([], POSTS_PER_PAGE).page(1)), [1]
+        )
+
+    def test_paginator_renders_window(self):
+        """Лента выводит окно номеров страниц, а не все страницы."""
+        response = self.client.get(PAG_INDEX_URL, {'page': 2})
+        self.assertContains(response, 'page=1"', count=3)
+        self.assertContains(response, '<span class="page-link">2</span>')
+
+
+class CursorPaginatorViewsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username=AUTHOR_USERNAME)
+        cls.group = Group.objects.create(
+            title=GROUP_TITLE,
+            slug=GROUP_SLUG,
+            description=GROUP_DESCRIPTION,
+        )
+        Post.objects.bulk_create([
+            Post(
+                text=f'{POST_TEXT} {i}', author=cls.author, group=cls.group
+            ) for i in range(POSTS_PER_PAGE * 2 + POSTS_SECOND_PAGE)
+        ])
+
+    def setUp(self):
+        cache.clear()
+
+    def test_cursor_pages_cover_feed(self):
+        """Курсоры after/before проходят ленту без пропусков и повторов."""
+        expected = list(
+            Post.objects.order_by(*CURSOR_ORDERING).values_list(
+                'id', flat=True
+            )
+        )
+        for url in (PAG_INDEX_URL, PAG_GROUP_LIST_URL, PAG_PROFILE_URL):
+            with self.subTest(url=url):
+                seen = []
+                pages = []
+                params = {'after': ''}
+                while params:
+                    response = self.client.get(url, params)
+                    page_obj = response.context['page_obj']
+                    self.assertTrue(page_obj.is_cursor)
+                    pages.append(page_obj)
+                    seen.extend(post.id for post in page_obj)
+                    params = (
+                        {'after': page_obj.next_cursor}
+                        if page_obj.has_next() else None
+                    )
+                self.assertEqual(seen, expected)
+                self.assertEqual(
+                    [len(page) for page in pages],
+                    [POSTS_PER_PAGE, POSTS_PER_PAGE, POSTS_SECOND_PAGE],
+                )
+                response = self.client.get(
+                    url, {'before': pages[-1].previous_cursor}
+                )
+                self.assertEqual(
+                    [post.id for post in response.context['page_obj']],
+                    [post.id for post in pages[1]],
+                )
+
+    def test_broken_cursor_returns_first_page(self):
+        """Битый курсор отдает первую страницу."""
+        response = self.client.get(PAG_INDEX_URL, {'after': '%%%'})
+        page_obj = response.context['page_obj']
+        self.assertEqual(len(page_obj), POSTS_PER_PAGE)
+        self.assertFalse(page_obj.has_previous())
@@ -0,0 +1,9 @@
+from django.test import override_settings
+
+
+def worker(name):
+    """Свой LocMemCache, как у отдельного процесса."""
+    return override_settings(CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': f'worker-{name}',
+    }})
@@ -0,0 +1,101 @@
+from itertools import islice
+
+from django.conf import settings
+from django.db.models import Count
+
+from . import shards
+from .models import Follow, Post, TimelineEntry
+from .utils import POSTS_ON_PAGE, cursor_page, request_cursors, seek
+
+BATCH_SIZE = 500
+ENTRY_KEY = ('pub_date', 'post_id')
+
+
+def popular_authors(author_ids):
+    """Авторы, у которых подписчиков больше FOLLOW_FAN_OUT_LIMIT."""
+    return set(
+        Follow.objects.filter(author_id__in=set(author_ids))
+        .values('author_id')
+        .annotate(total=Count('id'))
+        .filter(total__gt=settings.FOLLOW_FAN_OUT_LIMIT)
+        .values_list('author_id', flat=True)
+    )
+
+
+def push(rows):
+    """Записывает в ленты строки (user_id, post_id, pub_date) пачками."""
+    rows = iter(rows)
+    while True:
+        batch = [
+            TimelineEntry(user_id=user_id, post_id=post_id, pub_date=pub_date)
+            for user_id, post_id, pub_date in islice(rows, BATCH_SIZE)
+        ]
+        if not batch:
+            return
+        TimelineEntry.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+def fan_out(post):
+    """Рассылает новый пост в ленты всех подписчиков автора."""
+    push(
+        (user_id, post.pk, post.pub_date)
+        for user_id in Follow.objects.filter(
+            author_id=post.author_id
+        ).values_list('user_id', flat=True).iterator()
+    )
+
+
+def fan_out_after(last_id):
+    """Рассылает посты с id больше last_id, созданные без сигналов."""
+    push(Follow.objects.filter(
+        author__posts__id__gt=last_id, author__posts__fan_out=True,
+    ).values_list(
+        'user_id', 'author__posts__id', 'author__posts__pub_date'
+    ).iterator())
+
+
+def backfill(user_id, author_id):
+    """Добавляет в ленту подписчика уже разосланные посты автора."""
+    push(
+        (user_id, post_id, pub_date)
+        for post_id, pub_date in Post.objects.filter(
+            author_id=author_id, fan_out=True
+        ).values_list('id', 'pub_date').iterator()
+    )
+
+
+def drop(user_id, author_id):
+    TimelineEntry.objects.filter(
+        user_id=user_id, post__author_id=author_id
+    ).delete()
+
+
+def follow_page(request, user, per_page=POSTS_ON_PAGE):
+    """Страница ленты подписок.
+
+    Разосланные посты читаются из ленты пользователя, посты популярных
+    авторов — одним запросом по частичному индексу; обе части ищутся
+    от курсора и сливаются по (pub_date, id). С шардами посты читаются
+    из шардов авторов, см. shards.follow_page.
+    """
+    if settings.POST_SHARDS:
+        return shards.follow_page(request, user, per_page)
+    after, before = request_cursors(request)
+    entries = TimelineEntry.objects.filter(user=user).select_related(
+        'post__author', 'post__group'
+    )
+    rows = [
+        entry.post for entry in seek(
+            entries, after, before, per_page + 1, key=ENTRY_KEY
+        )
+    ]
+    rows.extend(seek(
+        Post.objects.select_related('author', 'group').filter(
+            author_id__in=Follow.objects.filter(user=user).values(
+                'author_id'
+            ),
+            fan_out=False,
+        ),
+        after, before, per_page + 1,
+    ))
+    return cursor_page(rows, after, before, per_page)
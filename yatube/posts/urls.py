@@ -1,6 +1,6 @@
 from django.urls import path
 
-from . import views
+from . import api, fragments, views
 
 app_name = 'posts'
 
@@ -9,6 +9,38 @@ urlpatterns = [
     path('group/<slug:slug>/', views.group_posts, name='group_list'),
     path('profile/<str:username>/', views.profile, name='profile'),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
+    path('search/', views.search, name='search'),
+    path('api/posts/', api.index, name='api_index'),
+    path('api/group/<slug:slug>/', api.group_posts, name='api_group_list'),
+    path('api/profile/<str:username>/', api.profile, name='api_profile'),
+    path('fragments/posts/', fragments.index, name='fragment_index'),
+    path(
+        'fragments/group/<slug:slug>/',
+        fragments.group_posts,
+        name='fragment_group_list',
+    ),
+    path(
+        'fragments/profile/<str:username>/',
+        fragments.profile,
+        name='fragment_profile',
+    ),
+    path(
+        'fragments/follow/',
+        fragments.follow_index,
+        name='fragment_follow',
+    ),
+    path('export/', views.export_posts, name='export'),
     path('create/', views.post_create, name='post_create'),
     path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
+    path('follow/', views.follow_index, name='follow_index'),
+    path(
+        'profile/<str:username>/follow/',
+        views.profile_follow,
+        name='profile_follow',
+    ),
+    path(
+        'profile/<str:username>/unfollow/',
+        views.profile_unfollow,
+        name='profile_unfollow',
+    ),
 ]
@@ -1,10 +1,203 @@
+import base64
+import binascii
+
 from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+from . import boundaries
 
 POSTS_ON_PAGE = 10
+PAGE_WINDOW = 2
+CURSOR_ORDERING = ('-pub_date', '-id')
+CURSOR_KEY = ('pub_date', 'id')
+
+
+class CountedPaginator(Paginator):
+    """Paginator с заранее известным числом объектов, без COUNT(*).
+
+    Для ленты feed страница ищется от сохраненной границы
+    (pub_date, id), а не через OFFSET.
+    """
 
+    def __init__(self, object_list, per_page, count=None, feed=None,
+                 **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        if count is not None:
+            self.count = count
+        self.feed = feed
 
-def pagination(request, posts_data):
-    paginator = Paginator(posts_data, POSTS_ON_PAGE)
+    def page(self, number):
+        number = self.validate_number(number)
+        if self.feed is None or self.orphans or number == 1:
+            return super().page(number)
+        posts = boundaries.seek(
+            self.object_list, self.feed, self.count,
+            (number - 1) * self.per_page, self.per_page,
+        )
+        return self._get_page(posts, number, self)
+
+
+def pagination(request, posts_data, count=None, feed=None):
+    if 'after' in request.GET or 'before' in request.GET:
+        return cursor_pagination(request, posts_data)
+    paginator = CountedPaginator(
+        posts_data, POSTS_ON_PAGE, count=count, feed=feed
+    )
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     return page_obj
+
+
+def page_window(page_obj, on_each_side=PAGE_WINDOW, on_ends=1):
+    """Номера страниц вокруг текущей и по краям, None на месте пропуска.
+
+    Длина списка ограничена и не зависит от числа страниц.
+    """
+    number = page_obj.number
+    num_pages = page_obj.paginator.num_pages
+    shown = sorted({
+        *range(1, min(on_ends, num_pages) + 1),
+        *range(
+            max(number - on_each_side, 1),
+            min(number + on_each_side, num_pages) + 1,
+        ),
+        *range(max(num_pages - on_ends + 1, 1), num_pages + 1),
+    })
+    window = []
+    for page_number in shown:
+        if window and page_number - window[-1] > 1:
+            window.append(None)
+        window.append(page_number)
+    return window
+
+
+def cursor_key(post):
+    """Ключ (pub_date, id) поста или строки из values()."""
+    if isinstance(post, dict):
+        return post['pub_date'], post['id']
+    return post.pub_date, post.pk
+
+
+def encode_cursor(post):
+    """Упаковывает ключ поста (pub_date, id) в непрозрачный токен."""
+    pub_date, pk = cursor_key(post)
+    raw = f'{pub_date.isoformat()}|{pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Возвращает (pub_date, id) из токена или None для битого токена."""
+    try:
+        padding = '=' * (-len(token) % 4)
+        raw = base64.urlsafe_b64decode(token + padding).decode()
+        pub_date, pk = raw.split('|')
+        pub_date = parse_datetime(pub_date)
+        pk = int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+    if pub_date is None:
+        return None
+    return pub_date, pk
+
+
+class CursorPage:
+    """Страница ленты для курсорного режима, совместимая с page_obj."""
+
+    is_cursor = True
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<Cursor page of {len(self)} posts>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+def seek(posts_data, after=None, before=None, limit=POSTS_ON_PAGE,
+         key=CURSOR_KEY):
+    """Строки ленты за курсором after или перед курсором before.
+
+    key — поля (pub_date, id) в posts_data. Строки перед before идут
+    от ближайшей к курсору, то есть в обратном порядке ленты.
+    """
+    date_field, id_field = key
+    if before is not None:
+        pub_date, pk = before
+        return list(
+            posts_data.filter(**{f'{date_field}__gte': pub_date}).filter(
+                Q(**{f'{date_field}__gt': pub_date})
+                | Q(**{f'{id_field}__gt': pk})
+            ).order_by(date_field, id_field)[:limit]
+        )
+    if after is not None:
+        pub_date, pk = after
+        posts_data = posts_data.filter(
+            **{f'{date_field}__lte': pub_date}
+        ).filter(
+            Q(**{f'{date_field}__lt': pub_date})
+            | Q(**{f'{id_field}__lt': pk})
+        )
+    return list(
+        posts_data.order_by(f'-{date_field}', f'-{id_field}')[:limit]
+    )
+
+
+def cursor_page(rows, after=None, before=None, per_page=POSTS_ON_PAGE):
+    """Собирает CursorPage из строк seek, в том числе из нескольких лент."""
+    rows = sorted(rows, key=cursor_key, reverse=before is None)
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    if before is not None:
+        rows.reverse()
+        return CursorPage(
+            rows,
+            next_cursor=encode_cursor(rows[-1]) if rows else None,
+            previous_cursor=encode_cursor(rows[0]) if has_more else None,
+        )
+    return CursorPage(
+        rows,
+        next_cursor=encode_cursor(rows[-1]) if has_more else None,
+        previous_cursor=(
+            encode_cursor(rows[0]) if after is not None and rows else None
+        ),
+    )
+
+
+def request_cursors(request):
+    """Курсоры after и before из запроса; битый курсор считается пустым."""
+    before = decode_cursor(request.GET.get('before', ''))
+    after = None
+    if before is None:
+        after = decode_cursor(request.GET.get('after', ''))
+    return after, before
+
+
+def cursor_pagination(request, posts_data, per_page=POSTS_ON_PAGE):
+    """Постраничный вывод по ключу (pub_date, id) без OFFSET и COUNT(*).
+
+    Каждая страница — это индексный поиск от границы предыдущей,
+    поэтому время ответа не зависит от глубины страницы.
+    """
+    after, before = request_cursors(request)
+    rows = seek(posts_data, after, before, per_page + 1)
+    return cursor_page(rows, after, before, per_page)
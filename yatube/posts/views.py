@@ -1,24 +1,72 @@
+from urllib.parse import urlencode
+
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
+from django.views.decorators.http import condition
+
+from core.query_budget import query_budget
+from core.replicas import read_from_replica
+from core.write_queue import write
 
+from . import shards
+from .counters import author_posts_count, group_posts_count, site_posts_count
+from .etags import feed_etag, post_etag
+from .export import CONTENT_TYPES, RENDERERS, export_rows
 from .forms import PostForm
-from .models import Group, Post, User
-from .utils import pagination
+from .models import Follow, Group, Post, PostCounter, User
+from .page_cache import (author_feed, cache_anonymous_page, group_feed,
+                         index_feed)
+from .search import search_posts
+from .timeline import follow_page
+from .utils import POSTS_ON_PAGE, CountedPaginator, pagination
+
+
+def save_post(save):
+    """Сохраняет пост через групповой коммит core.write_queue.
 
+    Пост шарда пишется сразу: в транзакции основной базы блокировка
+    шарда бралась бы в обратном порядке, см. Post.shard_lock.
+    """
+    if settings.POST_SHARDS:
+        return save()
+    return write(save)
 
+
+@query_budget(14)
+@read_from_replica
+@condition(etag_func=feed_etag(index_feed))
+@cache_anonymous_page(index_feed)
 def index(request):
-    posts = Post.objects.select_related('author', 'group').all()
-    page_obj = pagination(request, posts)
+    if settings.POST_SHARDS:
+        page_obj = shards.feed_page(request)
+    else:
+        posts = Post.objects.select_related('author', 'group').all()
+        page_obj = pagination(
+            request, posts, count=site_posts_count(),
+            feed=(PostCounter.SITE, 0),
+        )
     context = {
         'page_obj': page_obj,
     }
     return render(request, 'posts/index.html', context)
 
 
+@query_budget(13)
+@read_from_replica
+@condition(etag_func=feed_etag(group_feed))
+@cache_anonymous_page(group_feed)
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
-    posts = group.posts.all()
-    page_obj = pagination(request, posts)
+    if settings.POST_SHARDS:
+        page_obj = shards.feed_page(request, group_id=group.id)
+    else:
+        posts = group.posts.select_related('author', 'group')
+        page_obj = pagination(
+            request, posts, count=group_posts_count(group.id),
+            feed=(PostCounter.GROUP, group.id),
+        )
     context = {
         'page_obj': page_obj,
         'group': group,
@@ -26,26 +74,85 @@ def group_posts(request, slug):
     return render(request, 'posts/group_list.html', context)
 
 
+@query_budget(14)
+@read_from_replica
+@condition(etag_func=feed_etag(author_feed))
+@cache_anonymous_page(author_feed)
 def profile(request, username):
     author = get_object_or_404(User, username=username)
-    posts_profile_list = Post.objects.filter(author=author)
-    page_obj = pagination(request, posts_profile_list)
+    posts_profile_list = shards.author_posts(author.id)
+    posts_count = author_posts_count(author.id)
+    # Границы страниц считаются по основной базе, в шарде листаем OFFSET.
+    page_obj = pagination(
+        request, posts_profile_list, count=posts_count,
+        feed=None if settings.POST_SHARDS else (
+            PostCounter.AUTHOR, author.id
+        ),
+    )
+    following = request.user.is_authenticated and Follow.objects.filter(
+        user=request.user, author=author
+    ).exists()
     context = {
         'page_obj': page_obj,
         'author': author,
+        'posts_count': posts_count,
+        'following': following,
     }
     return render(request, 'posts/profile.html', context)
 
 
+@query_budget(7)
+def search(request):
+    query = request.GET.get('q', '').strip()
+    posts = search_posts(
+        query, Post.objects.select_related('author', 'group')
+    )
+    # Только по номерам страниц: курсоры листают по дате, а результаты
+    # поиска идут по релевантности.
+    page_obj = CountedPaginator(posts, POSTS_ON_PAGE).get_page(
+        request.GET.get('page')
+    )
+    context = {
+        'page_obj': page_obj,
+        'query': query,
+        'page_query': urlencode({'q': query}) + '&',
+    }
+    return render(request, 'posts/search.html', context)
+
+
+@query_budget(3)
+@login_required
+def export_posts(request):
+    fmt = request.GET.get('format', 'jsonl')
+    if fmt not in RENDERERS:
+        raise Http404('Неизвестный формат выгрузки')
+    author = group = None
+    if request.GET.get('author'):
+        author = get_object_or_404(User, username=request.GET['author'])
+    if request.GET.get('group'):
+        group = get_object_or_404(Group, slug=request.GET['group'])
+    response = StreamingHttpResponse(
+        RENDERERS[fmt](export_rows(author=author, group=group)),
+        content_type=CONTENT_TYPES[fmt],
+    )
+    response['Content-Disposition'] = f'attachment; filename="posts.{fmt}"'
+    return response
+
+
+@query_budget(18)
+@read_from_replica
+@condition(etag_func=post_etag)
 def post_detail(request, post_id):
     template = 'posts/post_detail.html'
-    post = Post.objects.get(id=post_id)
+    post = shards.get_post(post_id)
     context = {
         'post': post,
+        'posts_count': author_posts_count(post.author_id),
     }
     return render(request, template, context)
 
 
+@query_budget(18)
 @login_required
 def post_create(request):
     template = 'posts/create_post.html'
@@ -54,20 +161,21 @@ def post_create(request):
         return render(request, template, {'form': form})
     post = form.save(commit=False)
     post.author = request.user
-    post.save()
+    save_post(post.save)
     return redirect('posts:profile', request.user)
 
 
+@query_budget(14)
 @login_required
 def post_edit(request, post_id):
     template = 'posts/create_post.html'
-    post = Post.objects.get(pk=post_id)
+    post = shards.get_post(post_id)
     form = PostForm(request.POST or None, instance=post)
     if request.user != post.author:
         return redirect('posts:post_detail', post_id)
     if request.user == post.author:
         if request.method == 'POST':
-            form.save()
+            save_post(form.save)
             return redirect('posts:post_detail', post_id)
         context = {
             'form': form,
@@ -75,3 +183,30 @@ def post_edit(request, post_id):
             'post': post,
         }
     return render(request, template, context)
+
+
+@query_budget(8)
+@read_from_replica
+@login_required
+def follow_index(request):
+    context = {
+        'page_obj': follow_page(request, request.user),
+    }
+    return render(request, 'posts/follow.html', context)
+
+
+@query_budget(11)
+@login_required
+def profile_follow(request, username):
+    author = get_object_or_404(User, username=username)
+    if author != request.user:
+        Follow.objects.get_or_create(user=request.user, author=author)
+    return redirect('posts:profile', username)
+
+
+@query_budget(9)
+@login_required
+def profile_unfollow(request, username):
+    author = get_object_or_404(User, username=username)
+    Follow.objects.filter(user=request.user, author=author).delete()
+    return redirect('posts:profile', username)
@@ -0,0 +1,59 @@
+// Бесконечная лента: подгружает следующие карточки фрагментом,
+// без base.html. Без JavaScript остается обычный пагинатор.
+(function () {
+  'use strict';
+
+  var feed = document.querySelector('[data-feed]');
+  if (!feed || !feed.dataset.next || !('IntersectionObserver' in window)
+      || !window.fetch) {
+    return;
+  }
+  var pager = document.querySelector('nav[aria-label="Page navigation"]');
+  if (pager) {
+    pager.hidden = true;
+  }
+  var sentinel = document.createElement('div');
+  feed.after(sentinel);
+  var loading = false;
+
+  function restorePager() {
+    observer.disconnect();
+    if (pager) {
+      pager.hidden = false;
+    }
+  }
+
+  function loadNext() {
+    if (loading || !feed.dataset.next) {
+      return;
+    }
+    loading = true;
+    var url = feed.dataset.feed + '?after=' + encodeURIComponent(feed.dataset.next);
+    fetch(url, {credentials: 'same-origin'})
+      .then(function (response) {
+        if (!response.ok) {
+          throw new Error(response.status);
+        }
+        return response.text();
+      })
+      .then(function (html) {
+        var template = document.createElement('template');
+        template.innerHTML = html;
+        var page = template.content.querySelector('.feed-page');
+        feed.dataset.next = page.dataset.next;
+        feed.append.apply(feed, Array.prototype.slice.call(page.children));
+        loading = false;
+        if (!feed.dataset.next) {
+          observer.disconnect();
+        }
+      })
+      .catch(restorePager);
+  }
+
+  var observer = new IntersectionObserver(function (entries) {
+    if (entries[0].isIntersecting) {
+      loadNext();
+    }
+  }, {rootMargin: '600px'});
+  observer.observe(sentinel);
+})();
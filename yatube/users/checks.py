@@ -0,0 +1,40 @@
+from django.conf import settings
+from django.core.checks import Error, register
+
+LOCAL_CACHE = 'django.core.cache.backends.locmem.LocMemCache'
+CACHED_SESSIONS = (
+    'django.contrib.sessions.backends.cache',
+    'django.contrib.sessions.backends.cached_db',
+)
+CACHED_BACKEND = 'users.backends.CachedModelBackend'
+
+
+def is_local(alias):
+    return settings.CACHES.get(alias, {}).get('BACKEND') == LOCAL_CACHE
+
+
+@register()
+def shared_auth_cache(app_configs, **kwargs):
+    """Сессии и пользователи из кеша только в общем кеше процессов.
+
+    LocMemCache у каждого процесса свой: выход или смена пароля
+    в одном процессе не сбросили бы сессию в остальных.
+    """
+    errors = []
+    if settings.SESSION_ENGINE in CACHED_SESSIONS and is_local(
+        settings.SESSION_CACHE_ALIAS
+    ):
+        errors.append(Error(
+            'Сессии в кеше требуют общего кеша, а не LocMemCache.',
+            hint='Задайте YATUBE_MEMCACHED или храните сессии в базе.',
+            id='users.E001',
+        ))
+    if CACHED_BACKEND in settings.AUTHENTICATION_BACKENDS and is_local(
+        'default'
+    ):
+        errors.append(Error(
+            f'{CACHED_BACKEND} требует общего кеша, а не LocMemCache.',
+            hint='Задайте YATUBE_MEMCACHED или используйте ModelBackend.',
+            id='users.E002',
+        ))
+    return errors
@@ -0,0 +1,153 @@
+import importlib
+import os
+import re
+import shutil
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import User
+from users.backends import user_key
+from users.checks import shared_auth_cache
+
+SESSION_OR_USER_RE = re.compile(r'FROM "(django_session|auth_user)"')
+CACHE_DIR = tempfile.mkdtemp()
+CACHED_AUTH = {
+    'SESSION_ENGINE': 'django.contrib.sessions.backends.cached_db',
+    'AUTHENTICATION_BACKENDS': ['users.backends.CachedModelBackend'],
+}
+
+
+def shared_cache():
+    """Новый экземпляр кеша на общем хранилище, как в другом процессе.
+
+    Смена CACHES сбрасывает экземпляры кешей, поэтому каждый вызов
+    дает свой кеш, а файлы у всех общие.
+    """
+    return override_settings(CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': CACHE_DIR,
+    }})
+
+
+@override_settings(**CACHED_AUTH)
+class CachedAuthTest(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(CACHE_DIR, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        worker = shared_cache()
+        worker.enable()
+        self.addCleanup(worker.disable)
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='reader', password='old-password-42'
+        )
+        self.client.login(username='reader', password='old-password-42')
+        # Первый запрос кладет сессию и пользователя в кеш.
+        self.client.get(reverse('posts:index'))
+
+    def other_device(self):
+        """Клиент с той же сессией, что и self.client."""
+        client = Client()
+        name = settings.SESSION_COOKIE_NAME
+        client.cookies[name] = self.client.cookies[name].value
+        return client
+
+    def test_no_session_or_user_queries(self):
+        """Запрос с сессией не читает django_session и auth_user."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('posts:index'))
+        self.assertTrue(response.context['user'].is_authenticated)
+        self.assertFalse([
+            query['sql'] for query in queries
+            if SESSION_OR_USER_RE.search(query['sql'])
+        ])
+
+    def test_password_change_ends_other_sessions(self):
+        """После смены пароля старая сессия больше не действует."""
+        self.user.set_password('new-password-42')
+        self.user.save()
+        response = self.client.get(reverse('posts:index'))
+        self.assertFalse(response.context['user'].is_authenticated)
+
+    def test_inactive_user_is_logged_out(self):
+        """Выключенный пользователь не берется из кеша."""
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get(reverse('posts:index'))
+        self.assertFalse(response.context['user'].is_authenticated)
+
+    def test_logout_forgets_user(self):
+        """Выход удаляет пользователя из кеша."""
+        self.assertIsNotNone(cache.get(user_key(self.user.pk)))
+        self.client.get(reverse('users:logout'))
+        self.assertIsNone(cache.get(user_key(self.user.pk)))
+
+    def test_other_worker_sees_logout_and_password_change(self):
+        """Выход и смена пароля в одном процессе видны в другом."""
+        follow = reverse('posts:follow_index')
+        device = self.other_device()
+        for action in ('password', 'logout'):
+            with self.subTest(action=action):
+                with shared_cache():
+                    self.assertEqual(device.get(follow).status_code, 200)
+                with shared_cache():
+                    if action == 'logout':
+                        self.client.get(reverse('users:logout'))
+                    else:
+                        self.user.set_password('new-password-42')
+                        self.user.save()
+                with shared_cache():
+                    self.assertRedirects(
+                        device.get(follow), f'/auth/login/?next={follow}'
+                    )
+                self.client.login(
+                    username='reader', password='new-password-42'
+                )
+                device = self.other_device()
+
+    def test_local_caches_are_refused(self):
+        """С LocMemCache у каждого процесса свой кеш: проверка не пускает."""
+        for location in ('worker-a', 'worker-b'):
+            with override_settings(CACHES={'default': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                'LOCATION': location,
+            }}):
+                self.assertEqual(
+                    [error.id for error in shared_auth_cache(None)],
+                    ['users.E001', 'users.E002'],
+                )
+        with shared_cache():
+            self.assertEqual(shared_auth_cache(None), [])
+
+
+class MemcachedSettingsTest(TestCase):
+    def test_memcached_turns_on_cached_auth(self):
+        """С YATUBE_MEMCACHED settings включают сессии и вход из кеша."""
+        module = importlib.import_module(settings.SETTINGS_MODULE)
+        environ = {'YATUBE_MEMCACHED': '127.0.0.1:11211'}
+        try:
+            with mock.patch.dict(os.environ, environ):
+                importlib.reload(module)
+            self.assertEqual(
+                module.SESSION_ENGINE, CACHED_AUTH['SESSION_ENGINE']
+            )
+            self.assertEqual(
+                module.AUTHENTICATION_BACKENDS,
+                CACHED_AUTH['AUTHENTICATION_BACKENDS'],
+            )
+            with override_settings(CACHES=module.CACHES, **CACHED_AUTH):
+                self.assertEqual(shared_auth_cache(None), [])
+                # Клиент memcached установлен; без сервера get дает None.
+                self.assertIsNone(caches['default'].get('missing'))
+        finally:
+            importlib.reload(module)
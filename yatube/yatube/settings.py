@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/2.2/ref/settings/
 """
 
 import os
+import tempfile
 
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -49,6 +50,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.server_timing.ServerTimingMiddleware',
+    'core.middleware.replicas.ReplicaMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -85,11 +88,130 @@ WSGI_APPLICATION = 'yatube.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'core.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        # Транзакции сразу берут блокировку записи, см. core.backends.
+        'OPTIONS': {'transaction_mode': 'IMMEDIATE'},
+        # Соединение живет между запросами своего потока.
+        'CONN_MAX_AGE': 600,
     }
 }
 
+# PRAGMA для каждого нового соединения SQLite, их применяет core.db
+# в этом порядке. busy_timeout первым: с ним ждут блокировку записи,
+# в том числе при переводе базы в WAL, вместо "database is locked".
+# WAL дает читать во время записи.
+SQLITE_PRAGMAS = {
+    'busy_timeout': 5000,
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    # Размер в КиБ, если значение отрицательное.
+    'cache_size': -64000,
+    'mmap_size': 256 * 1024 * 1024,
+}
+
+# Реплики только для чтения: пути к копиям базы через запятую.
+# С них читают ленты и посты, см. core.replicas.
+DATABASES.update(
+    (f'replica{number}', dict(DATABASES['default'], NAME=name))
+    for number, name in enumerate(
+        filter(None, os.environ.get('YATUBE_DB_REPLICAS', '').split(',')), 1
+    )
+)
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+
+# Шарды постов: пути к файлам SQLite через запятую. Посты делятся между
+# ними по автору, см. posts.shards; без шардов лежат в основной базе.
+# В шардах нет таблиц авторов и групп, поэтому внешние ключи выключены.
+POST_SHARDS = []
+for number, name in enumerate(
+    filter(None, os.environ.get('YATUBE_POST_SHARDS', '').split(',')), 1
+):
+    POST_SHARDS.append(f'shard{number}')
+    DATABASES[f'shard{number}'] = dict(
+        DATABASES['default'], NAME=name,
+        OPTIONS=dict(DATABASES['default']['OPTIONS'], foreign_keys=False),
+    )
+DATABASE_ROUTERS = [
+    'posts.shards.ShardRouter',
+    'core.replicas.ReplicaRouter',
+]
+# Сколько секунд после записи клиент читает из основной базы.
+REPLICA_LAG_SECONDS = 5
+
+# Групповой коммит записи постов фоновым потоком процесса,
+# см. core.write_queue. Пачка собирается не дольше WRITE_QUEUE_LINGER_MS.
+WRITE_QUEUE = os.environ.get('YATUBE_WRITE_QUEUE') == '1'
+WRITE_QUEUE_LINGER_MS = 2
+WRITE_QUEUE_BATCH_SIZE = 100
+# Сколько секунд запрос ждет коммита записи из очереди.
+WRITE_QUEUE_TIMEOUT = 10
+
+# Cache
+# https://docs.djangoproject.com/en/2.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+# Общий для всех процессов кеш: адреса memcached через запятую.
+MEMCACHED = list(
+    filter(None, os.environ.get('YATUBE_MEMCACHED', '').split(','))
+)
+if MEMCACHED:
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+        'LOCATION': MEMCACHED,
+    }
+# LocMemCache у каждого процесса свой, остальные кеши общие.
+SHARED_CACHE = CACHES['default']['BACKEND'] != (
+    'django.core.cache.backends.locmem.LocMemCache'
+)
+
+PAGE_CACHE_TIMEOUT = 60 * 5
+POST_CARD_CACHE_TIMEOUT = 60 * 60
+# Авторам с большим числом подписчиков посты не рассылаются по лентам.
+FOLLOW_FAN_OUT_LIMIT = 1000
+
+# Server-Timing всем посетителям; без него заголовок видит только персонал.
+SERVER_TIMING = DEBUG
+
+# Запросы медленнее или с большим числом SQL пишутся в лог.
+SLOW_REQUEST_MS = 500
+SLOW_REQUEST_QUERIES = 50
+
+# Превышение бюджета запросов view: исключение или запись в лог.
+QUERY_BUDGET_RAISE = False
+TEST_RUNNER = 'core.test_runner.BudgetTestRunner'
+
+# Файлы метрик процессов, их складывает /metrics.
+METRICS_DIR = os.environ.get(
+    'YATUBE_METRICS_DIR',
+    os.path.join(tempfile.gettempdir(), 'yatube-metrics'),
+)
+METRICS_ALLOWED_IPS = ['127.0.0.1', '::1']
+# Токен сборщика метрик; обязателен, если сайт стоит за прокси.
+METRICS_TOKEN = os.environ.get('YATUBE_METRICS_TOKEN', '')
+METRICS_NAMESPACES = ('posts', 'users', 'about')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'yatube.performance': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
@@ -109,6 +231,15 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Сессии и пользователь сессии читаются из кеша, без запросов к базе.
+# cached_db пишет сессию и в базу: она переживает сброс кеша. Выход
+# и смена пароля должны быть видны всем процессам, поэтому только
+# с общим кешем, см. users.checks.
+if SHARED_CACHE:
+    SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+    AUTHENTICATION_BACKENDS = ['users.backends.CachedModelBackend']
+USER_CACHE_TIMEOUT = 60 * 60
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/2.2/topics/i18n/